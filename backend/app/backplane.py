@@ -0,0 +1,320 @@
+"""
+Tick backplane for running the backend on several workers or nodes.
+
+One producer (the leader) reads the market data source and publishes
+every tick batch to the backplane. Every worker, the leader included,
+subscribes and feeds the batches through its own in-memory views and
+WebSocket fan-out, so all workers serve the same prices.
+
+``InProcessBackplane`` is the single-process default. ``RedisBackplane``
+uses Redis pub/sub and elects the leader with a ``SET NX PX`` lock; pass
+it a ``FakeRedis`` to run several workers in one process without Redis.
+Both retry with exponential backoff when Redis is unreachable.
+"""
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from app.encoding import dumps
+from app.ingest import Tick, TickSource
+
+
+# Lock renewal and release: only while the lock still holds our token, in
+# one step so a lock taken over between the check and the write is kept
+RENEW_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def encode_batch(batch: List[Tick]) -> str:
+    """Tick batch to a compact JSON array of [symbol, price, volume, ts_ns]"""
+    return dumps([list(tick) for tick in batch])
+
+
+def decode_batch(data) -> List[Tick]:
+    return [Tick(*row) for row in json.loads(data)]
+
+
+class Backplane:
+    """Base class: publish tick batches and receive everyone's batches"""
+
+    is_leader = False
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def campaign(self):
+        """Wait until this worker holds leadership"""
+        raise NotImplementedError
+
+    async def publish(self, batch: List[Tick]):
+        raise NotImplementedError
+
+    def ticks(self) -> TickSource:
+        """Tick source yielding every published batch from now on"""
+        raise NotImplementedError
+
+
+class _QueueSource(TickSource):
+    """Yields batches pushed into a bounded queue, dropping the oldest on overflow"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.queue: "asyncio.Queue[List[Tick]]" = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def push(self, batch: List[Tick]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(batch)
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        while True:
+            yield await self.queue.get()
+
+
+class InProcessBackplane(Backplane):
+    """Single process: the only worker is always the leader"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.sources: List[_QueueSource] = []
+
+    async def campaign(self):
+        self.is_leader = True
+
+    async def publish(self, batch: List[Tick]):
+        for source in self.sources:
+            source.push(batch)
+
+    def ticks(self) -> TickSource:
+        source = _QueueSource(self.maxsize)
+        self.sources.append(source)
+        return source
+
+
+class _RedisSource(TickSource):
+    """Batches published on ``channel``; resubscribes with backoff after errors"""
+
+    def __init__(self, redis, channel: str, max_backoff: float = 30.0):
+        self.redis = redis
+        self.channel = channel
+        self.max_backoff = max_backoff
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        backoff = 1.0
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        yield decode_batch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Backplane subscription error: {e}; resubscribing in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                await pubsub.aclose()
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub backplane with lock-based leader election
+
+    The leader holds ``lock_key`` (``SET NX PX lock_ttl``) and renews it
+    every third of the TTL. If it stops renewing, another worker takes
+    over once the lock expires and the old leader steps down. A leader
+    that cannot reach Redis steps down before its lock may have expired.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379",
+        channel: str = "ticks",
+        lock_key: str = "ticks:producer",
+        lock_ttl: float = 5.0,
+        client=None,
+        max_backoff: float = 30.0,
+    ):
+        self.url = url
+        self.channel = channel
+        self.lock_key = lock_key
+        self.lock_ttl_ms = int(lock_ttl * 1000)
+        self.redis = client
+        self.token = uuid.uuid4().hex
+        self.max_backoff = max_backoff
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.redis is None:
+            import redis.asyncio as redis
+
+            self.redis = redis.from_url(self.url)
+
+    async def close(self):
+        if self._renewer is not None:
+            self._renewer.cancel()
+        if self.is_leader:
+            self.is_leader = False
+            await self.redis.eval(RELEASE_LOCK_LUA, 1, self.lock_key, self.token)
+        await self.redis.aclose()
+
+    async def campaign(self):
+        if self.is_leader:
+            return
+        interval = self.lock_ttl_ms / 3000
+        backoff = 1.0
+        while True:
+            try:
+                acquired_at = asyncio.get_running_loop().time()
+                if await self.redis.set(self.lock_key, self.token, nx=True, px=self.lock_ttl_ms):
+                    break
+                backoff = 1.0
+                await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Backplane election error: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        self.is_leader = True
+        self._renewer = asyncio.create_task(self._renew(interval, acquired_at + self.lock_ttl_ms / 1000))
+
+    async def _renew(self, interval: float, expires: float):
+        loop = asyncio.get_running_loop()
+        while self.is_leader:
+            await asyncio.sleep(interval)
+            try:
+                renewed_at = loop.time()
+                if await self.redis.eval(RENEW_LOCK_LUA, 1, self.lock_key, self.token, self.lock_ttl_ms):
+                    expires = renewed_at + self.lock_ttl_ms / 1000
+                else:
+                    self.is_leader = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Backplane lock renewal error: {e}")
+                # Keep leading only while the last renewal surely holds
+                if loop.time() + interval >= expires:
+                    self.is_leader = False
+
+    async def publish(self, batch: List[Tick]):
+        await self.redis.publish(self.channel, encode_batch(batch))
+
+    def ticks(self) -> TickSource:
+        return _RedisSource(self.redis, self.channel, self.max_backoff)
+
+
+# ---------------------------------------------------------------------------
+# Local fake
+# ---------------------------------------------------------------------------
+
+class FakeRedis:
+    """
+    In-memory stand-in for the ``redis.asyncio`` calls the backplane uses
+
+    Instances created with the same ``server`` dict share keys and
+    channels, like clients of one Redis server::
+
+        server = {}
+        worker_a = RedisBackplane(client=FakeRedis(server))
+        worker_b = RedisBackplane(client=FakeRedis(server))
+    """
+
+    def __init__(self, server: Optional[Dict] = None):
+        self.server = server if server is not None else {}
+        self.server.setdefault("keys", {})
+        self.server.setdefault("channels", {})
+
+    def _live(self, key: str):
+        value, expires = self.server["keys"].get(key, (None, None))
+        if expires is not None and expires <= asyncio.get_running_loop().time():
+            del self.server["keys"][key]
+            return None
+        return value
+
+    async def get(self, key: str):
+        return self._live(key)
+
+    async def set(self, key: str, value, nx: bool = False, xx: bool = False, px: Optional[int] = None):
+        exists = self._live(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        expires = asyncio.get_running_loop().time() + px / 1000 if px else None
+        self.server["keys"][key] = (value, expires)
+        return True
+
+    async def delete(self, key: str) -> int:
+        return int(self.server["keys"].pop(key, None) is not None)
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args):
+        """Runs RENEW_LOCK_LUA and RELEASE_LOCK_LUA"""
+        key, token = keys_and_args[0], keys_and_args[numkeys]
+        if self._live(key) != token:
+            return 0
+        if script == RENEW_LOCK_LUA:
+            ttl_ms = int(keys_and_args[numkeys + 1])
+            self.server["keys"][key] = (token, asyncio.get_running_loop().time() + ttl_ms / 1000)
+            return 1
+        if script == RELEASE_LOCK_LUA:
+            return await self.delete(key)
+        raise NotImplementedError("FakeRedis only runs the backplane's lock scripts")
+
+    async def publish(self, channel: str, message) -> int:
+        subscribers = self.server["channels"].get(channel, ())
+        for pubsub in subscribers:
+            pubsub.messages.append({"type": "message", "channel": channel, "data": message})
+            pubsub.ready.set()
+        return len(subscribers)
+
+    def pubsub(self) -> "FakePubSub":
+        return FakePubSub(self.server)
+
+    async def aclose(self):
+        pass
+
+
+class FakePubSub:
+    def __init__(self, server: Dict):
+        self.server = server
+        self.channels: Set[str] = set()
+        self.messages: deque = deque()
+        self.ready = asyncio.Event()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.channels.add(channel)
+            self.server["channels"].setdefault(channel, set()).add(self)
+            self.messages.append({"type": "subscribe", "channel": channel, "data": len(self.channels)})
+        self.ready.set()
+
+    async def listen(self):
+        while True:
+            while self.messages:
+                yield self.messages.popleft()
+            self.ready.clear()
+            await self.ready.wait()
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.server["channels"].get(channel, set()).discard(self)
+        self.channels.clear()
@@ -0,0 +1,160 @@
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.downsample import parse_interval
+
+DEFAULT_INTERVALS = ("1s", "1m", "5m", "1h")
+
+
+def candle_channel(symbol: str, interval: str) -> str:
+    """Subscription channel for a symbol's candles, e.g. ``BTCUSDT@candle_1m``"""
+    return f"{symbol}@candle_{interval}"
+
+
+def _iso(timestamp_ns: int) -> str:
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class Candle:
+    """OHLCV bar with running VWAP inputs"""
+
+    __slots__ = ("start_ns", "open", "high", "low", "close", "volume", "price_volume", "trades")
+
+    def __init__(self, start_ns: int, price: float, volume: float):
+        self.start_ns = start_ns
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.price_volume = price * volume
+        self.trades = 1
+
+    def update(self, price: float, volume: float):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += volume
+        self.price_volume += price * volume
+        self.trades += 1
+
+    @property
+    def vwap(self) -> float:
+        return self.price_volume / self.volume if self.volume else self.close
+
+    def to_dict(self, symbol: str, interval: str, interval_ns: int, closed: bool = True) -> Dict:
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "open_time": _iso(self.start_ns),
+            "close_time": _iso(self.start_ns + interval_ns),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "vwap": self.vwap,
+            "trades": self.trades,
+            "closed": closed,
+        }
+
+
+class CandleSeries:
+    """Current candle plus a bounded history of closed candles for one interval"""
+
+    def __init__(self, interval_ns: int, history: int = 500):
+        self.interval_ns = interval_ns
+        self.current: Optional[Candle] = None
+        self.closed: Deque[Candle] = deque(maxlen=history)
+
+    def update(self, timestamp_ns: int, price: float, volume: float) -> Optional[Candle]:
+        """
+        Fold one tick into the series in O(1)
+
+        Returns:
+            The candle closed by this tick, if the tick opened a new bucket
+        """
+        start_ns = timestamp_ns - timestamp_ns % self.interval_ns
+        current = self.current
+        if current is not None and start_ns == current.start_ns:
+            current.update(price, volume)
+            return None
+        if current is not None and start_ns < current.start_ns:
+            # Late tick for a bucket that has already closed
+            return None
+
+        self.current = Candle(start_ns, price, volume)
+        if current is not None:
+            self.closed.append(current)
+        return current
+
+
+class CandleAggregator:
+    """Incremental OHLCV/VWAP candles per symbol at several intervals"""
+
+    def __init__(self, intervals: Iterable[str] = DEFAULT_INTERVALS, history: int = 500):
+        self.intervals: Dict[str, int] = {name: parse_interval(name) for name in intervals}
+        self.history = history
+        self._series: Dict[str, Dict[str, CandleSeries]] = {}
+
+    def update(self, symbol: str, timestamp_ns: int, price: float, volume: float) -> List[Tuple[str, Candle]]:
+        """
+        Fold a tick into every interval for ``symbol``
+
+        Returns:
+            (interval, candle) pairs for candles closed by this tick
+        """
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = {
+                name: CandleSeries(interval_ns, self.history)
+                for name, interval_ns in self.intervals.items()
+            }
+
+        closed = []
+        for name, candles in series.items():
+            candle = candles.update(timestamp_ns, price, volume)
+            if candle is not None:
+                closed.append((name, candle))
+        return closed
+
+    def candles(self, symbol: str, interval: str, limit: int = 100) -> List[Dict]:
+        """Most recent candles, oldest first; the last one may still be open"""
+        series = self._series.get(symbol, {}).get(interval)
+        if series is None or limit <= 0:
+            return []
+
+        interval_ns = self.intervals[interval]
+        closed = list(series.closed)[-limit:]
+        result = [candle.to_dict(symbol, interval, interval_ns) for candle in closed]
+        if series.current is not None:
+            result.append(series.current.to_dict(symbol, interval, interval_ns, closed=False))
+        return result[-limit:]
+
+    def series(self, symbols: Sequence[str], interval: str, limit: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Close and volume of the last ``limit`` candles of many symbols
+
+        Rows follow ``symbols`` and columns run oldest to newest, the last
+        one being the open candle. Symbols with fewer candles are padded
+        with NaN on the left.
+
+        Returns:
+            (closes, volumes, last_start_ns); last_start_ns is -1 for
+            symbols without candles
+        """
+        closes = np.full((len(symbols), limit), np.nan)
+        volumes = np.full((len(symbols), limit), np.nan)
+        last_start_ns = np.full(len(symbols), -1, dtype=np.int64)
+        for row, symbol in enumerate(symbols):
+            series = self._series.get(symbol, {}).get(interval)
+            if series is None or series.current is None or limit <= 0:
+                continue
+            candles = list(series.closed)[1 - limit:] if limit > 1 else []
+            candles.append(series.current)
+            closes[row, limit - len(candles):] = [candle.close for candle in candles]
+            volumes[row, limit - len(candles):] = [candle.volume for candle in candles]
+            last_start_ns[row] = series.current.start_ns
+        return closes, volumes, last_start_ns
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from sqlalchemy.engine import make_url
 
 
 class Settings(BaseSettings):
@@ -10,6 +11,13 @@ class Settings(BaseSettings):
     db_name: str = "crypto_analytics"
     db_user: str = "postgres"
     db_password: str = "postgres"
+
+    # Connection pool (sync and async engines)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection
     
     # Redis
     redis_url: str = "redis://localhost:6379"
@@ -38,3 +46,19 @@ class Settings(BaseSettings):
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
+
+
+def sync_database_url(url: str) -> str:
+    """Strip async driver names so the URL works with a sync engine"""
+    return url.replace("+asyncpg", "").replace("+aiosqlite", "")
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a database URL for its async driver (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
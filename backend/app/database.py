@@ -1,26 +1,68 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-from app.models import Base
-from app.config import get_settings
-from typing import Generator
+from app.models import Base, orm_tables
+from app.config import async_database_url, get_settings
+from typing import AsyncGenerator, Dict, Generator
 
 settings = get_settings()
 
+
+def _pool_options(url: str) -> Dict:
+    """Pool settings from Settings; SQLite keeps its dialect's default pool"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+
 # Create engine
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
     echo=settings.debug,
+    **_pool_options(settings.database_url),
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routes that share the event loop with WebSocket fan-out
+ASYNC_DATABASE_URL = async_database_url(settings.database_url)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=settings.debug,
+    connect_args=(
+        {"prepared_statement_cache_size": settings.db_statement_cache_size}
+        if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg") else {}
+    ),
+    **_pool_options(ASYNC_DATABASE_URL),
+)
+
+# Sessions keep loaded attributes after commit, since lazy loads cannot
+# run implicitly under asyncio
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 
 def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine, tables=orm_tables(engine.dialect.name))
+
+
+async def init_async_db():
+    """Initialize database tables through the async engine"""
+    async with async_engine.begin() as connection:
+        await connection.run_sync(
+            Base.metadata.create_all, tables=orm_tables(connection.dialect.name)
+        )
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -30,3 +72,9 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
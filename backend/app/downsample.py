@@ -0,0 +1,119 @@
+import re
+from typing import Dict, List
+import numpy as np
+
+_INTERVAL_RE = re.compile(r"^(\d+)(s|m|h|d)$")
+_UNIT_NS = {
+    "s": 1_000_000_000,
+    "m": 60_000_000_000,
+    "h": 3_600_000_000_000,
+    "d": 86_400_000_000_000,
+}
+
+
+def parse_interval(interval: str) -> int:
+    """
+    Parse an interval such as ``30s``, ``1m``, ``5m`` or ``1h``
+
+    Returns:
+        Interval length in nanoseconds
+    """
+    match = _INTERVAL_RE.match(interval.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid interval: {interval!r}")
+    return int(match.group(1)) * _UNIT_NS[match.group(2)]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal-count buckets in between, the point forming the largest triangle
+    with the previously kept point and the average of the next bucket.
+
+    Returns:
+        Sorted indices of the points to keep
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            avg_x = x[next_lo:next_hi].mean()
+            avg_y = y[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
+
+
+def ohlcv(
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    volumes: np.ndarray,
+    bucket_ns: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate ticks into time-aligned OHLCV buckets
+
+    Timestamps must be sorted. Empty buckets are omitted.
+    """
+    if len(timestamps) == 0:
+        empty = np.empty(0)
+        return {key: empty for key in ("timestamp", "open", "high", "low", "close", "volume")}
+
+    bucket = timestamps // bucket_ns
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    ends = np.concatenate((starts[1:], [len(timestamps)])) - 1
+
+    return {
+        "timestamp": bucket[starts] * bucket_ns,
+        "open": prices[starts],
+        "high": np.maximum.reduceat(prices, starts),
+        "low": np.minimum.reduceat(prices, starts),
+        "close": prices[ends],
+        "volume": np.add.reduceat(volumes, starts),
+    }
+
+
+def ohlcv_records(buckets: Dict[str, np.ndarray]) -> List[Dict]:
+    """Convert OHLCV buckets to JSON records; ``price`` mirrors ``close``"""
+    iso = np.datetime_as_string(buckets["timestamp"].astype("datetime64[ns]"), unit="us")
+    return [
+        {
+            "timestamp": timestamp,
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "volume": v,
+            "price": c,
+        }
+        for timestamp, o, h, l, c, v in zip(
+            iso.tolist(),
+            buckets["open"].tolist(),
+            buckets["high"].tolist(),
+            buckets["low"].tolist(),
+            buckets["close"].tolist(),
+            buckets["volume"].tolist(),
+        )
+    ]
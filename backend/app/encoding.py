@@ -0,0 +1,75 @@
+import json
+import struct
+from typing import Any, Iterable, List, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional
+    msgpack = None
+
+# Wire encodings a WebSocket client can negotiate
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODING_STRUCT = "struct"  # packed price updates; other messages stay JSON
+
+# Packed price_update frame: header (frame type, record count) followed by
+# fixed 28-byte records (symbol id, price, volume, epoch-ns timestamp),
+# all little-endian
+FRAME_PRICE_UPDATE = 1
+FRAME_HEADER = struct.Struct("<BH")
+PRICE_RECORD = struct.Struct("<Iddq")
+
+PriceRecord = Tuple[int, float, float, int]
+
+
+def dumps(obj: Any) -> str:
+    """Encode a message to a compact JSON text frame
+
+    Uses orjson when it is installed and falls back to the stdlib encoder
+    with the same separators Starlette uses for ``send_json``.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def available_encodings() -> List[str]:
+    encodings = [ENCODING_JSON, ENCODING_STRUCT]
+    if msgpack is not None:
+        encodings.append(ENCODING_MSGPACK)
+    return encodings
+
+
+def encode(message: Any, encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """Encode a message as a text (JSON) or binary (MessagePack) frame"""
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message)
+    return dumps(message)
+
+
+def pack_price_updates(records: Iterable[PriceRecord]) -> bytes:
+    """Pack (symbol id, price, volume, timestamp ns) records into one binary frame"""
+    records = list(records)
+    frame = bytearray(FRAME_HEADER.size + PRICE_RECORD.size * len(records))
+    FRAME_HEADER.pack_into(frame, 0, FRAME_PRICE_UPDATE, len(records))
+    offset = FRAME_HEADER.size
+    for record in records:
+        PRICE_RECORD.pack_into(frame, offset, *record)
+        offset += PRICE_RECORD.size
+    return bytes(frame)
+
+
+def unpack_price_updates(frame: bytes) -> List[PriceRecord]:
+    """Inverse of pack_price_updates"""
+    frame_type, count = FRAME_HEADER.unpack_from(frame, 0)
+    if frame_type != FRAME_PRICE_UPDATE:
+        raise ValueError(f"Not a price_update frame: {frame_type}")
+    return [
+        PRICE_RECORD.unpack_from(frame, FRAME_HEADER.size + i * PRICE_RECORD.size)
+        for i in range(count)
+    ]
@@ -0,0 +1,95 @@
+"""
+Fear & Greed index over arrays of symbols.
+
+Same formula as ``calculate_fear_greed_index`` in
+``spark/sentiment_analyzer.py`` (price change, volume ratio and volatility
+scores weighted 0.5/0.3/0.2), computed for every symbol in one NumPy call
+from the incremental candles instead of one Python call per symbol.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Index at least each level gets that label; the last has no bound
+FEAR_GREED_LABELS: Tuple[Tuple, ...] = (
+    (76, "Extreme Greed"),
+    (56, "Greed"),
+    (45, "Neutral"),
+    (25, "Fear"),
+    (None, "Extreme Fear"),
+)
+
+
+def fear_greed_index(price_change, volume_ratio, volatility) -> np.ndarray:
+    """
+    Element-wise Fear & Greed index (0 = extreme fear, 100 = extreme greed)
+
+    Args:
+        price_change: Price change in percent
+        volume_ratio: Current volume / average volume
+        volatility: Standard deviation of returns in percent
+
+    Returns:
+        int64 array of indices
+    """
+    price_score = np.clip(50 + np.asarray(price_change, dtype=np.float64) * 2, 0, 100)
+    volume_score = np.minimum(100, np.asarray(volume_ratio, dtype=np.float64) * 30)
+    volatility_score = np.clip(100 - np.asarray(volatility, dtype=np.float64) * 10, 0, 100)
+    index = price_score * 0.5 + volume_score * 0.3 + volatility_score * 0.2
+    return np.trunc(index).astype(np.int64)
+
+
+def fear_greed_label(index: int) -> str:
+    for bound, label in FEAR_GREED_LABELS:
+        if bound is None or index >= bound:
+            return label
+
+
+def latest_fear_greed(closes: np.ndarray, volumes: np.ndarray, lookback: int) -> Dict[str, np.ndarray]:
+    """
+    Index inputs for the latest window of each row
+
+    ``closes`` and ``volumes`` are (symbols, windows) arrays, oldest
+    window first, NaN-padded on the left (``CandleAggregator.series``),
+    holding the last ``lookback + 1`` windows. As in
+    ``add_fear_greed_index``, each input covers the last ``lookback``
+    windows and every window's return is taken against the one before it:
+    - price_change: % change of the last close since the first one
+    - volume_ratio: last volume / mean volume (1.0 when the mean is 0)
+    - volatility: sample stddev of the ``lookback`` close-to-close
+      returns in percent (0.0 with fewer than two returns)
+
+    Returns:
+        Arrays keyed by input name plus ``index`` and ``windows`` (candles
+        seen per row, at most ``lookback``)
+    """
+    returns_closes = closes[:, -lookback - 1:]
+    closes, volumes = closes[:, -lookback:], volumes[:, -lookback:]
+    windows = np.count_nonzero(~np.isnan(closes), axis=1)
+    rows = np.flatnonzero(windows)
+    first = closes[rows, closes.shape[1] - windows[rows]]
+    last = closes[rows, -1]
+
+    price_change = np.zeros(len(closes))
+    volume_ratio = np.ones(len(closes))
+    volatility = np.zeros(len(closes))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_change[rows] = (last / first - 1) * 100
+
+        mean_volume = np.nanmean(volumes[rows], axis=1)
+        volume_ratio[rows] = np.divide(
+            volumes[rows, -1], mean_volume, out=np.ones(len(rows)), where=mean_volume > 0
+        )
+
+        returns = returns_closes[:, 1:] / returns_closes[:, :-1] - 1
+        counts = np.count_nonzero(~np.isnan(returns), axis=1)
+        varied = np.flatnonzero(counts > 1)
+        volatility[varied] = np.nanstd(returns[varied], axis=1, ddof=1) * 100
+
+    return {
+        "price_change": price_change,
+        "volume_ratio": volume_ratio,
+        "volatility": volatility,
+        "index": fear_greed_index(price_change, volume_ratio, volatility),
+        "windows": windows,
+    }
@@ -0,0 +1,101 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+Window = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+TICK_BYTES = 24  # int64 timestamp + float64 price + float64 volume
+
+
+def capacity_within(depth: int, symbols: int, max_bytes: int) -> int:
+    """Ticks per symbol: ``depth``, lowered so ``symbols`` buffers fit in ``max_bytes``"""
+    return max(1, min(depth, max_bytes // (TICK_BYTES * max(symbols, 1))))
+
+
+class TickRingBuffer:
+    """Fixed-capacity columnar ring buffer of ticks for one symbol
+
+    Stores int64 epoch-ns timestamps and float64 price/volume in three
+    preallocated arrays (24 bytes per tick). Appends are O(1) and never
+    reallocate; once full, the oldest tick is overwritten. Logical index 0
+    is always the oldest tick still held.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.volumes = np.empty(capacity, dtype=np.float64)
+        self._head = 0  # next physical write position
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.prices.nbytes + self.volumes.nbytes
+
+    def append(self, timestamp_ns: int, price: float, volume: float):
+        i = self._head
+        self.timestamps[i] = timestamp_ns
+        self.prices[i] = price
+        self.volumes[i] = volume
+        self._head = i + 1 if i + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+
+    def window(self, start: int = 0, stop: int = None) -> Window:
+        """
+        Logical slice [start, stop) as (timestamps, prices, volumes)
+
+        Returns zero-copy views unless the slice straddles the wrap point,
+        in which case the two segments are concatenated.
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        if stop <= start:
+            return self.timestamps[:0], self.prices[:0], self.volumes[:0]
+
+        a = (self._head - self._size + start) % self.capacity
+        b = a + (stop - start)
+        if b <= self.capacity:
+            return self.timestamps[a:b], self.prices[a:b], self.volumes[a:b]
+
+        b -= self.capacity
+        return tuple(
+            np.concatenate((column[a:], column[:b]))
+            for column in (self.timestamps, self.prices, self.volumes)
+        )
+
+    def search(self, timestamp_ns: int) -> int:
+        """Logical index of the first tick at or after ``timestamp_ns`` (binary search)"""
+        if self._size == 0:
+            return 0
+        a = (self._head - self._size) % self.capacity
+        if a + self._size <= self.capacity:
+            return int(np.searchsorted(self.timestamps[a:a + self._size], timestamp_ns))
+
+        # Two physical segments: [a, capacity) holds older ticks than [0, head)
+        older = self.timestamps[a:]
+        if timestamp_ns <= older[-1]:
+            return int(np.searchsorted(older, timestamp_ns))
+        return len(older) + int(np.searchsorted(self.timestamps[:self._head], timestamp_ns))
+
+    def between(self, start_ns: int, stop_ns: int = None) -> Window:
+        """Ticks with ``start_ns <= timestamp < stop_ns``"""
+        stop = self._size if stop_ns is None else self.search(stop_ns)
+        return self.window(self.search(start_ns), stop)
+
+    def latest(self, n: int) -> Window:
+        """The most recent ``n`` ticks, oldest first"""
+        return self.window(max(0, self._size - n), self._size)
+
+
+def to_records(timestamps: np.ndarray, prices: np.ndarray, volumes: np.ndarray) -> List[Dict]:
+    """Convert a window to the JSON shape served by /api/historical"""
+    iso = np.datetime_as_string(timestamps.astype("datetime64[ns]"), unit="us")
+    return [
+        {"price": price, "volume": volume, "timestamp": timestamp}
+        for price, volume, timestamp in zip(prices.tolist(), volumes.tolist(), iso.tolist())
+    ]
@@ -0,0 +1,208 @@
+"""
+Database-backed history for ranges older than the in-memory ring buffers.
+
+``HistoryStore`` reads ``crypto_prices`` through the async engine in pages
+and yields records as they arrive, so the caller can stream a month of
+ticks without holding it in memory. Raw ticks are paged with a keyset
+cursor on ``(timestamp, id)``, which the ``idx_symbol_timestamp`` index
+serves without an OFFSET scan. OHLCV buckets are computed in SQL, one
+time slice per page, so the database only returns one row per bucket.
+"""
+import math
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from sqlalchemy import DateTime, bindparam, select, text, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import async_database_url
+from app.models import CryptoPrice
+
+Cursor = Tuple[int, int]  # (epoch microseconds, row id)
+
+_prices = CryptoPrice.__table__
+
+# Bucket start in epoch seconds; one expression per dialect
+_BUCKET = {
+    "postgresql": "floor(extract(epoch FROM timestamp) / :seconds) * :seconds",
+    "sqlite": "CAST(strftime('%s', timestamp) AS INTEGER) / :seconds * :seconds",
+}
+
+# open/close come from window functions over the same bucket, so each
+# bucket is one row of the outer GROUP BY
+_BUCKETS_SQL = """
+SELECT bucket, MIN(open) AS open, MAX(price) AS high, MIN(price) AS low,
+       MIN(close) AS close, SUM(volume_24h) AS volume
+FROM (
+    SELECT {bucket} AS bucket, price, volume_24h,
+           FIRST_VALUE(price) OVER (PARTITION BY {bucket} ORDER BY timestamp, id) AS open,
+           FIRST_VALUE(price) OVER (PARTITION BY {bucket} ORDER BY timestamp DESC, id DESC) AS close
+    FROM crypto_prices
+    WHERE symbol = :symbol AND timestamp >= :start AND timestamp < :stop
+) ticks
+GROUP BY bucket
+ORDER BY bucket
+"""
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    return "{}:{}".format(*cursor)
+
+
+def decode_cursor(value: str) -> Cursor:
+    """Parse ``<epoch_us>[:<id>]``; raises ValueError when malformed"""
+    micros, _, row_id = value.partition(":")
+    return int(micros), int(row_id or 0)
+
+
+def _iso(micros: int) -> str:
+    """Same timestamp format as app.history.to_records"""
+    return datetime.utcfromtimestamp(micros / 1e6).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _micros(value) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return round(value.timestamp() * 1e6)
+    return round(float(value) * 1e6)
+
+
+class HistoryStore:
+    """
+    Paged reads of persisted ticks
+
+    Every page is a separate short query on a pooled connection, so a
+    slow client never holds a transaction or a server-side cursor open
+    while the response streams.
+    """
+
+    def __init__(self, url: str, page_size: int = 5000):
+        self.url = url
+        self.page_size = page_size
+        self.engine = None
+
+    async def start(self):
+        self.engine = create_async_engine(async_database_url(self.url), pool_pre_ping=True)
+
+    async def close(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    def _timestamp(self, micros: int) -> datetime:
+        stamp = datetime.fromtimestamp(micros / 1e6, timezone.utc)
+        if self.engine.dialect.name == "sqlite":
+            # SQLite stores naive UTC text, compared as strings
+            return stamp.replace(tzinfo=None)
+        return stamp
+
+    async def ticks(
+        self,
+        symbol: str,
+        start_us: int,
+        stop_us: int,
+        cursor: Optional[Cursor] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[Cursor, Dict]]:
+        """
+        Raw ticks with ``start_us <= timestamp < stop_us``, oldest first
+
+        Args:
+            symbol: Trading symbol
+            start_us: Range start in epoch microseconds
+            stop_us: Range end in epoch microseconds
+            cursor: Resume after this (timestamp, id); from ``start_us`` if None
+            limit: Stop after this many ticks
+
+        Yields:
+            (cursor, record) with the cursor of the record just yielded
+        """
+        ts = _prices.c.timestamp
+        remaining = limit if limit is not None else math.inf
+        while remaining > 0:
+            query = (
+                select(ts, _prices.c.id, _prices.c.price, _prices.c.volume_24h)
+                .where(_prices.c.symbol == symbol, ts < self._timestamp(stop_us))
+                .order_by(ts, _prices.c.id)
+                .limit(int(min(self.page_size, remaining)))
+            )
+            if cursor is None:
+                query = query.where(ts >= self._timestamp(start_us))
+            else:
+                query = query.where(tuple_(ts, _prices.c.id) > (self._timestamp(cursor[0]), cursor[1]))
+
+            async with self.engine.connect() as connection:
+                rows = (await connection.execute(query)).all()
+
+            for timestamp, row_id, price, volume in rows:
+                cursor = (_micros(timestamp), row_id)
+                yield cursor, {"price": price, "volume": volume, "timestamp": _iso(cursor[0])}
+            remaining -= len(rows)
+            if len(rows) < self.page_size:
+                return
+
+    async def latest(self, symbol: str, start_us: int, limit: int) -> AsyncIterator[Dict]:
+        """The most recent ``limit`` ticks since ``start_us``, oldest first"""
+        ts = _prices.c.timestamp
+        query = (
+            select(ts, _prices.c.price, _prices.c.volume_24h)
+            .where(_prices.c.symbol == symbol, ts >= self._timestamp(start_us))
+            .order_by(ts.desc(), _prices.c.id.desc())
+            .limit(limit)
+        )
+        async with self.engine.connect() as connection:
+            rows = (await connection.execute(query)).all()
+        for timestamp, price, volume in reversed(rows):
+            yield {"price": price, "volume": volume, "timestamp": _iso(_micros(timestamp))}
+
+    async def buckets(
+        self,
+        symbol: str,
+        start_us: int,
+        stop_us: int,
+        bucket_seconds: int,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[Cursor, Dict]]:
+        """
+        OHLCV buckets aggregated by the database, oldest first
+
+        Each page covers ``page_size`` buckets of time, so a page query
+        touches a bounded slice of the index (and of the partitions).
+
+        Yields:
+            (cursor, record) where the cursor resumes at the next bucket
+        """
+        bucket_seconds = max(1, int(bucket_seconds))
+        span_us = bucket_seconds * 1_000_000
+        sql = text(_BUCKETS_SQL.format(bucket=_BUCKET.get(self.engine.dialect.name, _BUCKET["postgresql"]))).bindparams(
+            bindparam("start", type_=DateTime(timezone=True)),
+            bindparam("stop", type_=DateTime(timezone=True)),
+        )
+        remaining = limit if limit is not None else math.inf
+
+        page_start = start_us
+        while page_start < stop_us and remaining > 0:
+            page_stop = min(stop_us, (page_start // span_us + self.page_size) * span_us)
+            async with self.engine.connect() as connection:
+                rows = (await connection.execute(sql, {
+                    "symbol": symbol,
+                    "seconds": bucket_seconds,
+                    "start": self._timestamp(page_start),
+                    "stop": self._timestamp(page_stop),
+                })).all()
+
+            for bucket, o, h, l, c, v in rows:
+                if remaining <= 0:
+                    return
+                micros = int(bucket) * 1_000_000
+                remaining -= 1
+                yield (micros + span_us, 0), {
+                    "timestamp": _iso(micros),
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": v,
+                    "price": c,
+                }
+            page_start = page_stop
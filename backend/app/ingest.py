@@ -0,0 +1,367 @@
+"""
+Pluggable market-data ingest.
+
+Every source is an async iterator of tick batches (``List[Tick]``); the
+backend consumes them the same way whether prices come from the
+simulator, an exchange WebSocket feed, or a recorded file.
+"""
+import asyncio
+import csv
+import json
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from app.simulator import GBMSimulator
+
+
+class Tick(NamedTuple):
+    symbol: str
+    price: float
+    volume: float
+    timestamp_ns: int
+
+
+class TickSource:
+    """Base class: iterate with ``async for batch in source``"""
+
+    def __aiter__(self) -> AsyncIterator[List[Tick]]:
+        return self.batches()
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+
+def parse_timestamp(value) -> int:
+    """Epoch seconds/ms/us/ns or an ISO-8601 string to epoch nanoseconds"""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp() * 1e9)
+
+    magnitude = abs(value)
+    if magnitude >= 1e17:
+        return int(value)
+    if magnitude >= 1e14:
+        return int(value * 1_000)
+    if magnitude >= 1e11:
+        return int(value * 1_000_000)
+    return int(value * 1_000_000_000)
+
+
+# ---------------------------------------------------------------------------
+# Simulators
+# ---------------------------------------------------------------------------
+
+class RandomWalkSource(TickSource):
+    """Independent uniform +/-0.5% moves per symbol (the original simulator)"""
+
+    def __init__(self, symbols: Sequence[str], initial_prices: Sequence[float], tick_hz: float = 0.5):
+        self.symbols = list(symbols)
+        self.prices = list(initial_prices)
+        self.interval = 1 / tick_hz
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        while True:
+            batch = []
+            for i, symbol in enumerate(self.symbols):
+                self.prices[i] *= 1 + random.uniform(-0.5, 0.5) / 100
+                batch.append(Tick(symbol, self.prices[i], random.uniform(1e9, 10e9), time.time_ns()))
+            yield batch
+            await asyncio.sleep(self.interval)
+
+
+class SimulatorSource(TickSource):
+    """Ticks from a vectorized GBMSimulator on a fixed-rate schedule"""
+
+    def __init__(self, simulator: GBMSimulator, tick_hz: float = 0.5):
+        self.simulator = simulator
+        self.interval = 1 / tick_hz
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        symbols = self.simulator.symbols
+
+        while True:
+            prices, volumes = self.simulator.step()
+            now_ns = time.time_ns()
+            yield [
+                Tick(symbol, price, volume, now_ns)
+                for symbol, price, volume in zip(symbols, prices.tolist(), volumes.tolist())
+            ]
+            # Time spent by the consumer counts against the interval
+            next_tick += self.interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+
+# ---------------------------------------------------------------------------
+# Exchange feed
+# ---------------------------------------------------------------------------
+
+def parse_exchange_message(message: Dict) -> Optional[Tick]:
+    """Binance trade / 24hr mini-ticker event to a Tick (None for other messages)"""
+    event = message.get("data", message)  # combined streams wrap the payload
+    event_type = event.get("e")
+    if event_type == "trade":
+        return Tick(event["s"], float(event["p"]), float(event["q"]), int(event["T"]) * 1_000_000)
+    if event_type == "24hrMiniTicker":
+        return Tick(event["s"], float(event["c"]), float(event["q"]), int(event["E"]) * 1_000_000)
+    return None
+
+
+class ExchangeWebSocketSource(TickSource):
+    """
+    Live ticks from a Binance-compatible WebSocket feed
+
+    Connects to ``url`` (``Settings.binance_ws_url`` by default), sends a
+    SUBSCRIBE request for ``<symbol>@<stream>`` on every symbol, and
+    reconnects with exponential backoff. Any server that speaks the same
+    protocol, such as ``LocalExchangeFeed``, can stand in for the exchange.
+
+    The default ``miniTicker`` stream carries the 24h quote volume the
+    backend stores as ``volume_24h``. With ``stream="trade"`` a tick's
+    volume is the size of a single trade instead.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        symbols: Sequence[str],
+        stream: str = "miniTicker",
+        max_backoff: float = 30.0,
+    ):
+        self.url = url
+        self.symbols = list(symbols)
+        self.stream = stream
+        self.max_backoff = max_backoff
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        import websockets
+
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    await ws.send(json.dumps({
+                        "method": "SUBSCRIBE",
+                        "params": [f"{symbol.lower()}@{self.stream}" for symbol in self.symbols],
+                        "id": 1,
+                    }))
+                    backoff = 1.0
+                    async for raw in ws:
+                        tick = parse_exchange_message(json.loads(raw))
+                        if tick is not None:
+                            yield [tick]
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Exchange feed error: {e}; reconnecting in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+
+class LocalExchangeFeed:
+    """
+    Minimal Binance-style WebSocket server for local runs and tests
+
+    Accepts SUBSCRIBE requests and streams the given ticks to every
+    connection, filtered by the subscribed symbols: as ``trade`` events on
+    ``@trade`` subscriptions, otherwise as ``24hrMiniTicker`` events with
+    the tick's volume as the 24h quote volume::
+
+        async with LocalExchangeFeed(ticks, port=9443) as feed:
+            source = ExchangeWebSocketSource(feed.url, ["BTCUSDT"])
+    """
+
+    def __init__(self, ticks: Iterable[Tick], host: str = "127.0.0.1", port: int = 0, interval: float = 0.0):
+        self.ticks = list(ticks)
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    async def __aenter__(self) -> "LocalExchangeFeed":
+        import websockets
+
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws, *args):
+        request = json.loads(await ws.recv())
+        streams = dict(param.split("@", 1) for param in request.get("params", []))
+        symbols = {symbol.upper(): stream for symbol, stream in streams.items()}
+        await ws.send(json.dumps({"result": None, "id": request.get("id")}))
+
+        for tick in self.ticks:
+            stream = symbols.get(tick.symbol)
+            if stream is None:
+                continue
+            event_ms = tick.timestamp_ns // 1_000_000
+            if stream == "trade":
+                event = {
+                    "e": "trade",
+                    "E": event_ms,
+                    "s": tick.symbol,
+                    "p": repr(tick.price),
+                    "q": repr(tick.volume),
+                    "T": event_ms,
+                }
+            else:
+                event = {
+                    "e": "24hrMiniTicker",
+                    "E": event_ms,
+                    "s": tick.symbol,
+                    "c": repr(tick.price),
+                    "q": repr(tick.volume),
+                }
+            await ws.send(json.dumps(event))
+            await asyncio.sleep(self.interval)
+        await ws.wait_closed()
+
+
+# ---------------------------------------------------------------------------
+# File replay
+# ---------------------------------------------------------------------------
+
+def _row_to_tick(row: Dict) -> Tick:
+    return Tick(
+        row["symbol"],
+        float(row["price"]),
+        float(row.get("volume") or 0.0),
+        parse_timestamp(row["timestamp"]),
+    )
+
+
+def read_ticks(path: str) -> Iterator[Tick]:
+    """Stream ticks from a JSONL, CSV or Parquet recording
+
+    Rows need ``symbol``, ``price`` and ``timestamp`` and may have
+    ``volume``. Parquet requires pyarrow.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield _row_to_tick(json.loads(line))
+    elif suffix == ".csv":
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield _row_to_tick(row)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                yield _row_to_tick(row)
+    else:
+        raise ValueError(f"Unsupported recording format: {path}")
+
+
+def write_ticks(path: str, ticks: Iterable[Tick]) -> int:
+    """Record ticks as JSONL; returns the number written"""
+    count = 0
+    with open(path, "w") as f:
+        for tick in ticks:
+            f.write(json.dumps({
+                "symbol": tick.symbol,
+                "price": tick.price,
+                "volume": tick.volume,
+                "timestamp": tick.timestamp_ns,
+            }, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+class ReplaySource(TickSource):
+    """
+    Replay a recording at 1x, Nx, or maximum speed
+
+    ``speed`` scales the recorded inter-tick gaps; ``None`` (or ``0``)
+    replays as fast as the consumer allows, which doubles as a throughput
+    benchmark. Ticks due at the same moment are yielded together, up to
+    ``batch_size``. With ``rebase_timestamps`` the recording is shifted so
+    its first tick lands at the current time.
+
+    With ``loop`` each pass is shifted to start just after the last
+    timestamp of the previous pass (or at the current time, if later), so
+    timestamps keep increasing across passes at any speed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = 1.0,
+        batch_size: int = 1000,
+        rebase_timestamps: bool = True,
+        loop: bool = False,
+    ):
+        self.path = path
+        self.speed = speed or None
+        self.batch_size = batch_size
+        self.rebase_timestamps = rebase_timestamps
+        self.loop = loop
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        last_ns = None
+        while True:
+            async for batch in self._replay_once(last_ns):
+                last_ns = batch[-1].timestamp_ns if last_ns is None else max(last_ns, batch[-1].timestamp_ns)
+                yield batch
+            if not self.loop:
+                return
+
+    async def _replay_once(self, after_ns: Optional[int] = None) -> AsyncIterator[List[Tick]]:
+        event_loop = asyncio.get_running_loop()
+        started = event_loop.time()
+        first_ns = None
+        offset_ns = 0
+        batch: List[Tick] = []
+
+        for tick in read_ticks(self.path):
+            if first_ns is None:
+                first_ns = tick.timestamp_ns
+                start_ns = time.time_ns() if self.rebase_timestamps else first_ns
+                if after_ns is not None:
+                    start_ns = max(start_ns, after_ns + 1)
+                offset_ns = start_ns - first_ns
+            if offset_ns:
+                tick = tick._replace(timestamp_ns=tick.timestamp_ns + offset_ns)
+
+            if self.speed is not None:
+                due = started + (tick.timestamp_ns - offset_ns - first_ns) / 1e9 / self.speed
+                delay = due - event_loop.time()
+                if delay > 0 and batch:
+                    yield batch
+                    batch = []
+                    delay = due - event_loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            batch.append(tick)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+                if self.speed is None:
+                    await asyncio.sleep(0)  # let other tasks run at max speed
+
+        if batch:
+            yield batch
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
 import asyncio
 import os
 
+from app.database import get_async_db
+from app.models import CryptoPrice
+
 # For deployment without database - use main_simple.py instead
 # This file requires PostgreSQL, Redis, and other dependencies
 
@@ -65,6 +70,30 @@ async def get_tracked_cryptos():
     }
 
 
+@app.get("/api/prices/{symbol}")
+async def get_current_price(symbol: str, db: AsyncSession = Depends(get_async_db)):
+    """Get the latest stored price for a symbol"""
+    symbol = symbol.upper()
+    result = await db.execute(
+        select(CryptoPrice)
+        .where(CryptoPrice.symbol == symbol)
+        .order_by(CryptoPrice.timestamp.desc())
+        .limit(1)
+    )
+    price = result.scalar_one_or_none()
+    if price is None:
+        raise HTTPException(status_code=404, detail="Symbol not found")
+
+    return {
+        "symbol": price.symbol,
+        "name": price.name,
+        "price": price.price,
+        "volume_24h": price.volume_24h,
+        "price_change_24h": price.price_change_24h,
+        "timestamp": price.timestamp.isoformat()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
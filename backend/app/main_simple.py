@@ -1,11 +1,48 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, List
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional, Set
 from datetime import datetime, timedelta
 import asyncio
+from collections import deque
 import json
+import math
 import random
+import time
 import os
+import sys
+
+if not __package__:
+    # `python app/main_simple.py` puts app/ on sys.path rather than backend/
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.backplane import Backplane, InProcessBackplane, RedisBackplane
+from app.candles import CandleAggregator, candle_channel
+from app.downsample import lttb, ohlcv, ohlcv_records, parse_interval
+from app.encoding import (
+    ENCODING_JSON,
+    ENCODING_STRUCT,
+    available_encodings,
+    dumps,
+    encode,
+    pack_price_updates,
+)
+from app.fear_greed import fear_greed_label, latest_fear_greed
+from app.history import TickRingBuffer, capacity_within, to_records
+from app.rolling_stats import RollingStatsEngine
+from app.simulator import GBMSimulator, synthetic_symbols
+from app.ingest import (
+    ExchangeWebSocketSource,
+    RandomWalkSource,
+    ReplaySource,
+    SimulatorSource,
+    TickSource,
+)
+from app.config import get_settings
+from app.outbound import ClientQueue, OverflowPolicy
+from app.response_cache import ResponseCache
+from app.protocol import PROTOCOL_V1, PROTOCOL_V2, SHORT_KEYS, DeltaTracker, snapshot_message
+from app.subscriptions import SubscriptionRegistry
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,47 +69,360 @@ app.add_middleware(
 # Default tracked symbols
 TRACKED_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT"]
 
+# Price simulator: "random" (per-symbol uniform moves) or "gbm" (vectorized
+# geometric Brownian motion). SIMULATOR_SYMBOLS pads the tracked list with
+# synthetic SIMxxxxxUSDT symbols for load testing.
+SIMULATOR_MODE = os.getenv("SIMULATOR_MODE", "random")
+SIMULATOR_SYMBOLS = int(os.getenv("SIMULATOR_SYMBOLS", len(TRACKED_SYMBOLS)))
+SIMULATOR_TICK_HZ = float(os.getenv("SIMULATOR_TICK_HZ", 0.5))
+SIMULATOR_SEED = int(os.environ["SIMULATOR_SEED"]) if os.getenv("SIMULATOR_SEED") else None
+SIMULATOR_DRIFT = float(os.getenv("SIMULATOR_DRIFT", 0.0))
+SIMULATOR_VOLATILITY = float(os.getenv("SIMULATOR_VOLATILITY", 0.8))
+
+if SIMULATOR_SYMBOLS > len(TRACKED_SYMBOLS):
+    TRACKED_SYMBOLS += synthetic_symbols(SIMULATOR_SYMBOLS - len(TRACKED_SYMBOLS))
+
+# Market data source: "simulator", "exchange" (Settings.binance_ws_url) or
+# "replay" (REPLAY_PATH at REPLAY_SPEED, a multiplier or "max")
+INGEST_SOURCE = os.getenv("INGEST_SOURCE", "simulator")
+REPLAY_PATH = os.getenv("REPLAY_PATH", "")
+REPLAY_SPEED = os.getenv("REPLAY_SPEED", "1")
+
+# Tick distribution across workers: "inprocess" (single worker) or "redis"
+# (Settings.redis_url pub/sub; one elected worker runs the ingest source)
+BACKPLANE = os.getenv("BACKPLANE", "inprocess")
+
+# Write-behind tick persistence to crypto_prices (off by default). The
+# producer worker buffers ticks and bulk-writes them from a thread;
+# PERSIST_DATABASE_URL defaults to Settings.database_url and may be SQLite.
+PERSIST_TICKS = os.getenv("PERSIST_TICKS", "false").lower() in ("1", "true", "yes")
+PERSIST_DATABASE_URL = os.getenv("PERSIST_DATABASE_URL", "")
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", 5000))
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", 1.0))
+PERSIST_MAX_BUFFER = int(os.getenv("PERSIST_MAX_BUFFER", 200_000))
+# With a stalled database the buffer fills up: drop its oldest rows so the
+# feed keeps flowing, or (false) hold the producer until a flush makes room
+PERSIST_DROP_WHEN_FULL = os.getenv("PERSIST_DROP_WHEN_FULL", "true").lower() in ("1", "true", "yes")
+
+# Ticks kept per symbol (24 bytes each); default is 24h at one tick every 2s.
+# The ring buffers are preallocated, so HISTORY_MAX_MB caps them all together:
+# with many (e.g. synthetic) symbols each one keeps proportionally fewer ticks
+HISTORY_DEPTH = int(os.getenv("HISTORY_DEPTH", 43_200))
+HISTORY_MAX_MB = float(os.getenv("HISTORY_MAX_MB", 256))
+
+# Redis Streams feed for the Spark jobs (off by default): the producer
+# worker XADDs every tick to TICK_STREAM_KEY at Settings.redis_url, capped
+# at about TICK_STREAM_MAXLEN entries
+TICK_STREAM = os.getenv("TICK_STREAM", "false").lower() in ("1", "true", "yes")
+TICK_STREAM_KEY = os.getenv("TICK_STREAM_KEY", "ticks:stream")
+TICK_STREAM_MAXLEN = int(os.getenv("TICK_STREAM_MAXLEN", 100_000))
+# Also keep price:<symbol> and the price:updated index for the Spark batch path
+TICK_STREAM_LATEST = os.getenv("TICK_STREAM_LATEST", "false").lower() in ("1", "true", "yes")
+
+# /api/historical falls back to crypto_prices (off by default) for ranges
+# starting more than HISTORY_DB_SLACK seconds before the ring buffer's
+# oldest tick, and for cursor / NDJSON requests. The URL defaults to
+# PERSIST_DATABASE_URL, then Settings.database_url.
+HISTORY_DB = os.getenv("HISTORY_DB", "false").lower() in ("1", "true", "yes")
+HISTORY_DATABASE_URL = os.getenv("HISTORY_DATABASE_URL", "")
+HISTORY_DB_SLACK = float(os.getenv("HISTORY_DB_SLACK", 60))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 5000))
+
+# /api/fear-greed defaults: candle interval and candles per rolling input
+# (24h of 5m candles; capped by the candle history kept in memory)
+FEAR_GREED_INTERVAL = os.getenv("FEAR_GREED_INTERVAL", "5m")
+FEAR_GREED_LOOKBACK = int(os.getenv("FEAR_GREED_LOOKBACK", 288))
+
+# Stable numeric ids for packed (struct) price frames
+SYMBOL_IDS: Dict[str, int] = {symbol: i for i, symbol in enumerate(TRACKED_SYMBOLS)}
+
 # In-memory storage
 price_data: Dict[str, Dict] = {}
-historical_data: Dict[str, List] = {symbol: [] for symbol in TRACKED_SYMBOLS}
+price_timestamps_ns: Dict[str, int] = {}
+HISTORY_CAPACITY = capacity_within(HISTORY_DEPTH, len(TRACKED_SYMBOLS), int(HISTORY_MAX_MB * 2**20))
+historical_data: Dict[str, TickRingBuffer] = {
+    symbol: TickRingBuffer(HISTORY_CAPACITY) for symbol in TRACKED_SYMBOLS
+}
+candle_aggregator = CandleAggregator()
+stats_engine = RollingStatsEngine()
+recent_alerts: deque = deque(maxlen=int(os.getenv("ALERT_HISTORY", 200)))
+
+# Encoded REST responses, invalidated per symbol by tick sequence number.
+# CACHE_MAX_AGE (seconds) lets browsers and proxies reuse them without
+# revalidating; 0 sends no-cache so every poll revalidates with its ETag.
+response_cache = ResponseCache(int(os.getenv("RESPONSE_CACHE_ENTRIES", 1024)))
+CACHE_MAX_AGE = int(os.getenv("CACHE_MAX_AGE", 0))
+
+# Per-client outbound queue settings
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", 256))
+WS_OVERFLOW_POLICY = OverflowPolicy(os.getenv("WS_OVERFLOW_POLICY", OverflowPolicy.COALESCE.value))
+
+# Default for clients that do not negotiate batching: one frame per ingest
+# cycle carrying all of the client's price updates
+WS_BATCH_TICKS = os.getenv("WS_BATCH_TICKS", "false").lower() in ("1", "true", "yes")
 
 # WebSocket connection manager
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.subscriptions: Dict[WebSocket, set] = {}
+    def __init__(
+        self,
+        queue_size: int = WS_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = WS_OVERFLOW_POLICY,
+        serialize_once: bool = True,
+    ):
+        self.registry = SubscriptionRegistry()
+        self.queues: Dict[WebSocket, ClientQueue] = {}
+        self.protocols: Dict[WebSocket, int] = {}
+        self.encodings: Dict[WebSocket, str] = {}
+        self.batching: Set[WebSocket] = set()
+        self.deltas = DeltaTracker()
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.serialize_once = serialize_once
+        # symbol -> [record, timestamp_ns, merged v2 delta, coalescable]
+        # while a broadcast cycle is open
+        self._cycle: Optional[Dict[str, list]] = None
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        protocol: int = PROTOCOL_V1,
+        max_rate: Optional[float] = None,
+        encoding: str = ENCODING_JSON,
+        batch: bool = WS_BATCH_TICKS,
+    ):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        self.subscriptions[websocket] = set()
+        self.registry.add_client(websocket)
+        queue = ClientQueue(
+            websocket,
+            maxsize=self.queue_size,
+            policy=self.overflow_policy,
+            on_close=self.disconnect,
+            max_rate=max_rate,
+        )
+        self.queues[websocket] = queue
+        self.protocols[websocket] = protocol
+        self.encodings[websocket] = encoding
+        if batch:
+            self.batching.add(websocket)
+        queue.start()
+
+    def configure(
+        self,
+        websocket: WebSocket,
+        protocol: int,
+        max_rate: Optional[float] = None,
+        encoding: str = ENCODING_JSON,
+        batch: bool = WS_BATCH_TICKS,
+    ):
+        """Switch a client's protocol version, rate cap, wire encoding and batching"""
+        if websocket in self.queues:
+            self.protocols[websocket] = protocol
+            self.encodings[websocket] = encoding
+            if batch:
+                self.batching.add(websocket)
+            else:
+                self.batching.discard(websocket)
+            self.queues[websocket].set_max_rate(max_rate)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if websocket in self.subscriptions:
-            del self.subscriptions[websocket]
+        self.registry.remove_client(websocket)
+        self.protocols.pop(websocket, None)
+        self.encodings.pop(websocket, None)
+        self.batching.discard(websocket)
+        queue = self.queues.pop(websocket, None)
+        if queue is not None:
+            queue.close()
 
     async def subscribe(self, websocket: WebSocket, symbol: str):
-        if websocket in self.subscriptions:
-            self.subscriptions[websocket].add(symbol)
+        self.registry.subscribe(websocket, symbol)
 
     async def unsubscribe(self, websocket: WebSocket, symbol: str):
-        if websocket in self.subscriptions:
-            self.subscriptions[websocket].discard(symbol)
+        self.registry.unsubscribe(websocket, symbol)
+
+    def _encode(self, message: dict, encoding: str):
+        if encoding == ENCODING_JSON and not self.serialize_once:
+            return message  # encoded by send_json in the writer
+        return encode(message, encoding)
+
+    async def send(self, websocket: WebSocket, message: dict):
+        """Queue a message for a single client in its wire encoding"""
+        queue = self.queues.get(websocket)
+        if queue is None:
+            return
+        frame = self._encode(message, self.encodings.get(websocket, ENCODING_JSON))
+        if not queue.put(frame):
+            self.disconnect(websocket)
 
-    async def broadcast(self, symbol: str, message: dict):
+    async def broadcast(self, symbol: str, message: dict, coalesce: bool = True):
+        """
+        Queue a message for every subscriber; never waits on a socket
+
+        With ``coalesce`` a pending message for the same symbol may be
+        replaced by this one (COALESCE policy); pass False for events that
+        must not be superseded, such as alerts.
+        """
+        subscribers = self.registry.subscribers(symbol)
+        if not subscribers:
+            return
+
+        # Encode once per encoding and share the frame
+        frames = {}
         disconnected = []
-        for connection in self.active_connections:
-            if symbol in self.subscriptions.get(connection, set()):
-                try:
-                    await connection.send_json(message)
-                except:
-                    disconnected.append(connection)
+        for connection in subscribers:
+            encoding = self.encodings.get(connection, ENCODING_JSON)
+            frame = frames.get(encoding)
+            if frame is None:
+                frame = frames[encoding] = self._encode(message, encoding)
+            if not self.queues[connection].put(frame, key=symbol if coalesce else None):
+                disconnected.append(connection)
         
         for connection in disconnected:
             self.disconnect(connection)
 
+    async def broadcast_price(self, symbol: str, record: dict, timestamp_ns: int):
+        """
+        Fan out a price tick in each subscriber's protocol version
+
+        v1 clients get the full price_update record and v2 clients a
+        compact delta, each in the client's wire encoding. Every
+        (protocol, encoding) variant is built and encoded at most once.
+        While a cycle is open, batching clients are skipped and the tick
+        is held for ``flush_cycle``.
+        """
+        subscribers = self.registry.subscribers(symbol)
+        if not subscribers:
+            return
+
+        frames = {}
+        delta = None
+        held = False
+        disconnected = []
+        for connection in subscribers:
+            protocol = self.protocols.get(connection, PROTOCOL_V1)
+            if self._cycle is not None and connection in self.batching:
+                # Every v2 tick goes through the tracker exactly once
+                if protocol == PROTOCOL_V2 and delta is None:
+                    delta = self.deltas.delta(symbol, record, timestamp_ns)
+                held = True
+                continue
+            encoding = self.encodings.get(connection, ENCODING_JSON)
+            entry = frames.get((protocol, encoding))
+            if entry is None:
+                if protocol == PROTOCOL_V2 and delta is None:
+                    delta = self.deltas.delta(symbol, record, timestamp_ns)
+                entry = frames[(protocol, encoding)] = self._price_frame(
+                    symbol, record, timestamp_ns, protocol, encoding, delta
+                )
+            frame, pin = entry
+            if not self.queues[connection].put(frame, key=symbol, pin=pin):
+                disconnected.append(connection)
+
+        if held:
+            self._hold(symbol, record, timestamp_ns, delta)
+
+        for connection in disconnected:
+            self.disconnect(connection)
+
+    def _hold(self, symbol, record, timestamp_ns, delta):
+        """Keep the latest tick of a symbol for the open cycle"""
+        pending = self._cycle.get(symbol)
+        if pending is None:
+            pending = self._cycle[symbol] = [record, timestamp_ns, None, True]
+        pending[1] = timestamp_ns
+        if delta is not None:
+            message, coalescable = delta
+            # Later volatile fields win; changed static fields accumulate
+            pending[2] = {**pending[2], **message} if pending[2] else message
+            pending[3] = pending[3] and coalescable
+
+    def begin_cycle(self):
+        """Start collecting price ticks for batching clients"""
+        if self._cycle is None:
+            self._cycle = {}
+
+    async def flush_cycle(self):
+        """
+        Send each batching client one frame with all of its ticks from the cycle
+
+        Clients are grouped by protocol, encoding and the set of symbols
+        updated for them, and each group shares a single encoded frame. A
+        frame may replace a pending frame for the same symbol set, as long
+        as it carries no one-off static field changes.
+        """
+        cycle, self._cycle = self._cycle, None
+        if not cycle:
+            return
+
+        groups: Dict[tuple, list] = {}
+        for connection in self.batching:
+            subscribed = self.registry.symbols(connection)
+            symbols = frozenset(symbol for symbol in subscribed if symbol in cycle)
+            if not symbols:
+                continue
+            variant = (
+                self.protocols.get(connection, PROTOCOL_V1),
+                self.encodings.get(connection, ENCODING_JSON),
+                symbols,
+            )
+            groups.setdefault(variant, []).append(connection)
+
+        disconnected = []
+        for (protocol, encoding, symbols), connections in groups.items():
+            ticks = [cycle[symbol] for symbol in sorted(symbols)]
+            frames = self._batch_frames(ticks, protocol, encoding)
+            coalescable = all(tick[3] for tick in ticks)
+            key = ("batch", symbols) if coalescable else None
+            for connection in connections:
+                queue = self.queues.get(connection)
+                if queue is None:
+                    continue
+                if not all(queue.put(frame, key=key) for frame in frames):
+                    disconnected.append(connection)
+
+        for connection in disconnected:
+            self.disconnect(connection)
+
+    def _batch_frames(self, ticks, protocol, encoding) -> list:
+        """Encoded frames for one group's ticks (two for struct with static changes)"""
+        frames = []
+        if encoding == ENCODING_STRUCT:
+            frames.append(pack_price_updates(
+                (SYMBOL_IDS[record["symbol"]], record["price"], record["volume_24h"], timestamp_ns)
+                for record, timestamp_ns, _, _ in ticks
+            ))
+            # Static field changes follow as a JSON delta batch
+            ticks = [tick for tick in ticks if not tick[3]]
+            if not ticks or protocol != PROTOCOL_V2:
+                return frames
+
+        if protocol == PROTOCOL_V2:
+            message = {"e": "b", "u": [delta for _, _, delta, _ in ticks]}
+        else:
+            message = {"type": "price_batch", "updates": [dict(record) for record, _, _, _ in ticks]}
+        frames.append(self._encode(message, encoding))
+        return frames
+
+    def _price_frame(self, symbol, record, timestamp_ns, protocol, encoding, delta):
+        """(frame, pin) for one price tick in one protocol/encoding variant"""
+        if protocol == PROTOCOL_V2:
+            message, coalescable = delta
+        else:
+            message, coalescable = {"type": "price_update", **record}, True
+
+        if encoding == ENCODING_STRUCT and coalescable:
+            return pack_price_updates([
+                (SYMBOL_IDS[symbol], record["price"], record["volume_24h"], timestamp_ns)
+            ]), False
+        # Static field changes reach struct clients as a JSON delta
+        return self._encode(message, encoding), not coalescable
+
+    def snapshot(self, websocket: WebSocket, symbol: str) -> dict:
+        """Current state of a symbol in the client's protocol version"""
+        if self.protocols.get(websocket) == PROTOCOL_V2:
+            self.deltas.seed(symbol, price_data[symbol])
+            return snapshot_message(price_data[symbol], price_timestamps_ns.get(symbol, time.time_ns()))
+        return {"type": "price_update", **price_data[symbol]}
+
 manager = ConnectionManager()
 
 # Initial prices (approximate current values)
@@ -108,47 +458,163 @@ for symbol in TRACKED_SYMBOLS:
     }
 
 
-async def simulate_price_updates():
-    """Background task to simulate real-time price updates"""
+async def process_tick(symbol: str, new_price: float, volume: float, now_ns: int, timestamp: str):
+    """Apply one tick to every in-memory view and fan it out"""
+    # Update price data
+    record = price_data[symbol]
+    record["price"] = new_price
+    record["volume_24h"] = volume
+    record["timestamp"] = timestamp
+    price_timestamps_ns[symbol] = now_ns
+    response_cache.bump(symbol)
+    
+    # Add to historical data (overwrites the oldest tick when full)
+    historical_data[symbol].append(now_ns, new_price, volume)
+    
+    # Broadcast update
+    await manager.broadcast_price(symbol, record, now_ns)
+
+    # Fold into candles and push any that just closed
+    for interval, candle in candle_aggregator.update(symbol, now_ns, new_price, volume):
+        await manager.broadcast(candle_channel(symbol, interval), {
+            "type": "candle",
+            **candle.to_dict(symbol, interval, candle_aggregator.intervals[interval])
+        })
+
+    # Rolling z-scores; alerts go to the symbol's subscribers
+    for alert in stats_engine.update(symbol, new_price, volume):
+        recent_alerts.append(alert)
+        await manager.broadcast(symbol, {"type": "alert", **alert}, coalesce=False)
+
+
+def build_tick_source() -> TickSource:
+    """Create the configured market data source"""
+    if INGEST_SOURCE == "exchange":
+        return ExchangeWebSocketSource(get_settings().binance_ws_url, TRACKED_SYMBOLS)
+    if INGEST_SOURCE == "replay":
+        speed = None if REPLAY_SPEED == "max" else float(REPLAY_SPEED)
+        return ReplaySource(REPLAY_PATH, speed=speed, loop=True)
+
+    initial_prices = [price_data[symbol]["price"] for symbol in TRACKED_SYMBOLS]
+    if SIMULATOR_MODE == "gbm":
+        simulator = GBMSimulator(
+            TRACKED_SYMBOLS,
+            initial_prices,
+            drift=SIMULATOR_DRIFT,
+            volatility=SIMULATOR_VOLATILITY,
+            dt=1 / SIMULATOR_TICK_HZ,
+            seed=SIMULATOR_SEED,
+        )
+        return SimulatorSource(simulator, SIMULATOR_TICK_HZ)
+    return RandomWalkSource(TRACKED_SYMBOLS, initial_prices, SIMULATOR_TICK_HZ)
+
+
+def build_backplane() -> Backplane:
+    """Create the configured tick backplane"""
+    if BACKPLANE == "redis":
+        return RedisBackplane(get_settings().redis_url)
+    return InProcessBackplane()
+
+
+backplane = build_backplane()
+tick_writer = None  # app.persistence.TickWriter when PERSIST_TICKS is set
+history_store = None  # app.history_store.HistoryStore when HISTORY_DB is set
+tick_stream = None  # app.tick_stream.RedisTickStream when TICK_STREAM is set
+
+
+async def produce_ticks(backplane: Backplane):
+    """Publish the market data source to the backplane while this worker leads"""
+    backoff = 1.0
     while True:
-        for symbol in TRACKED_SYMBOLS:
-            # Simulate price change
-            current_price = price_data[symbol]["price"]
-            change_percent = random.uniform(-0.5, 0.5) / 100
-            new_price = current_price * (1 + change_percent)
-            
-            # Update price data
-            price_data[symbol]["price"] = new_price
-            price_data[symbol]["volume_24h"] = random.uniform(1e9, 10e9)
-            price_data[symbol]["timestamp"] = datetime.utcnow().isoformat()
-            
-            # Add to historical data
-            historical_entry = {
-                "price": new_price,
-                "volume": price_data[symbol]["volume_24h"],
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            historical_data[symbol].append(historical_entry)
-            
-            # Keep only last 100 entries
-            if len(historical_data[symbol]) > 100:
-                historical_data[symbol] = historical_data[symbol][-100:]
-            
-            # Broadcast update
-            await manager.broadcast(symbol, {
-                "type": "price_update",
-                **price_data[symbol]
-            })
-        
-        await asyncio.sleep(2)  # Update every 2 seconds
+        try:
+            await backplane.campaign()
+            # Resumes from the latest prices if leadership moved between workers
+            async for batch in build_tick_source():
+                if not backplane.is_leader:
+                    break
+                await backplane.publish(batch)
+                backoff = 1.0
+                if tick_writer is not None:
+                    await tick_writer.add(batch)
+                if tick_stream is not None:
+                    await tick_stream.add(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Tick producer error: {e}; restarting in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+async def ingest_ticks(source: TickSource):
+    """Background task feeding every tick from ``source`` through process_tick"""
+    last_ns, timestamp = None, None
+    async for batch in source:
+        manager.begin_cycle()
+        for tick in batch:
+            if tick.symbol not in price_data:
+                continue
+            # Ticks from one simulator step share a timestamp; format it once
+            if tick.timestamp_ns != last_ns:
+                last_ns = tick.timestamp_ns
+                timestamp = datetime.utcfromtimestamp(last_ns / 1e9).isoformat()
+            await process_tick(tick.symbol, tick.price, tick.volume, tick.timestamp_ns, timestamp)
+        await manager.flush_cycle()
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize background tasks"""
-    asyncio.create_task(simulate_price_updates())
+    global tick_writer, history_store, tick_stream
+    if PERSIST_TICKS:
+        # Needs sqlalchemy and a DB driver (requirements.txt)
+        from app.persistence import TickWriter
+
+        tick_writer = TickWriter(
+            PERSIST_DATABASE_URL or get_settings().database_url,
+            names=SYMBOL_NAMES,
+            batch_size=PERSIST_BATCH_SIZE,
+            flush_interval=PERSIST_FLUSH_INTERVAL,
+            max_buffer=PERSIST_MAX_BUFFER,
+            drop_when_full=PERSIST_DROP_WHEN_FULL,
+        )
+        await tick_writer.start()
+    if TICK_STREAM:
+        from app.tick_stream import RedisTickStream
+
+        tick_stream = RedisTickStream(
+            get_settings().redis_url,
+            TICK_STREAM_KEY,
+            TICK_STREAM_MAXLEN,
+            quotes=price_data,
+            latest=TICK_STREAM_LATEST,
+        )
+        await tick_stream.start()
+    if HISTORY_DB:
+        from app.history_store import HistoryStore
+
+        history_store = HistoryStore(
+            HISTORY_DATABASE_URL or PERSIST_DATABASE_URL or get_settings().database_url,
+            page_size=HISTORY_PAGE_SIZE,
+        )
+        await history_store.start()
+    await backplane.start()
+    asyncio.create_task(ingest_ticks(backplane.ticks()))
+    asyncio.create_task(produce_ticks(backplane))
     print("✓ Backend server started")
-    print("✓ Price simulation started")
+    print(f"✓ Price ingest started ({INGEST_SOURCE} via {BACKPLANE} backplane)")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered ticks and release the producer lock"""
+    if tick_writer is not None:
+        await tick_writer.close()
+    if history_store is not None:
+        await history_store.close()
+    if tick_stream is not None:
+        await tick_stream.close()
+    await backplane.close()
 
 
 @app.get("/")
@@ -167,6 +633,9 @@ async def health_check():
     return {
         "status": "healthy",
         "websocket": "active",
+        "producer": backplane.is_leader,
+        "persistence": tick_writer.stats() if tick_writer is not None else None,
+        "tick_stream": tick_stream.stats() if tick_stream is not None else None,
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -180,66 +649,386 @@ async def get_tracked_cryptos():
     }
 
 
+@app.get("/api/prices")
+async def get_all_prices(request: Request):
+    """Get current prices for all tracked cryptocurrencies in one response"""
+    return response_cache.respond(
+        request,
+        ("prices", None),
+        response_cache.version(),
+        lambda: {"prices": price_data},
+        CACHE_MAX_AGE,
+    )
+
+
 @app.get("/api/prices/{symbol}")
-async def get_current_price(symbol: str):
+async def get_current_price(symbol: str, request: Request):
     """Get current price for a specific cryptocurrency"""
     symbol = symbol.upper()
     if symbol not in price_data:
-        return {"error": "Symbol not found"}, 404
+        raise HTTPException(status_code=404, detail="Symbol not found")
     
-    return price_data[symbol]
+    return response_cache.respond(
+        request,
+        ("prices", symbol),
+        response_cache.version(symbol),
+        lambda: price_data[symbol],
+        CACHE_MAX_AGE,
+    )
+
+
+def _in_memory(symbol: str, start_ns: int) -> bool:
+    """Whether the ring buffer reaches back to ``start_ns`` (within HISTORY_DB_SLACK)"""
+    buffer = historical_data[symbol]
+    if not len(buffer):
+        return False
+    oldest = int(buffer.window(0, 1)[0][0])
+    return oldest - start_ns <= HISTORY_DB_SLACK * 1e9
+
+
+async def _database_history(
+    symbol: str,
+    start_ns: int,
+    bucket_ns: Optional[int],
+    max_points: Optional[int],
+    limit: Optional[int],
+    cursor: Optional[str],
+    format: str,
+):
+    """
+    Stream /api/historical from the database as NDJSON or a JSON document
+
+    Records are encoded and flushed one page at a time. A ``next_cursor``
+    is included when ``limit`` cut the range short.
+    """
+    from app.history_store import decode_cursor, encode_cursor
+
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    start_us = start_ns // 1000
+    stop_us = time.time_ns() // 1000
+    if not bucket_ns and max_points:
+        # Downsampling becomes SQL bucketing with at most max_points buckets
+        bucket_ns = math.ceil((stop_us - start_us) * 1000 / max_points)
+
+    if bucket_ns:
+        rows = history_store.buckets(
+            symbol, position[0] if position else start_us, stop_us, math.ceil(bucket_ns / 1e9), limit
+        )
+    elif position is None and format == "json":
+        # Same result as the in-memory path: the most recent ``limit`` ticks
+        rows = ((None, record) async for record in history_store.latest(symbol, start_us, limit or 100))
+    else:
+        if format == "json":
+            limit = limit or 100
+        rows = history_store.ticks(symbol, start_us, stop_us, position, limit)
+
+    # Fail with a status code while no body has been sent yet
+    try:
+        first = await rows.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except Exception as e:
+        print(f"History database error: {e}")
+        raise HTTPException(status_code=503, detail="History database unavailable")
+
+    async def body():
+        count, last = 0, None
+        chunk = [] if format == "ndjson" else [f'{{"symbol":{dumps(symbol)},"source":"database","data":[']
+        if first is not None:
+            async for position, record in _prepend(first, rows):
+                if format == "ndjson":
+                    chunk.append(dumps(record) + "\n")
+                else:
+                    chunk.append(("," if count else "") + dumps(record))
+                count += 1
+                last = position
+                if len(chunk) >= 500:
+                    yield "".join(chunk)
+                    chunk = []
+
+        next_cursor = encode_cursor(last) if limit and count == limit and last else None
+        if format == "ndjson":
+            if next_cursor:
+                chunk.append(dumps({"next_cursor": next_cursor}) + "\n")
+        else:
+            chunk.append(f"],\"next_cursor\":{dumps(next_cursor)}}}")
+        yield "".join(chunk)
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson" if format == "ndjson" else "application/json",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _prepend(first, rest):
+    yield first
+    async for item in rest:
+        yield item
 
 
 @app.get("/api/historical/{symbol}")
-async def get_historical_data(symbol: str, hours: int = 24):
-    """Get historical price data for a symbol"""
+async def get_historical_data(
+    symbol: str,
+    request: Request,
+    hours: int = Query(24, ge=1),
+    limit: Optional[int] = Query(None, ge=1),
+    max_points: Optional[int] = Query(None, ge=1),
+    resolution: Optional[str] = None,
+    cursor: Optional[str] = None,
+    format: str = "json",
+):
+    """
+    Get historical price data for a symbol
+
+    The last ``hours`` are selected by binary search on the timestamp
+    index. ``resolution`` (e.g. ``1m``) returns OHLCV buckets and
+    ``max_points`` downsamples with LTTB; otherwise the most recent
+    ``limit`` points are returned. Responses are cached until the
+    symbol's next tick.
+
+    With HISTORY_DB set, ranges older than the in-memory window, a
+    ``cursor`` or ``format=ndjson`` are served from the database (see
+    ``_database_history``).
+    """
     symbol = symbol.upper()
     if symbol not in historical_data:
-        return {"error": "Symbol not found"}, 404
-    
+        raise HTTPException(status_code=404, detail="Symbol not found")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="Unsupported format, use json or ndjson")
+
+    bucket_ns = None
+    if resolution:
+        try:
+            bucket_ns = parse_interval(resolution)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    start_ns = time.time_ns() - hours * 3_600_000_000_000
+    if history_store is not None and (cursor or format == "ndjson" or not _in_memory(symbol, start_ns)):
+        return await _database_history(symbol, start_ns, bucket_ns, max_points, limit, cursor, format)
+    if cursor or format == "ndjson":
+        raise HTTPException(status_code=400, detail="Cursors and NDJSON need the history database (HISTORY_DB)")
+    limit = limit or 100
+
+    def build():
+        timestamps, prices, volumes = historical_data[symbol].between(start_ns)
+
+        if bucket_ns:
+            data = ohlcv_records(ohlcv(timestamps, prices, volumes, bucket_ns))
+        elif max_points:
+            keep = lttb(timestamps, prices, max_points)
+            data = to_records(timestamps[keep], prices[keep], volumes[keep])
+        else:
+            data = to_records(timestamps[-limit:], prices[-limit:], volumes[-limit:])
+
+        return {
+            "symbol": symbol,
+            "data": data
+        }
+
+    return response_cache.respond(
+        request,
+        ("historical", symbol, hours, limit, max_points, bucket_ns),
+        response_cache.version(symbol),
+        build,
+        CACHE_MAX_AGE,
+    )
+
+
+@app.get("/api/candles/{symbol}")
+async def get_candles(symbol: str, interval: str = "1m", limit: int = 100):
+    """Get OHLCV candles maintained incrementally from the tick stream"""
+    symbol = symbol.upper()
+    if symbol not in price_data:
+        raise HTTPException(status_code=404, detail="Symbol not found")
+    if interval not in candle_aggregator.intervals:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported interval, use one of {list(candle_aggregator.intervals)}",
+        )
+
     return {
         "symbol": symbol,
-        "data": historical_data[symbol]
+        "interval": interval,
+        "candles": candle_aggregator.candles(symbol, interval, limit)
+    }
+
+
+@app.get("/api/fear-greed")
+async def get_fear_greed(
+    symbol: Optional[str] = None,
+    interval: str = FEAR_GREED_INTERVAL,
+    lookback: int = FEAR_GREED_LOOKBACK,
+):
+    """Get the Fear & Greed index per symbol from the incremental candles"""
+    if interval not in candle_aggregator.intervals:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported interval, use one of {list(candle_aggregator.intervals)}",
+        )
+    if not 2 <= lookback <= candle_aggregator.history:
+        raise HTTPException(
+            status_code=400,
+            detail=f"lookback must be between 2 and {candle_aggregator.history}",
+        )
+    if symbol:
+        symbol = symbol.upper()
+        if symbol not in price_data:
+            raise HTTPException(status_code=404, detail="Symbol not found")
+    symbols = [symbol] if symbol else TRACKED_SYMBOLS
+
+    # One vectorized pass over every symbol's candles
+    # One more candle than the lookback: its return is in the volatility
+    closes, volumes, last_start_ns = candle_aggregator.series(symbols, interval, lookback + 1)
+    inputs = latest_fear_greed(closes, volumes, lookback)
+    results = [
+        {
+            "symbol": name,
+            "index": int(inputs["index"][row]),
+            "label": fear_greed_label(int(inputs["index"][row])),
+            "price_change": float(inputs["price_change"][row]),
+            "volume_ratio": float(inputs["volume_ratio"][row]),
+            "volatility": float(inputs["volatility"][row]),
+            "windows": int(inputs["windows"][row]),
+            "window_start": datetime.utcfromtimestamp(last_start_ns[row] / 1e9).isoformat(),
+        }
+        for row, name in enumerate(symbols)
+        if inputs["windows"][row]
+    ]
+
+    # Market index: mean over the symbols with candles
+    market = round(sum(result["index"] for result in results) / len(results)) if results else None
+    return {
+        "interval": interval,
+        "lookback": lookback,
+        "index": market,
+        "label": fear_greed_label(market) if market is not None else None,
+        "symbols": results,
+    }
+
+
+@app.get("/api/alerts")
+async def get_alerts(symbol: Optional[str] = None):
+    """Get recent anomaly alerts from the rolling statistics engine"""
+    alerts = list(recent_alerts)
+    if symbol:
+        alerts = [alert for alert in alerts if alert["symbol"] == symbol.upper()]
+    alerts.reverse()  # newest first
+    return {"alerts": alerts}
+
+
+@app.get("/api/stats/{symbol}")
+async def get_rolling_stats(symbol: str):
+    """Get rolling mean/variance, EMAs and z-scores for a symbol"""
+    stats = stats_engine.stats(symbol.upper())
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Symbol not found")
+    return stats
+
+
+def _negotiate(params) -> tuple:
+    """Read protocol version, max_rate, encoding and batching from query params or a message"""
+    encoding = params.get("encoding") or ENCODING_JSON
+    if encoding not in available_encodings():
+        encoding = ENCODING_JSON
+    batch = params.get("batch")
+    if batch is None or batch == "":
+        batch = WS_BATCH_TICKS
+    elif isinstance(batch, str):
+        batch = batch.lower() in ("1", "true", "yes")
+    else:
+        batch = bool(batch)
+    try:
+        protocol = int(params.get("protocol") or PROTOCOL_V1)
+        max_rate = float(params["max_rate"]) if params.get("max_rate") else None
+    except (TypeError, ValueError):
+        return PROTOCOL_V1, None, encoding, batch
+    if protocol not in (PROTOCOL_V1, PROTOCOL_V2):
+        protocol = PROTOCOL_V1
+    return protocol, max_rate, encoding, batch
+
+
+def _session_message(protocol: int, max_rate: Optional[float], encoding: str, batch: bool) -> dict:
+    """Negotiated settings, plus the symbol id table for packed frames"""
+    return {
+        "type": "hello",
+        "protocol": protocol,
+        "max_rate": max_rate,
+        "encoding": encoding,
+        "batch": batch,
+        "keys": SHORT_KEYS if protocol == PROTOCOL_V2 else None,
+        "symbols": TRACKED_SYMBOLS if encoding == ENCODING_STRUCT else None
     }
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time data streaming"""
-    await manager.connect(websocket)
+    """
+    WebSocket endpoint for real-time data streaming
+
+    Clients may negotiate the compact delta protocol, a per-client update
+    rate cap, a wire encoding and per-cycle batching with
+    ``?protocol=2&max_rate=4&encoding=msgpack&batch=1`` or a ``hello`` action.
+    """
+    protocol, max_rate, encoding, batch = _negotiate(websocket.query_params)
+    await manager.connect(websocket, protocol=protocol, max_rate=max_rate, encoding=encoding, batch=batch)
     
     try:
         # Send initial connection confirmation
-        await websocket.send_json({
+        await manager.send(websocket, {
             "type": "connection",
             "status": "connected",
             "timestamp": datetime.utcnow().isoformat()
         })
+        if encoding == ENCODING_STRUCT:
+            await manager.send(websocket, _session_message(protocol, max_rate, encoding, batch))
         
         while True:
             # Receive messages from client
             data = await websocket.receive_json()
             
             if data.get("action") == "subscribe":
+                if data.get("encoding") or "batch" in data:
+                    protocol, max_rate, encoding, batch = _negotiate({
+                        "protocol": manager.protocols.get(websocket),
+                        "max_rate": max_rate,
+                        "encoding": data.get("encoding") or encoding,
+                        "batch": data.get("batch", batch),
+                    })
+                    manager.configure(websocket, protocol, max_rate, encoding, batch)
+                    await manager.send(websocket, _session_message(protocol, max_rate, encoding, batch))
                 symbol = data.get("symbol", "").upper()
                 if symbol in TRACKED_SYMBOLS:
                     await manager.subscribe(websocket, symbol)
-                    await websocket.send_json({
+                    # Optional candle streams, e.g. {"candles": ["1m", "5m"]}
+                    for interval in data.get("candles", []):
+                        if interval in candle_aggregator.intervals:
+                            await manager.subscribe(websocket, candle_channel(symbol, interval))
+                    await manager.send(websocket, {
                         "type": "subscription",
                         "status": "subscribed",
                         "symbol": symbol
                     })
                     # Send current price immediately
                     if symbol in price_data:
-                        await websocket.send_json({
-                            "type": "price_update",
-                            **price_data[symbol]
-                        })
+                        await manager.send(websocket, manager.snapshot(websocket, symbol))
                     
+            elif data.get("action") == "hello":
+                protocol, max_rate, encoding, batch = _negotiate(data)
+                manager.configure(websocket, protocol, max_rate, encoding, batch)
+                await manager.send(websocket, _session_message(protocol, max_rate, encoding, batch))
+
             elif data.get("action") == "unsubscribe":
                 symbol = data.get("symbol", "").upper()
                 await manager.unsubscribe(websocket, symbol)
-                await websocket.send_json({
+                for interval in candle_aggregator.intervals:
+                    await manager.unsubscribe(websocket, candle_channel(symbol, interval))
+                await manager.send(websocket, {
                     "type": "subscription",
                     "status": "unsubscribed",
                     "symbol": symbol
@@ -256,7 +1045,7 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(
-        "main_simple:app",
+        "app.main_simple:app",
         host="0.0.0.0",
         port=port,
         reload=False
@@ -0,0 +1,91 @@
+"""
+Maintain the daily crypto_prices partitions and the 1m/1h rollups.
+
+Creates partitions ahead of time, drops those older than the retention
+period and advances the incremental rollups into aggregated_metrics, using
+the functions installed by database/partitioning.sql. Run it from cron or a
+scheduler, e.g. every 15 minutes:
+
+    python -m app.manage_partitions --days-ahead 3 --retention-days 30 --rollup
+"""
+import argparse
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+
+
+def maintain(
+    url: str,
+    days_ahead: int = 3,
+    days_back: int = 0,
+    retention_days: int = 30,
+    rollup: bool = False,
+    lateness_minutes: int = 1,
+) -> dict:
+    """
+    Run one maintenance pass
+
+    Args:
+        url: PostgreSQL database URL
+        days_ahead: Days after today to create partitions for
+        days_back: Days before today to create missing partitions for
+        retention_days: Drop partitions older than this; 0 keeps everything
+        rollup: Also advance the 1m/1h rollups
+        lateness_minutes: Minutes a window must be closed before it is rolled up
+
+    Returns:
+        Created and dropped partition names and rollup windows written
+    """
+    engine = create_engine(url)
+    result = {"created": [], "dropped": [], "rollups": {}}
+    try:
+        with engine.begin() as connection:
+            result["created"] = connection.execute(
+                text("SELECT * FROM ensure_crypto_prices_partitions(:ahead, :back)"),
+                {"ahead": days_ahead, "back": days_back},
+            ).scalars().all()
+
+            if retention_days:
+                result["dropped"] = connection.execute(
+                    text("SELECT * FROM drop_crypto_prices_partitions(make_interval(days => :days))"),
+                    {"days": retention_days},
+                ).scalars().all()
+
+            if rollup:
+                rows = connection.execute(
+                    text("SELECT rollup, windows FROM refresh_price_rollups(make_interval(mins => :mins))"),
+                    {"mins": lateness_minutes},
+                )
+                result["rollups"] = {name: windows for name, windows in rows}
+    finally:
+        engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Database URL (default: Settings.database_url)")
+    parser.add_argument("--days-ahead", type=int, default=3)
+    parser.add_argument("--days-back", type=int, default=0)
+    parser.add_argument("--retention-days", type=int, default=30, help="0 disables pruning")
+    parser.add_argument("--rollup", action="store_true", help="Advance the 1m/1h rollups")
+    parser.add_argument("--lateness-minutes", type=int, default=1)
+    args = parser.parse_args()
+
+    result = maintain(
+        args.url or get_settings().database_url,
+        days_ahead=args.days_ahead,
+        days_back=args.days_back,
+        retention_days=args.retention_days,
+        rollup=args.rollup,
+        lateness_minutes=args.lateness_minutes,
+    )
+    print(f"✓ Partitions created: {', '.join(result['created']) or 'none'}")
+    print(f"✓ Partitions dropped: {', '.join(result['dropped']) or 'none'}")
+    for name, windows in result["rollups"].items():
+        print(f"✓ Rollup {name}: {windows} windows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Index, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import List
 
 Base = declarative_base()
 
 
 class CryptoPrice(Base):
-    """Model for storing cryptocurrency price data"""
+    """
+    Model for storing cryptocurrency price data
+
+    On PostgreSQL the table is range-partitioned by day with
+    PRIMARY KEY (id, timestamp) and is created by database/schema.sql, not
+    the ORM (see orm_tables). id stays the only key here so SQLite, the
+    local stand-in, keeps numbering rows itself.
+    """
     __tablename__ = "crypto_prices"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -56,6 +64,8 @@ class AggregatedMetrics(Base):
     min_price = Column(Float)
     max_price = Column(Float)
     vwap = Column(Float)  # Volume Weighted Average Price
+    open_price = Column(Float)  # Candle open (rollups)
+    close_price = Column(Float)  # Candle close (rollups)
     
     # Volume metrics
     total_volume = Column(Float)
@@ -89,3 +99,15 @@ class MarketAlert(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     resolved_at = Column(DateTime(timezone=True), nullable=True)
+
+
+def orm_tables(dialect_name: str) -> List[Table]:
+    """Tables the ORM may create on a database of this dialect
+
+    crypto_prices is left to database/schema.sql on PostgreSQL, where it is
+    partitioned; elsewhere (SQLite) the model's plain table stands in for it.
+    """
+    tables = Base.metadata.sorted_tables
+    if dialect_name == "postgresql":
+        tables = [table for table in tables if table is not CryptoPrice.__table__]
+    return tables
@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Hashable, Optional
+from fastapi import WebSocket
+
+# Marks generated keys of messages that must not be coalesced
+_UNKEYED = object()
+
+
+class OverflowPolicy(str, Enum):
+    """What a client queue does when it is full"""
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class ClientQueue:
+    """Bounded outbound queue for one WebSocket, drained by its own writer task.
+
+    Producers call ``put`` which never awaits, so a slow client only ever
+    delays itself. Messages enqueued with a ``key`` (the symbol for price
+    updates) replace any pending message with the same key when the policy
+    is ``COALESCE``, so a lagging client receives the latest value per symbol
+    instead of a backlog.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        maxsize: int = 256,
+        policy: OverflowPolicy = OverflowPolicy.COALESCE,
+        on_close: Optional[Callable[[WebSocket], None]] = None,
+        max_rate: Optional[float] = None,
+    ):
+        self.websocket = websocket
+        self.maxsize = max(1, maxsize)
+        self.policy = self._base_policy = OverflowPolicy(policy)
+        self.on_close = on_close
+        self.min_interval = 0.0
+        if max_rate:
+            self.set_max_rate(max_rate)
+        self.dropped = 0
+        self.closed = False
+        self._close_code: Optional[int] = None
+        self._pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def set_max_rate(self, max_rate: Optional[float]):
+        """
+        Send at most ``max_rate`` messages per second
+
+        Updates arriving in between are coalesced per key, so the client
+        receives the latest value of each symbol at the capped rate.
+        """
+        if max_rate:
+            self.min_interval = 1.0 / max_rate
+            self.policy = OverflowPolicy.COALESCE
+        else:
+            self.min_interval = 0.0
+            self.policy = self._base_policy
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        self._task = asyncio.create_task(self._writer())
+
+    def put(self, message: Any, key: Optional[Hashable] = None, pin: bool = False) -> bool:
+        """
+        Enqueue a message without blocking
+
+        A keyed message replaces the pending message with the same key in
+        place. With ``pin`` it replaces that message but is itself never
+        replaced, for updates that carry state a later one may not.
+
+        Returns:
+            False if the queue is closed (or was closed by the DISCONNECT
+            policy) and the client should be dropped
+        """
+        if self.closed:
+            return False
+
+        coalesce = key is not None and self.policy is OverflowPolicy.COALESCE
+        if coalesce and pin:
+            self._pending.pop(key, None)
+            coalesce = False
+        elif coalesce and key in self._pending:
+            self._pending[key] = message
+            return True
+
+        if len(self._pending) >= self.maxsize:
+            if self.policy is OverflowPolicy.DISCONNECT:
+                # 1013: try again later
+                self.close(code=1013)
+                return False
+            self._pending.popitem(last=False)
+            self.dropped += 1
+
+        if not coalesce:
+            key = (_UNKEYED, next(self._seq))
+        self._pending[key] = message
+        self._ready.set()
+        return True
+
+    def close(self, code: Optional[int] = None):
+        """Stop the writer; optionally close the socket with ``code``"""
+        if self.closed:
+            return
+        self.closed = True
+        self._close_code = code
+        self._pending.clear()
+        self._ready.set()
+
+    async def _send(self, message: Any):
+        # Pre-encoded frames are sent as-is; dicts are encoded per client
+        if isinstance(message, str):
+            await self.websocket.send_text(message)
+        elif isinstance(message, bytes):
+            await self.websocket.send_bytes(message)
+        else:
+            await self.websocket.send_json(message)
+
+    async def _writer(self):
+        try:
+            while not self.closed:
+                if not self._pending:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                key, message = self._pending.popitem(last=False)
+                await self._send(message)
+                # Rate cap applies to coalescable updates, not control replies
+                if self.min_interval and not (type(key) is tuple and key[0] is _UNKEYED):
+                    await asyncio.sleep(self.min_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.closed = True
+
+        if self._close_code is not None:
+            try:
+                await self.websocket.close(code=self._close_code)
+            except Exception:
+                pass
+        if self.on_close:
+            self.on_close(self.websocket)
@@ -0,0 +1,186 @@
+"""
+Write-behind tick persistence.
+
+``TickWriter`` buffers ticks in memory and flushes them to ``crypto_prices``
+in bulk, by size or by time, from a worker thread so the event loop never
+waits on the database. PostgreSQL is written with ``COPY``; other databases
+(SQLite as the local stand-in) with a batched multi-row ``INSERT``.
+"""
+import asyncio
+import io
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+
+from app.config import sync_database_url
+from app.ingest import Tick
+from app.models import CryptoPrice, orm_tables
+
+Row = Tuple[str, str, float, float, int]
+
+_COLUMNS = ("symbol", "name", "price", "volume_24h", "timestamp")
+
+
+def _sqlite_write_ahead_log(dbapi_connection, connection_record):
+    # Appends no longer rewrite the rollback journal on every commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+class TickWriter:
+    """
+    Buffered bulk writer for ticks
+
+    ``add`` appends to an in-memory buffer and only awaits when the buffer
+    holds ``max_buffer`` rows (the database is stalled or too slow). The
+    caller is then held back until a flush makes room, or, with
+    ``drop_when_full``, the oldest rows are dropped instead. A background
+    task flushes every ``flush_interval`` seconds or as soon as
+    ``batch_size`` rows are waiting, one batch at a time over a single
+    pooled connection.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        names: Optional[Dict[str, str]] = None,
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_buffer: int = 200_000,
+        drop_when_full: bool = False,
+    ):
+        self.url = sync_database_url(url)
+        self.names = names or {}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max(max_buffer, batch_size)
+        self.drop_when_full = drop_when_full
+        self.engine = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self._buffer: List[Row] = []
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def start(self):
+        """Create the table if needed and start the flush task"""
+        self.engine = create_engine(self.url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _sqlite_write_ahead_log)
+        if CryptoPrice.__table__ in orm_tables(self.engine.dialect.name):
+            await asyncio.to_thread(CryptoPrice.__table__.create, self.engine, checkfirst=True)
+        self._task = asyncio.create_task(self._flusher())
+
+    async def close(self):
+        """Flush everything still buffered and release the connection"""
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+        if self.engine is not None:
+            self.engine.dispose()
+
+    async def add(self, ticks: Iterable[Tick]):
+        """Buffer ticks for writing; waits only while the buffer is full"""
+        names = self.names
+        for symbol, price, volume, timestamp_ns in ticks:
+            while len(self._buffer) >= self.max_buffer:
+                if self.drop_when_full:
+                    del self._buffer[:self.batch_size]
+                    self.dropped += self.batch_size
+                    continue
+                self._space.clear()
+                self._wake.set()
+                await self._space.wait()
+            self._buffer.append((symbol, names.get(symbol, symbol), price, volume, timestamp_ns))
+
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            failed = False
+            while self._buffer:
+                rows = self._buffer[:self.batch_size]
+                try:
+                    await asyncio.to_thread(self._write, rows)
+                except Exception as e:
+                    # Keep the rows and retry on the next interval
+                    self.failed_flushes += 1
+                    failed = True
+                    print(f"Tick persistence error: {e}")
+                    break
+                del self._buffer[:len(rows)]
+                self.written += len(rows)
+                self._space.set()
+                if len(self._buffer) < self.batch_size and not self._closing:
+                    break
+
+            if self._closing and (not self._buffer or failed):
+                return
+
+    def _write(self, rows: List[Row]):
+        """Runs in a worker thread"""
+        if self.engine.dialect.name == "postgresql":
+            self._copy(rows)
+        else:
+            self._insert(rows)
+
+    def _copy(self, rows: List[Row]):
+        buffer = io.StringIO()
+        last_ns, stamp = None, None
+        for symbol, name, price, volume, timestamp_ns in rows:
+            if timestamp_ns != last_ns:
+                last_ns = timestamp_ns
+                stamp = datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc).isoformat()
+            buffer.write(f"{symbol}\t{name}\t{price!r}\t{volume!r}\t{stamp}\n")
+        buffer.seek(0)
+
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY crypto_prices ({', '.join(_COLUMNS)}) FROM STDIN", buffer)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _insert(self, rows: List[Row]):
+        # Same text format SQLAlchemy's SQLite DateTime type stores and parses
+        params = []
+        last_ns, stamp = None, None
+        for symbol, name, price, volume, timestamp_ns in rows:
+            if timestamp_ns != last_ns:
+                last_ns = timestamp_ns
+                stamp = datetime.utcfromtimestamp(timestamp_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S.%f")
+            params.append((symbol, name, price, volume, stamp))
+
+        placeholders = ", ".join("?" if self.engine.dialect.paramstyle == "qmark" else "%s" for _ in _COLUMNS)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"INSERT INTO crypto_prices ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                params,
+            )
+
+    def stats(self) -> Dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
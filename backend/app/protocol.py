@@ -0,0 +1,70 @@
+from typing import Dict, Optional, Tuple
+
+# Protocol versions negotiated per WebSocket client
+PROTOCOL_V1 = 1  # full price_update records (default)
+PROTOCOL_V2 = 2  # snapshot on subscribe, then compact deltas
+
+# Long record field -> short v2 key
+SHORT_KEYS = {
+    "symbol": "s",
+    "name": "n",
+    "price": "p",
+    "volume_24h": "v",
+    "price_change_24h": "c",
+    "high_24h": "h",
+    "low_24h": "l",
+    "timestamp": "t",  # epoch milliseconds
+}
+
+# Fields that change on (almost) every tick. Deltas always carry them, so a
+# newer delta fully supersedes an older one and the two may be coalesced.
+VOLATILE_FIELDS = ("price", "volume_24h")
+_STATIC_FIELDS = tuple(
+    field for field in SHORT_KEYS
+    if field not in VOLATILE_FIELDS and field not in ("symbol", "timestamp")
+)
+
+
+def snapshot_message(record: Dict, timestamp_ns: int) -> Dict:
+    """Full v2 record sent when a client subscribes"""
+    message = {"e": "snap"}
+    for field, key in SHORT_KEYS.items():
+        if field in record:
+            message[key] = record[field]
+    message["t"] = timestamp_ns // 1_000_000
+    return message
+
+
+class DeltaTracker:
+    """
+    Builds v2 delta messages once per symbol per tick
+
+    Each delta carries the volatile fields plus any other field that changed
+    since the previous delta for the symbol. The second return value of
+    ``delta`` tells whether the message may replace a pending delta for the
+    same symbol (only if no other field changed).
+    """
+
+    def __init__(self):
+        self._last: Dict[str, Tuple] = {}
+
+    def seed(self, symbol: str, record: Dict):
+        """Record the static fields a snapshot just delivered, if unseen"""
+        if symbol not in self._last:
+            self._last[symbol] = tuple(record.get(field) for field in _STATIC_FIELDS)
+
+    def delta(self, symbol: str, record: Dict, timestamp_ns: int) -> Tuple[Dict, bool]:
+        message = {"e": "d", "s": symbol, "t": timestamp_ns // 1_000_000}
+        for field in VOLATILE_FIELDS:
+            message[SHORT_KEYS[field]] = record[field]
+
+        static = tuple(record.get(field) for field in _STATIC_FIELDS)
+        previous: Optional[Tuple] = self._last.get(symbol)
+        coalescable = True
+        if previous != static:
+            self._last[symbol] = static
+            for field, value, old in zip(_STATIC_FIELDS, static, previous or (None,) * len(static)):
+                if value != old:
+                    message[SHORT_KEYS[field]] = value
+                    coalescable = False
+        return message, coalescable
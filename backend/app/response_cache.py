@@ -0,0 +1,85 @@
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.encoding import dumps
+
+
+class ResponseCache:
+    """Pre-encoded JSON response bodies, versioned by tick sequence number
+
+    ``bump(symbol)`` is called for every tick. An entry built at the
+    symbol's version (or the global sequence for all-symbol responses) is
+    served as-is until the next tick for that symbol, so repeated polls
+    cost a dict lookup instead of rebuilding and re-serializing the body.
+    Entries are evicted least recently used beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.sequence = 0
+        self.versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Hashable, Tuple[int, bytes, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bump(self, symbol: str):
+        """Record a tick for ``symbol``"""
+        self.sequence += 1
+        self.versions[symbol] = self.sequence
+
+    def version(self, symbol: Optional[str] = None) -> int:
+        """Sequence number of the last tick for ``symbol`` (any symbol if None)"""
+        if symbol is None:
+            return self.sequence
+        return self.versions.get(symbol, 0)
+
+    def get(self, key: Hashable, version: int, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """
+        Encoded body and ETag for ``key`` at ``version``
+
+        Args:
+            key: (endpoint, symbol, params) tuple
+            version: Current version of the data behind the response
+            build: Returns the response object when the entry is stale
+
+        Returns:
+            (body, etag)
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+        self.misses += 1
+        body = dumps(build()).encode()
+        etag = f'"{version:x}-{zlib.crc32(body):08x}"'
+        self._entries[key] = (version, body, etag)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return body, etag
+
+    def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        version: int,
+        build: Callable[[], Any],
+        max_age: int = 0,
+    ) -> Response:
+        """Cached JSON response, or 304 if the client already has this version"""
+        body, etag = self.get(key, version, build)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={max_age}" if max_age else "no-cache",
+        }
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,199 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+# |z| at or above each level raises an alert of that severity
+DEFAULT_THRESHOLDS: Tuple[Tuple[str, float], ...] = (
+    ("critical", 6.0),
+    ("high", 4.5),
+    ("medium", 3.5),
+    ("low", 3.0),
+)
+
+_NO_EVENTS: Tuple = ()
+
+
+class RollingWindow:
+    """Sliding window with O(1) Welford mean/variance updates
+
+    Values live in a preallocated ring so pushing never allocates.
+    """
+
+    __slots__ = ("size", "values", "index", "count", "mean", "m2")
+
+    def __init__(self, size: int):
+        if size < 2:
+            raise ValueError("window size must be at least 2")
+        self.size = size
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float):
+        if self.count < self.size:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            # Replace the oldest value: remove and add in one step
+            old = self.values[self.index]
+            mean = self.mean + (x - old) / self.size
+            self.m2 += (x - old) * (x - mean + old - self.mean)
+            if self.m2 < 0.0:  # rounding drift
+                self.m2 = 0.0
+            self.mean = mean
+        self.values[self.index] = x
+        self.index = self.index + 1 if self.index + 1 < self.size else 0
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, x: float) -> float:
+        """z-score of ``x`` against the window (0 when variance is 0)"""
+        std = self.std
+        return (x - self.mean) / std if std > 0.0 else 0.0
+
+
+class _Metric:
+    """Rolling windows, EMAs and alert state for one metric of one symbol"""
+
+    __slots__ = ("windows", "emas", "alphas", "levels", "last_z")
+
+    def __init__(self, windows: Sequence[int], ema_spans: Sequence[int]):
+        self.windows = [RollingWindow(size) for size in windows]
+        self.alphas = [2.0 / (span + 1.0) for span in ema_spans]
+        self.emas = [math.nan] * len(ema_spans)
+        # Index into the thresholds currently exceeded, per window (-1: none)
+        self.levels = [-1] * len(windows)
+        self.last_z = [0.0] * len(windows)
+
+
+class RollingStatsEngine:
+    """
+    Streaming per-symbol statistics for anomaly detection
+
+    Tracks log price returns and volume. For each, keeps rolling
+    mean/variance over every window in ``windows`` and an EMA for every span
+    in ``ema_spans``. Each tick is scored against the windows as they stood
+    before it, and an alert is emitted when the tick's |z| crosses into a
+    higher severity level. A window re-arms once |z| falls back below
+    the lowest threshold.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[int] = (30, 300),
+        ema_spans: Sequence[int] = (12, 26),
+        min_samples: int = 30,
+        thresholds: Sequence[Tuple[str, float]] = DEFAULT_THRESHOLDS,
+    ):
+        self.window_sizes = tuple(windows)
+        self.ema_spans = tuple(ema_spans)
+        self.min_samples = min_samples
+        self.thresholds = tuple(sorted(thresholds, key=lambda level: -level[1]))
+        self._returns: Dict[str, _Metric] = {}
+        self._volumes: Dict[str, _Metric] = {}
+        self._last_price: Dict[str, float] = {}
+
+    def update(self, symbol: str, price: float, volume: float) -> Iterable[Dict]:
+        """
+        Fold one tick into the statistics for ``symbol``
+
+        Returns:
+            market_alerts-shaped events raised by this tick (usually none)
+        """
+        returns = self._returns.get(symbol)
+        if returns is None:
+            returns = self._returns[symbol] = _Metric(self.window_sizes, self.ema_spans)
+            self._volumes[symbol] = _Metric(self.window_sizes, self.ema_spans)
+        volumes = self._volumes[symbol]
+
+        events = _NO_EVENTS
+        previous = self._last_price.get(symbol)
+        self._last_price[symbol] = price
+        if previous is not None and previous > 0.0 and price > 0.0:
+            events = self._observe(symbol, "price", returns, math.log(price / previous), events)
+        events = self._observe(symbol, "volume", volumes, volume, events)
+        return events
+
+    def stats(self, symbol: str) -> Optional[Dict]:
+        """Current statistics for ``symbol``, or None if unseen"""
+        if symbol not in self._returns:
+            return None
+        return {
+            "symbol": symbol,
+            "price": self._last_price.get(symbol),
+            "returns": self._metric_stats(self._returns[symbol]),
+            "volume": self._metric_stats(self._volumes[symbol]),
+        }
+
+    def _metric_stats(self, metric: _Metric) -> Dict:
+        return {
+            "windows": {
+                str(window.size): {
+                    "count": window.count,
+                    "mean": window.mean,
+                    "std": window.std,
+                    "zscore": z,
+                }
+                for window, z in zip(metric.windows, metric.last_z)
+            },
+            "ema": {
+                str(span): (None if math.isnan(ema) else ema)
+                for span, ema in zip(self.ema_spans, metric.emas)
+            },
+        }
+
+    def _observe(self, symbol: str, kind: str, metric: _Metric, x: float, events):
+        emas = metric.emas
+        for i, alpha in enumerate(metric.alphas):
+            ema = emas[i]
+            emas[i] = x if ema != ema else ema + alpha * (x - ema)  # NaN check seeds the EMA
+
+        for i, window in enumerate(metric.windows):
+            z = window.zscore(x) if window.count >= self.min_samples else 0.0
+            metric.last_z[i] = z
+            window.push(x)
+
+            level = self._level(abs(z))
+            if level == -1:
+                metric.levels[i] = -1
+            elif metric.levels[i] == -1 or level < metric.levels[i]:
+                metric.levels[i] = level
+                if events is _NO_EVENTS:
+                    events = []
+                events.append(self._event(symbol, kind, window.size, z, x, level))
+        return events
+
+    def _level(self, magnitude: float) -> int:
+        # thresholds are ordered from most to least severe
+        for i, (_, threshold) in enumerate(self.thresholds):
+            if magnitude >= threshold:
+                return i
+        return -1
+
+    def _event(self, symbol: str, kind: str, window: int, z: float, value: float, level: int) -> Dict:
+        if kind == "price":
+            alert_type = "price_spike" if z > 0 else "price_drop"
+            detail = f"{value * 100:+.3f}% move"
+        else:
+            alert_type = "volume_surge" if z > 0 else "volume_drop"
+            detail = f"volume {value:,.0f}"
+        return {
+            "symbol": symbol,
+            "alert_type": alert_type,
+            "severity": self.thresholds[level][0],
+            "message": f"{symbol} {detail} is {z:+.1f} sigma over the last {window} ticks",
+            "trigger_value": z,
+            "window": window,
+            "is_active": True,
+            "created_at": datetime.utcnow().isoformat(),
+        }
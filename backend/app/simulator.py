@@ -0,0 +1,72 @@
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def synthetic_symbols(count: int, start: int = 0) -> List[str]:
+    """Placeholder symbols for load tests, e.g. ``SIM00042USDT``"""
+    return [f"SIM{i:05d}USDT" for i in range(start, start + count)]
+
+
+class GBMSimulator:
+    """
+    Vectorized geometric Brownian motion price simulator
+
+    Advances every symbol in one NumPy step:
+
+        S(t + dt) = S(t) * exp((mu - sigma^2 / 2) * dt + sigma * sqrt(dt) * Z)
+
+    ``drift`` (mu) and ``volatility`` (sigma) are annualized and may be
+    scalars or per-symbol arrays. ``dt`` is the tick interval in seconds.
+    With a ``seed`` the path is fully reproducible.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        initial_prices: ArrayLike,
+        drift: ArrayLike = 0.0,
+        volatility: ArrayLike = 0.8,
+        dt: float = 2.0,
+        seed: Optional[int] = None,
+        volume_range: Tuple[float, float] = (1e9, 10e9),
+    ):
+        self.symbols = list(symbols)
+        n = len(self.symbols)
+        self.rng = np.random.default_rng(seed)
+        self.prices = np.broadcast_to(np.asarray(initial_prices, dtype=np.float64), (n,)).copy()
+        self.volumes = np.empty(n, dtype=np.float64)
+        self.volume_range = volume_range
+
+        dt_years = dt / SECONDS_PER_YEAR
+        mu = np.broadcast_to(np.asarray(drift, dtype=np.float64), (n,))
+        sigma = np.broadcast_to(np.asarray(volatility, dtype=np.float64), (n,))
+        self._drift_term = (mu - 0.5 * sigma ** 2) * dt_years
+        self._diffusion_term = sigma * np.sqrt(dt_years)
+        self._z = np.empty(n, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def step(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advance all symbols by one tick in place
+
+        Returns:
+            (prices, volumes) arrays; they are reused across steps, so copy
+            them if they must outlive the next call
+        """
+        z = self.rng.standard_normal(out=self._z)
+        z *= self._diffusion_term
+        z += self._drift_term
+        np.exp(z, out=z)
+        self.prices *= z
+
+        low, high = self.volume_range
+        self.rng.random(out=self.volumes)
+        self.volumes *= high - low
+        self.volumes += low
+        return self.prices, self.volumes
@@ -0,0 +1,67 @@
+from typing import Dict, Hashable, Iterator, Set, FrozenSet
+
+_EMPTY: FrozenSet = frozenset()
+
+
+class SubscriptionRegistry:
+    """Symbol subscriptions indexed in both directions
+
+    ``by_symbol`` maps a symbol to the clients watching it so fan-out only
+    touches actual subscribers, and ``by_client`` maps a client to its
+    symbols so disconnect only touches that client's own subscriptions.
+    Every operation is O(1) or O(subscriptions of one client).
+    """
+
+    def __init__(self):
+        self.by_symbol: Dict[str, Set[Hashable]] = {}
+        self.by_client: Dict[Hashable, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_client)
+
+    def __contains__(self, client: Hashable) -> bool:
+        return client in self.by_client
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.by_client)
+
+    def add_client(self, client: Hashable):
+        self.by_client.setdefault(client, set())
+
+    def remove_client(self, client: Hashable) -> Set[str]:
+        """Drop a client and all of its subscriptions; returns its symbols"""
+        symbols = self.by_client.pop(client, set())
+        for symbol in symbols:
+            self._discard(symbol, client)
+        return symbols
+
+    def subscribe(self, client: Hashable, symbol: str) -> bool:
+        """Returns True if this is a new subscription"""
+        symbols = self.by_client.get(client)
+        if symbols is None or symbol in symbols:
+            return False
+        symbols.add(symbol)
+        self.by_symbol.setdefault(symbol, set()).add(client)
+        return True
+
+    def unsubscribe(self, client: Hashable, symbol: str) -> bool:
+        """Returns True if the client was subscribed"""
+        symbols = self.by_client.get(client)
+        if symbols is None or symbol not in symbols:
+            return False
+        symbols.discard(symbol)
+        self._discard(symbol, client)
+        return True
+
+    def subscribers(self, symbol: str) -> Set[Hashable]:
+        return self.by_symbol.get(symbol, _EMPTY)
+
+    def symbols(self, client: Hashable) -> Set[str]:
+        return self.by_client.get(client, _EMPTY)
+
+    def _discard(self, symbol: str, client: Hashable):
+        clients = self.by_symbol.get(symbol)
+        if clients is not None:
+            clients.discard(client)
+            if not clients:
+                del self.by_symbol[symbol]
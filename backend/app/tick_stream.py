@@ -0,0 +1,102 @@
+"""
+Redis Streams feed of ticks for the Spark jobs.
+
+The producer worker appends every tick to a capped stream with ``XADD``,
+one pipelined round trip per batch. ``spark/redis_stream_source.py`` reads
+it through a consumer group, so entries survive Spark restarts until they
+are acknowledged, up to ``maxlen`` entries.
+
+With ``latest`` set it also keeps the latest price per symbol under
+``price:<symbol>`` and the update time (epoch microseconds) in the sorted
+set ``price:updated``, which the Spark batch path reads incrementally
+(``spark/redis_reader.py``).
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from app.encoding import dumps
+from app.ingest import Tick
+
+
+class RedisTickStream:
+    """
+    Appends ticks to a Redis stream as ``{"data": <price JSON>}`` entries
+
+    The JSON matches the price messages sent to WebSocket clients (and the
+    Spark price schema). ``quotes`` supplies the fields a tick does not
+    carry, such as ``name`` and ``price_change_24h``.
+
+    Latest-price keys are written once per symbol per batch (one ``MSET``
+    and one ``ZADD``) in the same MULTI/EXEC as the stream entries.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379",
+        key: str = "ticks:stream",
+        maxlen: int = 100_000,
+        quotes: Optional[Dict[str, Dict]] = None,
+        latest: bool = False,
+        client=None,
+    ):
+        self.url = url
+        self.key = key
+        self.maxlen = maxlen
+        self.quotes = quotes if quotes is not None else {}
+        self.latest = latest
+        self.redis = client
+        self.published = 0
+        self.failed = 0
+
+    async def start(self):
+        if self.redis is None:
+            import redis.asyncio as redis
+
+            self.redis = redis.from_url(self.url)
+
+    async def close(self):
+        await self.redis.aclose()
+
+    async def add(self, ticks: Iterable[Tick]):
+        """XADD every tick in one pipeline; errors are counted, not raised"""
+        pipe = self.redis.pipeline(transaction=self.latest)
+        last_ns, timestamp = None, None
+        count = 0
+        values: Dict[str, str] = {}
+        scores: Dict[str, int] = {}
+        for symbol, price, volume, timestamp_ns in ticks:
+            if timestamp_ns != last_ns:
+                last_ns = timestamp_ns
+                timestamp = datetime.utcfromtimestamp(timestamp_ns / 1e9).isoformat()
+            quote = self.quotes.get(symbol, {})
+            data = dumps({
+                "type": "price",
+                "symbol": symbol,
+                "name": quote.get("name", symbol),
+                "price": price,
+                "price_change_24h": quote.get("price_change_24h"),
+                "volume_24h": volume,
+                "high_24h": quote.get("high_24h"),
+                "low_24h": quote.get("low_24h"),
+                "timestamp": timestamp,
+            })
+            pipe.xadd(self.key, {"data": data}, maxlen=self.maxlen, approximate=True)
+            count += 1
+            if self.latest:
+                values[f"price:{symbol}"] = data
+                scores[symbol] = timestamp_ns // 1000
+
+        if not count:
+            return
+        if self.latest:
+            pipe.mset(values)
+            pipe.zadd("price:updated", scores)
+        try:
+            await pipe.execute()
+            self.published += count
+        except Exception as e:
+            self.failed += count
+            print(f"Tick stream error: {e}")
+
+    def stats(self) -> Dict:
+        return {"published": self.published, "failed": self.failed}
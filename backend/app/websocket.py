@@ -4,41 +4,43 @@ from typing import Set, Dict, Any
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 
+from app.encoding import dumps
+from app.subscriptions import SubscriptionRegistry
+
 
 class ConnectionManager:
     """Manages WebSocket connections to clients - simplified version"""
     
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
-        self.subscriptions: Dict[str, Set[WebSocket]] = {}
+        self.registry = SubscriptionRegistry()
         
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.add(websocket)
+        self.registry.add_client(websocket)
         
     def disconnect(self, websocket: WebSocket):
         self.active_connections.discard(websocket)
-        # Remove from all subscriptions
-        for symbol_set in self.subscriptions.values():
-            symbol_set.discard(websocket)
+        # Only touches this client's own subscriptions
+        self.registry.remove_client(websocket)
             
     async def subscribe(self, websocket: WebSocket, symbol: str):
         """Subscribe a client to a specific symbol"""
-        if symbol not in self.subscriptions:
-            self.subscriptions[symbol] = set()
-        self.subscriptions[symbol].add(websocket)
+        self.registry.subscribe(websocket, symbol)
         
     async def unsubscribe(self, websocket: WebSocket, symbol: str):
         """Unsubscribe a client from a symbol"""
-        if symbol in self.subscriptions:
-            self.subscriptions[symbol].discard(websocket)
+        self.registry.unsubscribe(websocket, symbol)
             
     async def broadcast(self, message: Dict[str, Any]):
         """Broadcast message to all connected clients"""
+        frame = dumps(message)
         disconnected = set()
-        for connection in self.active_connections:
+        # Iterate over a snapshot: sends yield to other tasks that may (un)subscribe
+        for connection in tuple(self.active_connections):
             try:
-                await connection.send_json(message)
+                await connection.send_text(frame)
             except WebSocketDisconnect:
                 disconnected.add(connection)
             except Exception:
@@ -50,13 +52,15 @@ class ConnectionManager:
             
     async def send_to_symbol_subscribers(self, symbol: str, message: Dict[str, Any]):
         """Send message to all subscribers of a specific symbol"""
-        if symbol not in self.subscriptions:
+        subscribers = self.registry.subscribers(symbol)
+        if not subscribers:
             return
             
+        frame = dumps(message)
         disconnected = set()
-        for connection in self.subscriptions[symbol]:
+        for connection in tuple(subscribers):
             try:
-                await connection.send_json(message)
+                await connection.send_text(frame)
             except WebSocketDisconnect:
                 disconnected.add(connection)
             except Exception:
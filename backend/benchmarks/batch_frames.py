@@ -0,0 +1,95 @@
+"""
+Frames, bytes and server CPU per tick cycle with and without batching.
+
+Every client subscribes to all tracked symbols, and each cycle sends one
+tick per symbol. Without batching, every client receives one frame per
+symbol. With batching (``batch=1``), it receives one frame per cycle, and
+clients with the same subscriptions share one encoded frame.
+
+Usage (from backend/):
+    python -m benchmarks.batch_frames --clients 1000 10000
+"""
+import argparse
+import asyncio
+import time
+
+from app.encoding import ENCODING_JSON, ENCODING_STRUCT
+from app.main_simple import ConnectionManager, TRACKED_SYMBOLS, price_data
+from app.protocol import PROTOCOL_V1, PROTOCOL_V2
+
+
+class FakeWebSocket:
+    """Stands in for starlette.websockets.WebSocket"""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes_sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        self.frames += 1
+        self.bytes_sent += len(data.encode())
+
+    async def send_bytes(self, data):
+        self.frames += 1
+        self.bytes_sent += len(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _drain(manager):
+    while any(len(queue) for queue in manager.queues.values()):
+        await asyncio.sleep(0)
+
+
+async def bench(clients, cycles, protocol, encoding, batch):
+    manager = ConnectionManager(queue_size=len(TRACKED_SYMBOLS) * 2)
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    for ws in sockets:
+        await manager.connect(ws, protocol=protocol, encoding=encoding, batch=batch)
+        for symbol in TRACKED_SYMBOLS:
+            await manager.subscribe(ws, symbol)
+            manager.snapshot(ws, symbol)
+
+    start = time.process_time()
+    for _ in range(cycles):
+        manager.begin_cycle()
+        for symbol in TRACKED_SYMBOLS:
+            record = price_data[symbol]
+            record["price"] *= 1.0001
+            await manager.broadcast_price(symbol, record, time.time_ns())
+        await manager.flush_cycle()
+        await _drain(manager)
+    elapsed = time.process_time() - start
+
+    for ws in sockets:
+        manager.disconnect(ws)
+    return sockets[0].frames / cycles, sockets[0].bytes_sent / cycles, elapsed / cycles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--cycles", type=int, default=10)
+    args = parser.parse_args()
+
+    variants = ((PROTOCOL_V1, ENCODING_JSON), (PROTOCOL_V2, ENCODING_JSON), (PROTOCOL_V1, ENCODING_STRUCT))
+    print(
+        f"{'clients':>7} {'variant':<10} {'frames':>6} {'batched':>7} "
+        f"{'bytes':>6} {'batched':>7} {'cpu ms':>8} {'batched':>8} {'speedup':>8}"
+    )
+    for clients in args.clients:
+        for protocol, encoding in variants:
+            frames, size, cpu = asyncio.run(bench(clients, args.cycles, protocol, encoding, batch=False))
+            b_frames, b_size, b_cpu = asyncio.run(bench(clients, args.cycles, protocol, encoding, batch=True))
+            print(
+                f"{clients:>7} {'v%d %s' % (protocol, encoding):<10} {frames:>6.0f} {b_frames:>7.0f} "
+                f"{size:>6.0f} {b_size:>7.0f} {cpu * 1e3:>8.1f} {b_cpu * 1e3:>8.1f} {cpu / b_cpu:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+CPU cost per tick of WebSocket fan-out against subscriber count.
+
+Compares per-client ``send_json`` encoding with the serialize-once
+broadcast path for both connection managers. Sockets are in-memory fakes
+that encode like Starlette does, so the numbers measure server-side work
+only (no network).
+
+Usage (from backend/):
+    python -m benchmarks.broadcast_cpu --subscribers 100 1000 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.main_simple import ConnectionManager as SimpleConnectionManager, price_data, TRACKED_SYMBOLS
+from app.websocket import ConnectionManager as SymbolConnectionManager
+
+
+class FakeWebSocket:
+    """Stands in for starlette.websockets.WebSocket"""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        # Starlette encodes every send_json call
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def send_text(self, data):
+        self.bytes_sent += len(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _drain(manager):
+    while any(len(queue) for queue in manager.queues.values()):
+        await asyncio.sleep(0)
+
+
+async def bench_simple(subscribers, ticks, serialize_once):
+    manager = SimpleConnectionManager(queue_size=len(TRACKED_SYMBOLS) * 2, serialize_once=serialize_once)
+    sockets = [FakeWebSocket() for _ in range(subscribers)]
+    for ws in sockets:
+        await manager.connect(ws)
+        for symbol in TRACKED_SYMBOLS:
+            await manager.subscribe(ws, symbol)
+
+    start = time.process_time()
+    for _ in range(ticks):
+        for symbol in TRACKED_SYMBOLS:
+            await manager.broadcast(symbol, {"type": "price_update", **price_data[symbol]})
+        await _drain(manager)
+    elapsed = time.process_time() - start
+
+    for ws in sockets:
+        manager.disconnect(ws)
+    return elapsed / ticks
+
+
+async def bench_symbol(subscribers, ticks, serialize_once):
+    manager = SymbolConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(subscribers)]
+    for ws in sockets:
+        await manager.connect(ws)
+        for symbol in TRACKED_SYMBOLS:
+            await manager.subscribe(ws, symbol)
+
+    start = time.process_time()
+    for _ in range(ticks):
+        for symbol in TRACKED_SYMBOLS:
+            message = {"type": "price_update", **price_data[symbol]}
+            if serialize_once:
+                await manager.send_to_symbol_subscribers(symbol, message)
+            else:
+                for ws in manager.registry.subscribers(symbol):
+                    await ws.send_json(message)
+    elapsed = time.process_time() - start
+    return elapsed / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'manager':<12} {'subscribers':>11} {'per-client ms':>14} {'once ms':>10} {'speedup':>8}")
+    for name, bench in (("main_simple", bench_simple), ("websocket", bench_symbol)):
+        for subscribers in args.subscribers:
+            per_client = asyncio.run(bench(subscribers, args.ticks, serialize_once=False))
+            once = asyncio.run(bench(subscribers, args.ticks, serialize_once=True))
+            print(
+                f"{name:<12} {subscribers:>11} {per_client * 1e3:>14.2f} "
+                f"{once * 1e3:>10.2f} {per_client / once:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
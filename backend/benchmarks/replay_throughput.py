@@ -0,0 +1,72 @@
+"""
+Ingest throughput: replay a tick recording at maximum speed.
+
+Generates a JSONL recording with the GBM simulator if needed, then
+measures ticks/sec for the ReplaySource alone and through the backend
+tick path (history, candles, rolling stats, fan-out with no clients).
+
+Usage (from backend/):
+    python -m benchmarks.replay_throughput --ticks 200000 --path /tmp/ticks.jsonl
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.ingest import ReplaySource, Tick, write_ticks
+from app.simulator import GBMSimulator
+from app import main_simple
+
+
+def generate(path, ticks, symbols):
+    simulator = GBMSimulator(symbols, 100.0, dt=0.1, seed=42)
+    start_ns = time.time_ns()
+
+    def rows():
+        step = 0
+        while True:
+            prices, volumes = simulator.step()
+            ts = start_ns + step * 100_000_000
+            for symbol, price, volume in zip(symbols, prices.tolist(), volumes.tolist()):
+                yield Tick(symbol, price, volume, ts)
+            step += 1
+
+    stream = rows()
+    return write_ticks(path, (next(stream) for _ in range(ticks)))
+
+
+async def replay_only(path):
+    count = 0
+    start = time.perf_counter()
+    async for batch in ReplaySource(path, speed=None):
+        count += len(batch)
+    return count, time.perf_counter() - start
+
+
+async def replay_pipeline(path):
+    start = time.perf_counter()
+    await main_simple.ingest_ticks(ReplaySource(path, speed=None))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/tmp/ticks.jsonl")
+    parser.add_argument("--ticks", type=int, default=200_000)
+    parser.add_argument("--regenerate", action="store_true")
+    args = parser.parse_args()
+
+    symbols = main_simple.TRACKED_SYMBOLS
+    if args.regenerate or not os.path.exists(args.path):
+        written = generate(args.path, args.ticks, symbols)
+        print(f"Wrote {written} ticks for {len(symbols)} symbols to {args.path}")
+
+    count, elapsed = asyncio.run(replay_only(args.path))
+    print(f"replay source only : {count / elapsed:>12,.0f} ticks/s ({count} ticks)")
+
+    elapsed = asyncio.run(replay_pipeline(args.path))
+    print(f"replay + tick path : {count / elapsed:>12,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Bytes on the wire and server CPU per broadcast cycle for each WebSocket
+encoding.
+
+Every client subscribes to all tracked symbols; one cycle broadcasts a
+price tick for each of them through ``ConnectionManager.broadcast_price``.
+The table reports bytes received per client per cycle, CPU time per
+cycle (encoding plus queueing and the writer tasks), and the time to
+encode one cycle's frames on their own. The last column
+shows the size of the same cycle packed into a single batched ``struct``
+frame for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.wire_encoding --clients 1000 10000
+"""
+import argparse
+import asyncio
+import time
+
+from app.encoding import ENCODING_JSON, ENCODING_STRUCT, available_encodings, pack_price_updates
+from app.main_simple import ConnectionManager, SYMBOL_IDS, TRACKED_SYMBOLS, price_data
+from app.protocol import PROTOCOL_V1, PROTOCOL_V2
+
+
+class FakeWebSocket:
+    """Stands in for starlette.websockets.WebSocket"""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        self.bytes_sent += len(data.encode())
+
+    async def send_bytes(self, data):
+        self.bytes_sent += len(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _drain(manager):
+    while any(len(queue) for queue in manager.queues.values()):
+        await asyncio.sleep(0)
+
+
+async def bench(clients, cycles, protocol, encoding):
+    manager = ConnectionManager(queue_size=len(TRACKED_SYMBOLS) * 2)
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    for ws in sockets:
+        await manager.connect(ws, protocol=protocol, encoding=encoding)
+        for symbol in TRACKED_SYMBOLS:
+            await manager.subscribe(ws, symbol)
+            manager.snapshot(ws, symbol)
+
+    start = time.process_time()
+    for _ in range(cycles):
+        for symbol in TRACKED_SYMBOLS:
+            record = price_data[symbol]
+            record["price"] *= 1.0001
+            await manager.broadcast_price(symbol, record, time.time_ns())
+        await _drain(manager)
+    elapsed = time.process_time() - start
+
+    for ws in sockets:
+        manager.disconnect(ws)
+    return sockets[0].bytes_sent / cycles, elapsed / cycles
+
+
+def encode_time(protocol, encoding, repeat=2000):
+    """Seconds to encode one frame per tracked symbol, without fan-out"""
+    manager = ConnectionManager()
+    now_ns = time.time_ns()
+    for symbol in TRACKED_SYMBOLS:
+        manager.deltas.seed(symbol, price_data[symbol])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for symbol in TRACKED_SYMBOLS:
+            record = price_data[symbol]
+            delta = manager.deltas.delta(symbol, record, now_ns) if protocol == PROTOCOL_V2 else None
+            manager._price_frame(symbol, record, now_ns, protocol, encoding, delta)
+    return (time.perf_counter() - start) / repeat
+
+
+def batched_struct_bytes():
+    now_ns = time.time_ns()
+    return len(pack_price_updates(
+        (SYMBOL_IDS[symbol], price_data[symbol]["price"], price_data[symbol]["volume_24h"], now_ns)
+        for symbol in TRACKED_SYMBOLS
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--cycles", type=int, default=10)
+    args = parser.parse_args()
+
+    variants = [
+        (PROTOCOL_V1, encoding) for encoding in available_encodings()
+    ] + [
+        (PROTOCOL_V2, encoding) for encoding in available_encodings() if encoding != ENCODING_STRUCT
+    ]
+    batched = batched_struct_bytes()
+
+    print(f"{'clients':>7} {'protocol':>8} {'encoding':<8} {'bytes/client':>12} {'cpu ms':>8} {'encode us':>10} {'vs json':>8}")
+    for clients in args.clients:
+        baseline = {}
+        for protocol, encoding in variants:
+            size, cpu = asyncio.run(bench(clients, args.cycles, protocol, encoding))
+            encode = encode_time(protocol, encoding)
+            if encoding == ENCODING_JSON:
+                baseline[protocol] = size
+            ratio = size / baseline.get(protocol, size)
+            print(
+                f"{clients:>7} {'v%d' % protocol:>8} {encoding:<8} {size:>12.0f} "
+                f"{cpu * 1e3:>8.1f} {encode * 1e6:>10.1f} {ratio:>7.2f}x"
+            )
+    print(f"batched struct frame for {len(TRACKED_SYMBOLS)} symbols: {batched} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main_simple import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_unknown_symbol_is_404(client):
+    response = client.get("/api/prices/NOPEUSDT")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Symbol not found"}
+
+
+def test_price_is_served_with_etag_and_revalidated(client):
+    response = client.get("/api/prices/btcusdt")
+    assert response.status_code == 200
+    assert response.json()["symbol"] == "BTCUSDT"
+
+    etag = response.headers["ETag"]
+    revalidated = client.get("/api/prices/BTCUSDT", headers={"If-None-Match": etag})
+    # A tick may land in between; either way the cache answers consistently
+    assert revalidated.status_code in (200, 304)
+    if revalidated.status_code == 200:
+        assert revalidated.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-5", "max_points=0", "hours=0", "hours=-1"])
+def test_history_rejects_non_positive_sizes(client, query):
+    assert client.get(f"/api/historical/BTCUSDT?{query}").status_code == 422
+
+
+def test_history_limit_returns_the_most_recent_points(client):
+    response = client.get("/api/historical/BTCUSDT?limit=3")
+    assert response.status_code == 200
+    assert len(response.json()["data"]) <= 3
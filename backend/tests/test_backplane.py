@@ -0,0 +1,108 @@
+import asyncio
+
+from app.backplane import FakeRedis, RedisBackplane
+from app.ingest import Tick
+
+T0 = 1_700_000_000 * 10**9
+
+
+def workers(count, lock_ttl=0.3):
+    server = {}
+    return server, [RedisBackplane(client=FakeRedis(server), lock_ttl=lock_ttl) for _ in range(count)]
+
+
+async def elect(backplanes, timeout=1.0):
+    """Campaign on every worker; the winner and the still-waiting campaigns"""
+    campaigns = {asyncio.create_task(backplane.campaign()): backplane for backplane in backplanes}
+    done, pending = await asyncio.wait(campaigns, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    [winner] = [campaigns[task] for task in done]
+    return winner, pending
+
+
+async def close(backplanes, pending=()):
+    for task in pending:
+        task.cancel()
+    for backplane in backplanes:
+        await backplane.close()
+
+
+def test_exactly_one_leader_between_two_workers():
+    async def run():
+        server, backplanes = workers(2)
+        leader, pending = await elect(backplanes)
+        # Several renewals later the follower is still waiting
+        await asyncio.sleep(0.5)
+        leaders = [backplane.is_leader for backplane in backplanes]
+        lock = server["keys"]["ticks:producer"][0]
+        await close(backplanes, pending)
+        return leaders, lock, leader.token
+
+    leaders, lock, token = asyncio.run(run())
+    assert sorted(leaders) == [False, True]
+    assert lock == token
+
+
+def test_every_worker_receives_published_batches():
+    batches = [[Tick("BTCUSDT", 45000.0, 1.0, T0)], [Tick("ETHUSDT", 2500.5, 0.0, T0 + 1)]]
+
+    async def run():
+        _, backplanes = workers(3)
+        leader, pending = await elect(backplanes)
+        received = [[] for _ in backplanes]
+
+        async def consume(backplane, into):
+            async for batch in backplane.ticks():
+                into.append(batch)
+
+        consumers = [asyncio.create_task(consume(b, into)) for b, into in zip(backplanes, received)]
+        await asyncio.sleep(0.01)  # let every worker subscribe
+        for batch in batches:
+            await leader.publish(batch)
+        await asyncio.sleep(0.01)
+        await close(backplanes, [*pending, *consumers])
+        return received
+
+    assert asyncio.run(run()) == [batches] * 3
+
+
+def test_follower_takes_over_when_the_leader_stops_renewing():
+    async def run():
+        server, backplanes = workers(2)
+        leader, pending = await elect(backplanes)
+        [follower] = [backplane for backplane in backplanes if backplane is not leader]
+
+        async def unreachable(*args):
+            raise ConnectionError("Redis is unreachable")
+
+        leader.redis.eval = unreachable
+        started = asyncio.get_running_loop().time()
+        await asyncio.wait_for(asyncio.gather(*pending), 2.0)
+        took = asyncio.get_running_loop().time() - started
+        state = (leader.is_leader, follower.is_leader, server["keys"]["ticks:producer"][0] == follower.token)
+        await close(backplanes)
+        return state, took
+
+    (old, new, holds_lock), took = asyncio.run(run())
+    # The old leader stepped down before its lock could have expired
+    assert (old, new, holds_lock) == (False, True, True)
+    assert took >= 0.15
+
+
+def test_close_releases_the_lock():
+    async def run():
+        # Long TTL: the follower can only win this quickly if the lock is deleted
+        server, backplanes = workers(2, lock_ttl=30.0)
+        leader, pending = await elect(backplanes)
+        [follower] = [backplane for backplane in backplanes if backplane is not leader]
+
+        await leader.close()
+        released = "ticks:producer" not in server["keys"]
+        # The follower retries every lock_ttl / 3, so force an early attempt
+        for task in pending:
+            task.cancel()
+        await asyncio.wait_for(follower.campaign(), 1.0)
+        state = (released, leader.is_leader, follower.is_leader)
+        await follower.close()
+        return state
+
+    assert asyncio.run(run()) == (True, False, True)
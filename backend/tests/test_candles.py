@@ -0,0 +1,55 @@
+from app.candles import CandleAggregator, candle_channel
+
+SECOND = 1_000_000_000
+# 2026-01-01T00:00:00Z, on every interval boundary
+T0 = 1_767_225_600 * SECOND
+
+
+def test_ticks_fold_into_ohlcv_and_vwap():
+    candles = CandleAggregator(intervals=("1m",))
+    for offset, price, volume in ((0, 100.0, 1.0), (10, 104.0, 2.0), (20, 98.0, 1.0), (59, 101.0, 4.0)):
+        assert candles.update("BTCUSDT", T0 + offset * SECOND, price, volume) == []
+
+    [candle] = candles.candles("BTCUSDT", "1m")
+    assert candle["open_time"] == "2026-01-01T00:00:00"
+    assert candle["close_time"] == "2026-01-01T00:01:00"
+    assert (candle["open"], candle["high"], candle["low"], candle["close"]) == (100.0, 104.0, 98.0, 101.0)
+    assert candle["volume"] == 8.0
+    assert candle["vwap"] == (100.0 + 208.0 + 98.0 + 404.0) / 8.0
+    assert candle["trades"] == 4
+    assert candle["closed"] is False
+
+
+def test_tick_in_next_bucket_closes_candle_at_every_interval():
+    candles = CandleAggregator(intervals=("1s", "1m", "5m"))
+    candles.update("BTCUSDT", T0, 100.0, 1.0)
+    closed = candles.update("BTCUSDT", T0 + 60 * SECOND, 102.0, 1.0)
+
+    assert [(interval, candle.close) for interval, candle in closed] == [("1s", 100.0), ("1m", 100.0)]
+    history = candles.candles("BTCUSDT", "1m")
+    assert [(candle["open"], candle["closed"]) for candle in history] == [(100.0, True), (102.0, False)]
+    # Still the same 5m bucket
+    assert [candle["trades"] for candle in candles.candles("BTCUSDT", "5m")] == [2]
+
+
+def test_late_tick_for_closed_bucket_is_ignored():
+    candles = CandleAggregator(intervals=("1m",))
+    candles.update("BTCUSDT", T0 + 61 * SECOND, 100.0, 1.0)
+    assert candles.update("BTCUSDT", T0 + 30 * SECOND, 50.0, 1.0) == []
+
+    [candle] = candles.candles("BTCUSDT", "1m")
+    assert (candle["low"], candle["trades"]) == (100.0, 1)
+
+
+def test_history_and_limit_keep_the_newest_candles():
+    candles = CandleAggregator(intervals=("1s",), history=3)
+    for second in range(6):
+        candles.update("BTCUSDT", T0 + second * SECOND, float(second), 1.0)
+
+    assert [candle["open"] for candle in candles.candles("BTCUSDT", "1s", limit=10)] == [2.0, 3.0, 4.0, 5.0]
+    assert [candle["open"] for candle in candles.candles("BTCUSDT", "1s", limit=2)] == [4.0, 5.0]
+    assert candles.candles("ETHUSDT", "1s") == []
+
+
+def test_candle_channel():
+    assert candle_channel("BTCUSDT", "1m") == "BTCUSDT@candle_1m"
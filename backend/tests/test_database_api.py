@@ -0,0 +1,62 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+
+# app.database builds its engines at import; keep them off the default Postgres
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+get_settings.cache_clear()
+
+from app.database import get_async_db
+from app.main import app
+from app.models import CryptoPrice
+
+
+@pytest.fixture
+def client(tmp_path):
+    """app.main with get_async_db on a SQLite database holding one BTCUSDT price"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'prices.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as connection:
+            await connection.run_sync(CryptoPrice.__table__.create)
+        async with sessions() as db:
+            db.add(CryptoPrice(
+                symbol="BTCUSDT", name="Bitcoin", price=45000.0, volume_24h=1.0,
+                price_change_24h=0.5, timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            ))
+            await db.commit()
+    asyncio.run(setup())
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+
+
+def test_latest_stored_price(client):
+    response = client.get("/api/prices/btcusdt")
+    assert response.status_code == 200
+    assert response.json()["price"] == 45000.0
+
+
+def test_unknown_symbol_is_404(client):
+    response = client.get("/api/prices/NOPEUSDT")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Symbol not found"}
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.downsample import lttb, ohlcv, ohlcv_records, parse_interval
+
+SECOND = 1_000_000_000
+# 2026-01-01T00:00:00Z, on every interval boundary
+T0 = 1_767_225_600 * SECOND
+
+
+def test_parse_interval():
+    assert parse_interval("30s") == 30 * SECOND
+    assert parse_interval(" 5M ") == 300 * SECOND
+    assert parse_interval("1d") == 86_400 * SECOND
+    for interval in ("0m", "1w", "m", "-1m"):
+        with pytest.raises(ValueError):
+            parse_interval(interval)
+
+
+@pytest.mark.parametrize("threshold", [3, 10, 57, 999])
+def test_lttb_keeps_endpoints_and_returns_sorted_indices(threshold):
+    rng = np.random.default_rng(7)
+    x = np.arange(1000, dtype=np.int64) * SECOND
+    y = np.cumsum(rng.normal(size=1000))
+
+    keep = lttb(x, y, threshold)
+    assert len(keep) == threshold
+    assert (keep[0], keep[-1]) == (0, 999)
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_spikes():
+    x = np.arange(200, dtype=np.int64)
+    y = np.zeros(200)
+    y[[37, 120]] = (50.0, -50.0)
+    keep = lttb(x, y, 12)
+    assert {37, 120} <= set(keep.tolist())
+
+
+@pytest.mark.parametrize("threshold", [0, 2, 5, 6])
+def test_lttb_returns_every_point_when_it_cannot_reduce(threshold):
+    x = np.arange(5)
+    assert lttb(x, x.astype(float), threshold).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_ohlcv_buckets_skip_empty_intervals():
+    offsets = np.array([0, 10, 59, 60, 185, 190])
+    prices = np.array([100.0, 104.0, 99.0, 101.0, 97.0, 98.0])
+    volumes = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+    buckets = ohlcv(T0 + offsets * SECOND, prices, volumes, 60 * SECOND)
+    # Nothing in 00:02, so three buckets
+    assert ((buckets["timestamp"] - T0) // SECOND).tolist() == [0, 60, 180]
+    assert buckets["open"].tolist() == [100.0, 101.0, 97.0]
+    assert buckets["high"].tolist() == [104.0, 101.0, 98.0]
+    assert buckets["low"].tolist() == [99.0, 101.0, 97.0]
+    assert buckets["close"].tolist() == [99.0, 101.0, 98.0]
+    assert buckets["volume"].tolist() == [6.0, 4.0, 11.0]
+
+    first = ohlcv_records(buckets)[0]
+    assert first == {
+        "timestamp": "2026-01-01T00:00:00.000000", "open": 100.0, "high": 104.0,
+        "low": 99.0, "close": 99.0, "volume": 6.0, "price": 99.0,
+    }
+
+
+def test_ohlcv_of_no_ticks():
+    empty = np.empty(0, dtype=np.int64)
+    buckets = ohlcv(empty, np.empty(0), np.empty(0), SECOND)
+    assert all(len(column) == 0 for column in buckets.values())
+    assert ohlcv_records(buckets) == []
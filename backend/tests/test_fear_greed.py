@@ -0,0 +1,53 @@
+import statistics
+
+import numpy as np
+
+from app.candles import CandleAggregator
+from app.fear_greed import fear_greed_index, fear_greed_label, latest_fear_greed
+
+SECOND = 1_000_000_000
+T0 = 1_767_225_600 * SECOND
+
+
+def test_index_and_labels():
+    assert fear_greed_index([0.0], [1.0], [0.0]).tolist() == [54]
+    assert fear_greed_index([100.0], [10.0], [0.0]).tolist() == [100]
+    assert fear_greed_index([-100.0], [0.0], [100.0]).tolist() == [0]
+    assert [fear_greed_label(index) for index in (100, 76, 75, 56, 55, 45, 44, 25, 24, 0)] == [
+        "Extreme Greed", "Extreme Greed", "Greed", "Greed", "Neutral",
+        "Neutral", "Fear", "Fear", "Extreme Fear", "Extreme Fear",
+    ]
+
+
+def test_inputs_cover_lookback_windows_and_lookback_returns():
+    # Like add_fear_greed_index: the oldest window's return against the
+    # one before it is part of the volatility
+    lookback = 4
+    closes = [100.0, 110.0, 99.0, 104.0, 101.0, 103.0]
+    volumes = [9.0, 1.0, 2.0, 3.0, 4.0, 6.0]
+    candles = CandleAggregator(intervals=("1s",))
+    for second, (close, volume) in enumerate(zip(closes, volumes)):
+        candles.update("BTCUSDT", T0 + second * SECOND, close, volume)
+
+    series, volume_series, _ = candles.series(["BTCUSDT", "ETHUSDT"], "1s", lookback + 1)
+    inputs = latest_fear_greed(series, volume_series, lookback)
+
+    returns = [later / earlier - 1 for earlier, later in zip(closes, closes[1:])][-lookback:]
+    assert np.isclose(inputs["price_change"][0], (103.0 / 99.0 - 1) * 100)
+    assert np.isclose(inputs["volume_ratio"][0], 6.0 / np.mean(volumes[-lookback:]))
+    assert np.isclose(inputs["volatility"][0], statistics.stdev(returns) * 100)
+    assert inputs["windows"].tolist() == [lookback, 0]
+    # No candles: neutral inputs
+    assert (inputs["price_change"][1], inputs["volume_ratio"][1], inputs["volatility"][1]) == (0.0, 1.0, 0.0)
+
+
+def test_short_history_uses_the_returns_it_has():
+    candles = CandleAggregator(intervals=("1s",))
+    for second, close in enumerate([100.0, 102.0, 101.0]):
+        candles.update("BTCUSDT", T0 + second * SECOND, close, 1.0)
+
+    series, volumes, _ = candles.series(["BTCUSDT"], "1s", 11)
+    inputs = latest_fear_greed(series, volumes, 10)
+    assert inputs["windows"].tolist() == [3]
+    assert np.isclose(inputs["price_change"][0], 1.0)
+    assert np.isclose(inputs["volatility"][0], statistics.stdev([0.02, 101.0 / 102.0 - 1]) * 100)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app.history import TickRingBuffer, capacity_within
+
+
+def filled(capacity, timestamps):
+    buffer = TickRingBuffer(capacity)
+    for timestamp in timestamps:
+        buffer.append(timestamp, float(timestamp), 1.0)
+    return buffer
+
+
+def test_search_empty_buffer():
+    assert TickRingBuffer(4).search(123) == 0
+
+
+@pytest.mark.parametrize("appended", [5, 8, 11, 16, 19])
+def test_search_matches_searchsorted_before_and_after_wrap(appended):
+    # Timestamps 10, 20, ...; capacity 8, so 11 and 19 straddle the wrap
+    buffer = filled(8, range(10, 10 * appended + 1, 10))
+    held = buffer.window()[0]
+    assert held.tolist() == list(range(10, 10 * appended + 1, 10))[-8:]
+
+    for timestamp in range(0, 10 * appended + 20, 5):
+        assert buffer.search(timestamp) == np.searchsorted(held, timestamp), timestamp
+
+
+def test_search_finds_first_of_equal_timestamps_across_wrap():
+    buffer = filled(4, [1, 2, 2, 2, 2, 3])
+    assert buffer.window()[0].tolist() == [2, 2, 2, 3]
+    assert buffer.search(2) == 0
+    assert buffer.search(3) == 3
+    assert buffer.search(4) == 4
+
+
+def test_between_and_latest_follow_logical_order():
+    buffer = filled(5, range(1, 9))
+    timestamps, prices, _ = buffer.between(5, 8)
+    assert timestamps.tolist() == [5, 6, 7]
+    assert prices.tolist() == [5.0, 6.0, 7.0]
+    assert buffer.between(0)[0].tolist() == [4, 5, 6, 7, 8]
+    assert buffer.latest(2)[0].tolist() == [7, 8]
+    assert buffer.latest(10)[0].tolist() == [4, 5, 6, 7, 8]
+
+
+def test_capacity_within_memory_cap():
+    assert capacity_within(43_200, 5, 256 * 2**20) == 43_200
+    # 10k symbols at full depth would take ~10 GB
+    depth = capacity_within(43_200, 10_000, 256 * 2**20)
+    assert depth == 256 * 2**20 // (24 * 10_000)
+    assert depth * 10_000 * TickRingBuffer(1).nbytes <= 256 * 2**20
+    assert capacity_within(43_200, 10_000, 0) == 1
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from app.history_store import HistoryStore, decode_cursor, encode_cursor
+from app.models import CryptoPrice
+
+# 2026-01-01T00:00:00Z
+T0 = datetime(2026, 1, 1)
+T0_US = 1_767_225_600_000_000
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor((T0_US, 42))) == (T0_US, 42)
+    # A bare timestamp resumes after every row at that instant's id 0
+    assert decode_cursor(str(T0_US)) == (T0_US, 0)
+
+
+@pytest.mark.parametrize("value", ["", "abc", "123:x", "1.5:2"])
+def test_malformed_cursor_raises_value_error(value):
+    with pytest.raises(ValueError):
+        decode_cursor(value)
+
+
+def store_with(tmp_path, rows, page_size):
+    """HistoryStore over a SQLite crypto_prices holding (symbol, price, seconds) rows"""
+    async def setup():
+        store = HistoryStore(f"sqlite:///{tmp_path / 'history.db'}", page_size=page_size)
+        await store.start()
+        async with store.engine.begin() as connection:
+            await connection.run_sync(CryptoPrice.__table__.create)
+            await connection.execute(CryptoPrice.__table__.insert(), [
+                {"symbol": symbol, "name": symbol, "price": price, "volume_24h": 1.0,
+                 "timestamp": T0 + timedelta(seconds=seconds)}
+                for symbol, price, seconds in rows
+            ])
+        return store
+    return setup
+
+
+def collect(store, *args, **kwargs):
+    async def run():
+        return [item async for item in store.ticks("BTCUSDT", *args, **kwargs)]
+    return run
+
+
+def test_keyset_pages_cover_equal_timestamps_exactly_once(tmp_path):
+    # Several ticks share a timestamp, so only (timestamp, id) orders them
+    seconds = [0, 1, 2, 2, 2, 2, 3, 4, 4, 5]
+    rows = [("BTCUSDT", float(i), s) for i, s in enumerate(seconds)]
+    rows += [("ETHUSDT", 1000.0, 2), ("BTCUSDT", 99.0, 60)]
+
+    async def run():
+        store = await store_with(tmp_path, rows, page_size=2)()
+        try:
+            stop_us = T0_US + 60_000_000  # exclusive: the tick at 60s is left out
+            prices, cursor, pages = [], None, 0
+            while True:
+                page = await collect(store, T0_US, stop_us, cursor, limit=3)()
+                if not page:
+                    break
+                pages += 1
+                prices.extend(record["price"] for _, record in page)
+                cursor = decode_cursor(encode_cursor(page[-1][0]))
+            return prices, pages
+        finally:
+            await store.close()
+
+    prices, pages = asyncio.run(run())
+    assert prices == [float(i) for i in range(len(seconds))]
+    assert pages == 4
+
+
+def test_ticks_start_bound_and_record_shape(tmp_path):
+    rows = [("BTCUSDT", 1.0, 0), ("BTCUSDT", 2.0, 1.5)]
+
+    async def run():
+        store = await store_with(tmp_path, rows, page_size=10)()
+        try:
+            return await collect(store, T0_US + 1_000_000, T0_US + 10_000_000)()
+        finally:
+            await store.close()
+
+    [(cursor, record)] = asyncio.run(run())
+    assert cursor[0] == T0_US + 1_500_000
+    assert record == {"price": 2.0, "volume": 1.0, "timestamp": "2026-01-01T00:00:01.500000"}
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.ingest import ReplaySource, Tick, read_ticks, write_ticks
+
+# Realistic epoch-ns timestamps: parse_timestamp infers units from magnitude
+T0 = 1_700_000_000 * 10**9
+MS = 1_000_000
+
+
+def record(tmp_path, ticks):
+    path = str(tmp_path / "ticks.jsonl")
+    write_ticks(path, ticks)
+    return path
+
+
+def replay(source, passes, ticks_per_pass):
+    async def collect():
+        ticks = []
+        async for batch in source:
+            ticks.extend(batch)
+            if len(ticks) >= passes * ticks_per_pass:
+                return ticks
+        return ticks
+    return asyncio.run(collect())
+
+
+def test_recording_round_trip(tmp_path):
+    ticks = [Tick("BTCUSDT", 45000.5, 2.0, T0), Tick("ETHUSDT", 2500.25, 0.0, T0 + MS)]
+    path = record(tmp_path, ticks)
+    assert list(read_ticks(path)) == ticks
+
+
+@pytest.mark.parametrize("rebase", [True, False])
+@pytest.mark.parametrize("speed", [None, 1000.0])
+def test_loop_keeps_timestamps_increasing(tmp_path, rebase, speed):
+    # One hour of recording: without carrying the offset forward each
+    # pass would jump back to the start of the hour
+    ticks = [Tick("BTCUSDT", 100.0 + i, 1.0, T0 + i * 1_200_000 * MS) for i in range(3)]
+    ticks.append(Tick("BTCUSDT", 104.0, 1.0, T0 + 3_600_000 * MS))
+    # Replay speed only matters between the first ticks of a pass
+    if speed is not None:
+        ticks = [tick._replace(timestamp_ns=T0 + i * MS) for i, tick in enumerate(ticks)]
+    path = record(tmp_path, ticks)
+
+    source = ReplaySource(path, speed=speed, batch_size=2, rebase_timestamps=rebase, loop=True)
+    replayed = replay(source, 3, len(ticks))
+    timestamps = [tick.timestamp_ns for tick in replayed]
+
+    assert len(replayed) == 3 * len(ticks)
+    assert all(later > earlier for earlier, later in zip(timestamps, timestamps[1:]))
+    # Gaps within a pass are kept as recorded
+    recorded = [tick.timestamp_ns for tick in ticks]
+    for start in range(0, len(replayed), len(ticks)):
+        pass_timestamps = timestamps[start:start + len(ticks)]
+        assert [t - pass_timestamps[0] for t in pass_timestamps] == [t - recorded[0] for t in recorded]
+    assert [tick.price for tick in replayed] == [tick.price for tick in ticks] * 3
+
+
+def test_without_rebase_first_pass_keeps_recorded_timestamps(tmp_path):
+    ticks = [Tick("BTCUSDT", 100.0, 1.0, T0), Tick("BTCUSDT", 101.0, 1.0, T0 + MS)]
+    path = record(tmp_path, ticks)
+
+    replayed = replay(ReplaySource(path, speed=None, rebase_timestamps=False), 1, len(ticks))
+    assert replayed == ticks
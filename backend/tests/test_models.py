@@ -0,0 +1,7 @@
+from app.models import Base, CryptoPrice, orm_tables
+
+
+def test_partitioned_crypto_prices_is_not_created_by_the_orm_on_postgresql():
+    assert CryptoPrice.__table__ not in orm_tables("postgresql")
+    assert len(orm_tables("postgresql")) == len(Base.metadata.sorted_tables) - 1
+    assert orm_tables("sqlite") == Base.metadata.sorted_tables
@@ -0,0 +1,118 @@
+import asyncio
+
+from app.outbound import ClientQueue, OverflowPolicy
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+    async def send_bytes(self, message):
+        self.sent.append(message)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def pending(queue):
+    return list(queue._pending.values())
+
+
+def drain(queue):
+    """Run the writer until everything pending has been sent"""
+    async def run():
+        queue.start()
+        while len(queue):
+            await asyncio.sleep(0)
+        queue.close()
+        await queue._task
+    asyncio.run(run())
+    return queue.websocket.sent
+
+
+def test_keyed_put_replaces_pending_message_in_place():
+    queue = ClientQueue(FakeWebSocket())
+    queue.put("btc-1", key="BTCUSDT")
+    queue.put("eth-1", key="ETHUSDT")
+    queue.put("btc-2", key="BTCUSDT")
+
+    assert pending(queue) == ["btc-2", "eth-1"]
+    assert drain(queue) == ["btc-2", "eth-1"]
+
+
+def test_unkeyed_messages_are_never_coalesced():
+    queue = ClientQueue(FakeWebSocket())
+    queue.put("alert-1")
+    queue.put("alert-2")
+    queue.put("btc-1", key="BTCUSDT")
+
+    assert pending(queue) == ["alert-1", "alert-2", "btc-1"]
+
+
+def test_pinned_message_replaces_pending_but_is_not_replaced():
+    queue = ClientQueue(FakeWebSocket())
+    queue.put("btc-1", key="BTCUSDT")
+    queue.put("btc-static", key="BTCUSDT", pin=True)
+    queue.put("btc-2", key="BTCUSDT")
+    queue.put("btc-3", key="BTCUSDT")
+
+    # The pinned update carries state btc-2/btc-3 may not, so it is kept
+    # ahead of them while later updates still coalesce among themselves
+    assert pending(queue) == ["btc-static", "btc-3"]
+    assert drain(queue) == ["btc-static", "btc-3"]
+
+
+def test_drop_oldest_policy_does_not_coalesce():
+    queue = ClientQueue(FakeWebSocket(), maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+    queue.put("btc-1", key="BTCUSDT")
+    queue.put("btc-2", key="BTCUSDT")
+    queue.put("btc-3", key="BTCUSDT")
+
+    assert pending(queue) == ["btc-2", "btc-3"]
+    assert queue.dropped == 1
+
+
+def test_full_coalescing_queue_drops_oldest_for_new_keys():
+    queue = ClientQueue(FakeWebSocket(), maxsize=2)
+    queue.put("btc-1", key="BTCUSDT")
+    queue.put("eth-1", key="ETHUSDT")
+    assert queue.put("btc-2", key="BTCUSDT")
+    assert queue.dropped == 0
+
+    queue.put("bnb-1", key="BNBUSDT")
+    assert pending(queue) == ["eth-1", "bnb-1"]
+    assert queue.dropped == 1
+
+
+def test_disconnect_policy_closes_full_queue():
+    websocket = FakeWebSocket()
+    closed = []
+    queue = ClientQueue(websocket, maxsize=1, policy=OverflowPolicy.DISCONNECT, on_close=closed.append)
+    assert queue.put("alert-1")
+    assert not queue.put("alert-2")
+    assert queue.closed
+    assert not queue.put("alert-3")
+
+    async def run():
+        queue.start()
+        await queue._task
+    asyncio.run(run())
+    assert websocket.close_code == 1013
+    assert closed == [websocket]
+
+
+def test_max_rate_switches_to_coalescing():
+    queue = ClientQueue(FakeWebSocket(), policy=OverflowPolicy.DROP_OLDEST, max_rate=4)
+    assert queue.policy is OverflowPolicy.COALESCE
+    assert queue.min_interval == 0.25
+
+    queue.set_max_rate(None)
+    assert queue.policy is OverflowPolicy.DROP_OLDEST
+    assert queue.min_interval == 0.0
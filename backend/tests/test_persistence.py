@@ -0,0 +1,119 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.ingest import Tick
+from app.persistence import TickWriter
+
+T0 = 1_700_000_000 * 10**9
+MS = 1_000_000
+
+
+def ticks(count, start=0):
+    return [Tick("BTCUSDT", 100.0 + i, 1.0, T0 + i * MS) for i in range(start, start + count)]
+
+
+def stored(path):
+    connection = sqlite3.connect(path)
+    try:
+        return [row[0] for row in connection.execute("SELECT price FROM crypto_prices ORDER BY id")]
+    finally:
+        connection.close()
+
+
+async def until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_interval(tmp_path):
+    path = tmp_path / "ticks.db"
+
+    async def run():
+        writer = TickWriter(f"sqlite:///{path}", batch_size=3, flush_interval=60.0)
+        await writer.start()
+        try:
+            await writer.add(ticks(2))
+            await asyncio.sleep(0.05)
+            assert writer.written == 0
+            await writer.add(ticks(2, start=2))
+            await until(lambda: writer.written == 3)
+            assert len(writer) == 1
+        finally:
+            await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+    # close() flushes the remainder
+    assert writer.stats() == {"buffered": 0, "written": 4, "dropped": 0, "failed_flushes": 0}
+    assert stored(path) == [100.0, 101.0, 102.0, 103.0]
+
+
+def test_partial_batch_is_flushed_on_the_interval(tmp_path):
+    path = tmp_path / "ticks.db"
+
+    async def run():
+        writer = TickWriter(f"sqlite:///{path}", batch_size=100, flush_interval=0.05)
+        await writer.start()
+        try:
+            await writer.add(ticks(2))
+            await until(lambda: writer.written == 2)
+            return stored(path)
+        finally:
+            await writer.close()
+
+    assert asyncio.run(run()) == [100.0, 101.0]
+
+
+def test_failed_flush_keeps_the_rows_and_retries(tmp_path):
+    path = tmp_path / "ticks.db"
+
+    async def run():
+        writer = TickWriter(f"sqlite:///{path}", batch_size=100, flush_interval=0.05)
+        await writer.start()
+        write, failures = writer._write, [RuntimeError("database is down")]
+
+        def flaky(rows):
+            if failures:
+                raise failures.pop()
+            write(rows)
+
+        writer._write = flaky
+        try:
+            await writer.add(ticks(3))
+            await until(lambda: writer.written == 3)
+        finally:
+            await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.failed_flushes == 1
+    assert stored(path) == [100.0, 101.0, 102.0]
+
+
+def test_full_buffer_drops_the_oldest_rows():
+    async def run():
+        # Not started: nothing flushes, as with a stalled database
+        writer = TickWriter("sqlite://", batch_size=2, max_buffer=4, drop_when_full=True)
+        await writer.add(ticks(6))
+        return writer
+
+    writer = asyncio.run(run())
+    assert len(writer) == 4
+    assert writer.dropped == 2
+    assert [row[2] for row in writer._buffer] == [102.0, 103.0, 104.0, 105.0]
+
+
+def test_full_buffer_holds_the_caller_until_a_flush_makes_room():
+    async def run():
+        writer = TickWriter("sqlite://", batch_size=2, max_buffer=4)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(writer.add(ticks(5)), 0.1)
+        return writer
+
+    writer = asyncio.run(run())
+    assert len(writer) == 4
+    assert writer.dropped == 0
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+from app.protocol import PROTOCOL_V2, SHORT_KEYS, DeltaTracker, snapshot_message
+
+LONG_KEYS = {key: field for field, key in SHORT_KEYS.items() if field != "timestamp"}
+MS = 1_000_000
+T0 = 1_767_225_600_000 * MS
+
+
+def expand(state, message):
+    """Apply a v2 snapshot or delta like the frontend's applyUpdate"""
+    previous = {} if message["e"] == "snap" else state.get(message["s"], {})
+    record = dict(previous)
+    for key, value in message.items():
+        if key in LONG_KEYS:
+            record[LONG_KEYS[key]] = value
+    record["t"] = message["t"]
+    state[message["s"]] = record
+    return record
+
+
+def quote(price, **fields):
+    record = {
+        "symbol": "BTCUSDT",
+        "name": "Bitcoin",
+        "price": price,
+        "volume_24h": 1000.0,
+        "price_change_24h": 1.5,
+        "high_24h": 47250.0,
+        "low_24h": 42750.0,
+    }
+    record.update(fields)
+    return record
+
+
+def fields(record):
+    return {field: value for field, value in record.items() if field != "t"}
+
+
+def test_snapshot_then_deltas_expand_to_the_latest_record():
+    tracker, state = DeltaTracker(), {}
+    first = quote(45000.0)
+    tracker.seed("BTCUSDT", first)
+    expand(state, snapshot_message(first, T0))
+    assert fields(state["BTCUSDT"]) == first
+
+    updates = [
+        quote(45001.0, volume_24h=1001.0),
+        quote(45002.0, price_change_24h=1.7),
+        quote(45003.0, price_change_24h=1.7, high_24h=47300.0),
+        quote(45004.0, price_change_24h=1.7, high_24h=47300.0),
+    ]
+    for i, record in enumerate(updates, 1):
+        message, _ = tracker.delta("BTCUSDT", record, T0 + i * MS)
+        assert fields(expand(state, message)) == record
+        assert state["BTCUSDT"]["t"] == (T0 + i * MS) // MS
+
+
+def test_deltas_carry_only_changed_static_fields():
+    tracker = DeltaTracker()
+    tracker.seed("BTCUSDT", quote(45000.0))
+
+    message, coalescable = tracker.delta("BTCUSDT", quote(45001.0), T0)
+    assert message == {"e": "d", "s": "BTCUSDT", "t": T0 // MS, "p": 45001.0, "v": 1000.0}
+    assert coalescable
+
+    message, coalescable = tracker.delta("BTCUSDT", quote(45002.0, low_24h=42000.0), T0)
+    assert message["l"] == 42000.0
+    assert "c" not in message and "h" not in message
+    assert not coalescable
+
+    # Sent once; the next delta is back to the volatile fields only
+    message, coalescable = tracker.delta("BTCUSDT", quote(45003.0, low_24h=42000.0), T0)
+    assert "l" not in message
+    assert coalescable
+
+
+def test_first_delta_without_snapshot_carries_every_field():
+    tracker, state = DeltaTracker(), {}
+    record = quote(45000.0)
+    message, coalescable = tracker.delta("BTCUSDT", record, T0)
+    assert not coalescable
+    assert fields(expand(state, message)) == record
+
+
+def test_seed_does_not_override_sent_static_fields():
+    tracker = DeltaTracker()
+    tracker.delta("BTCUSDT", quote(45000.0), T0)
+    # A late subscriber's snapshot must not make the tracker forget what
+    # deltas already delivered to other clients
+    tracker.seed("BTCUSDT", quote(45000.0, name="Other"))
+    _, coalescable = tracker.delta("BTCUSDT", quote(45001.0), T0)
+    assert coalescable
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def test_batched_cycle_deltas_expand_to_the_latest_record():
+    from app.main_simple import ConnectionManager
+
+    async def run():
+        manager, websocket = ConnectionManager(), FakeWebSocket()
+        await manager.connect(websocket, protocol=PROTOCOL_V2, batch=True)
+        await manager.subscribe(websocket, "BTCUSDT")
+        manager.deltas.seed("BTCUSDT", quote(45000.0))
+
+        # Two ticks in one cycle: a static change, then a price-only tick
+        manager.begin_cycle()
+        await manager.broadcast_price("BTCUSDT", quote(45001.0, high_24h=47300.0), T0 + MS)
+        await manager.broadcast_price("BTCUSDT", quote(45002.0, high_24h=47300.0), T0 + 2 * MS)
+        await manager.flush_cycle()
+        while len(manager.queues[websocket]):
+            await asyncio.sleep(0)
+        manager.disconnect(websocket)
+        return websocket.sent
+
+    [frame] = asyncio.run(run())
+    assert frame["e"] == "b"
+    [delta] = frame["u"]
+    state = {}
+    expand(state, snapshot_message(quote(45000.0), T0))
+    assert fields(expand(state, delta)) == quote(45002.0, high_24h=47300.0)
+    assert state["BTCUSDT"]["t"] == (T0 + 2 * MS) // MS
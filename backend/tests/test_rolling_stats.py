@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.rolling_stats import RollingStatsEngine, RollingWindow
+
+
+@pytest.mark.parametrize("size", [2, 7, 50])
+def test_window_matches_numpy(size):
+    values = np.random.default_rng(3).lognormal(mean=4.0, sigma=1.0, size=300)
+    window = RollingWindow(size)
+    for i, x in enumerate(values):
+        window.push(float(x))
+        held = values[max(0, i + 1 - size):i + 1]
+        assert window.count == len(held)
+        assert window.mean == pytest.approx(held.mean(), rel=1e-9)
+        expected = held.var(ddof=1) if len(held) > 1 else 0.0
+        assert window.variance == pytest.approx(expected, rel=1e-6, abs=1e-9)
+
+
+def test_zscore_of_constant_window_is_zero():
+    window = RollingWindow(3)
+    for _ in range(5):
+        window.push(2.0)
+    assert window.variance == 0.0
+    assert window.zscore(100.0) == 0.0
+
+
+def volume_alerts(engine, targets):
+    """Feed volumes at the given z-scores against the window; alerts per tick"""
+    raised = []
+    for z in targets:
+        window = engine.stats("BTCUSDT")["volume"]["windows"]["50"]
+        volume = window["mean"] + z * window["std"]
+        raised.append([(a["alert_type"], a["severity"]) for a in engine.update("BTCUSDT", 100.0, volume)])
+    return raised
+
+
+@pytest.fixture
+def engine():
+    engine = RollingStatsEngine(windows=(50,), min_samples=30)
+    # Flat price (no return alerts) and volume alternating 100 / 102
+    for i in range(40):
+        assert engine.update("BTCUSDT", 100.0, 100.0 + 2 * (i % 2)) == ()
+    return engine
+
+
+def test_alert_on_entering_and_escalating_levels_only(engine):
+    assert volume_alerts(engine, [3.2, 3.2, 5.0, 4.0, 6.5]) == [
+        [("volume_surge", "low")],
+        [],  # same level: no repeat
+        [("volume_surge", "high")],
+        [],  # lower level while still above the lowest threshold
+        [("volume_surge", "critical")],
+    ]
+
+
+def test_window_rearms_below_the_lowest_threshold(engine):
+    assert volume_alerts(engine, [3.6, 3.1, 3.6, 2.9, 3.6]) == [
+        [("volume_surge", "medium")],
+        [],
+        [],
+        [],  # re-armed
+        [("volume_surge", "medium")],
+    ]
+
+
+def test_volume_direction(engine):
+    assert volume_alerts(engine, [-3.6]) == [[("volume_drop", "medium")]]
@@ -0,0 +1,29 @@
+import numpy as np
+
+from app.simulator import GBMSimulator, synthetic_symbols
+
+
+def path(seed, steps=50, **kwargs):
+    simulator = GBMSimulator(synthetic_symbols(4), [100.0, 200.0, 50.0, 1.0], seed=seed, **kwargs)
+    # step() reuses its arrays, so keep copies
+    return [tuple(column.copy() for column in simulator.step()) for _ in range(steps)]
+
+
+def test_same_seed_gives_the_same_path():
+    first, second = path(42), path(42)
+    for (prices_a, volumes_a), (prices_b, volumes_b) in zip(first, second):
+        assert np.array_equal(prices_a, prices_b)
+        assert np.array_equal(volumes_a, volumes_b)
+    assert not np.array_equal(first[-1][0], path(43)[-1][0])
+
+
+def test_zero_volatility_follows_the_drift():
+    simulator = GBMSimulator(["BTCUSDT"], 100.0, drift=0.5, volatility=0.0, dt=3600.0, seed=1)
+    for _ in range(24):
+        prices, volumes = simulator.step()
+    assert np.isclose(prices[0], 100.0 * np.exp(0.5 * 24 * 3600 / (365.25 * 24 * 3600)))
+    assert 1e9 <= volumes[0] <= 10e9
+
+
+def test_synthetic_symbols():
+    assert synthetic_symbols(2, start=41) == ["SIM00041USDT", "SIM00042USDT"]
@@ -12,6 +12,9 @@ SET timezone = 'UTC';
 -- Create tables
 \i schema.sql
 
+-- Daily partitions, retention and rollups
+\i partitioning.sql
+
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_crypto_prices_symbol_timestamp ON crypto_prices (symbol, timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_sentiment_scores_symbol_timestamp ON sentiment_scores (symbol, timestamp DESC);
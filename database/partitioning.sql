@@ -0,0 +1,361 @@
+-- Partitioned tick storage, retention and incremental rollups
+--
+-- crypto_prices is range-partitioned by day on timestamp. Partitions are
+-- created ahead of time and dropped once older than the retention period
+-- (python -m app.manage_partitions, run from cron or a scheduler). 1m and
+-- 1h candles are rolled up into aggregated_metrics incrementally from a
+-- watermark, so each tick is aggregated once instead of rescanning 24h of
+-- ticks on every materialized view refresh.
+--
+-- Safe to run repeatedly. An existing unpartitioned crypto_prices is
+-- converted in place.
+
+SET timezone = 'UTC';
+
+-- Migration: convert an unpartitioned crypto_prices
+-- Version: 1.1.0
+DO $$
+DECLARE
+    first_day DATE;
+    day DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('crypto_prices')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE crypto_prices RENAME TO crypto_prices_legacy;
+
+    CREATE TABLE crypto_prices (
+        id BIGSERIAL,
+        symbol VARCHAR(20) NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        price DOUBLE PRECISION NOT NULL,
+        volume_24h DOUBLE PRECISION,
+        market_cap DOUBLE PRECISION,
+        price_change_1h DOUBLE PRECISION,
+        price_change_24h DOUBLE PRECISION,
+        price_change_7d DOUBLE PRECISION,
+        timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+    CREATE TABLE crypto_prices_default PARTITION OF crypto_prices DEFAULT;
+
+    -- One partition per day that has data; later days come from
+    -- ensure_crypto_prices_partitions below
+    SELECT MIN(timestamp AT TIME ZONE 'UTC')::date INTO first_day FROM crypto_prices_legacy;
+    IF first_day IS NOT NULL THEN
+        FOR day IN
+            SELECT generate_series(first_day, (NOW() AT TIME ZONE 'UTC')::date, INTERVAL '1 day')::date
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF crypto_prices FOR VALUES FROM (%L) TO (%L)',
+                'crypto_prices_p' || to_char(day, 'YYYYMMDD'),
+                day::timestamp AT TIME ZONE 'UTC',
+                (day + 1)::timestamp AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END IF;
+
+    INSERT INTO crypto_prices SELECT * FROM crypto_prices_legacy;
+    PERFORM setval(
+        pg_get_serial_sequence('crypto_prices', 'id'),
+        COALESCE((SELECT MAX(id) FROM crypto_prices), 0) + 1,
+        false
+    );
+    DROP TABLE crypto_prices_legacy CASCADE;
+END;
+$$;
+
+-- Indexes on the partitioned table cascade to every partition
+CREATE INDEX IF NOT EXISTS idx_crypto_prices_symbol_timestamp ON crypto_prices (symbol, timestamp DESC);
+
+-- Candle columns written by the rollups
+ALTER TABLE aggregated_metrics ADD COLUMN IF NOT EXISTS open_price DOUBLE PRECISION;
+ALTER TABLE aggregated_metrics ADD COLUMN IF NOT EXISTS close_price DOUBLE PRECISION;
+
+-- Create the partition for one UTC day; returns its name, or NULL if it exists
+CREATE OR REPLACE FUNCTION create_crypto_prices_partition(day DATE)
+RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := 'crypto_prices_p' || to_char(day, 'YYYYMMDD');
+    lower_bound TIMESTAMPTZ := day::timestamp AT TIME ZONE 'UTC';
+    upper_bound TIMESTAMPTZ := (day + 1)::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Rows for the day that already landed in the default partition must
+    -- move before the new partition can be attached. The CHECK constraint
+    -- lets ATTACH skip scanning the new partition.
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE crypto_prices INCLUDING DEFAULTS,
+             CHECK (timestamp >= %L AND timestamp < %L))',
+        partition_name, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'WITH moved AS (
+             DELETE FROM crypto_prices_default
+             WHERE timestamp >= $1 AND timestamp < $2
+             RETURNING *
+         )
+         INSERT INTO %I SELECT * FROM moved',
+        partition_name
+    ) USING lower_bound, upper_bound;
+    EXECUTE format(
+        'ALTER TABLE crypto_prices ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create missing daily partitions from days_back before today to
+-- days_ahead after it; returns the partitions created
+CREATE OR REPLACE FUNCTION ensure_crypto_prices_partitions(
+    days_ahead INTEGER DEFAULT 3,
+    days_back INTEGER DEFAULT 0
+)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    today DATE := (NOW() AT TIME ZONE 'UTC')::date;
+    day DATE;
+    created TEXT;
+BEGIN
+    FOR day IN
+        SELECT generate_series(today - days_back, today + days_ahead, INTERVAL '1 day')::date
+    LOOP
+        created := create_crypto_prices_partition(day);
+        IF created IS NOT NULL THEN
+            RETURN NEXT created;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention: drop daily partitions that end before NOW() - retention and
+-- delete expired rows from the default partition; returns the partitions
+-- dropped
+CREATE OR REPLACE FUNCTION drop_crypto_prices_partitions(retention INTERVAL DEFAULT INTERVAL '30 days')
+RETURNS SETOF TEXT AS $$
+DECLARE
+    cutoff TIMESTAMPTZ := NOW() - retention;
+    partition_name TEXT;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'crypto_prices'::regclass
+          AND child.relname ~ '^crypto_prices_p[0-9]{8}$'
+          AND (to_date(right(child.relname, 8), 'YYYYMMDD') + 1)::timestamp AT TIME ZONE 'UTC' <= cutoff
+        ORDER BY child.relname
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        RETURN NEXT partition_name;
+    END LOOP;
+
+    DELETE FROM crypto_prices_default WHERE timestamp < cutoff;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Table: rollup_watermarks
+-- End of the last window each rollup has aggregated
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    rollup VARCHAR(20) PRIMARY KEY,
+    watermark TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Roll new ticks up into 1m candles, and completed hours of 1m candles up
+-- into 1h candles, both upserted into aggregated_metrics. Only windows that
+-- closed at least `lateness` ago are aggregated; ticks arriving later than
+-- that are not included in their window. Returns the windows written.
+CREATE OR REPLACE FUNCTION refresh_price_rollups(lateness INTERVAL DEFAULT INTERVAL '1 minute')
+RETURNS TABLE (rollup TEXT, windows BIGINT) AS $$
+DECLARE
+    minute_from TIMESTAMPTZ;
+    minute_to TIMESTAMPTZ := date_trunc('minute', NOW() - lateness);
+    hour_from TIMESTAMPTZ;
+    hour_to TIMESTAMPTZ;
+    written BIGINT;
+BEGIN
+    -- 1m candles from raw ticks; the range predicate prunes partitions
+    SELECT watermark INTO minute_from FROM rollup_watermarks WHERE rollup_watermarks.rollup = '1m';
+    IF minute_from IS NULL THEN
+        SELECT date_trunc('minute', MIN(timestamp)) INTO minute_from FROM crypto_prices;
+    END IF;
+
+    IF minute_from IS NOT NULL AND minute_from < minute_to THEN
+        INSERT INTO aggregated_metrics (
+            symbol, window_start, window_end,
+            avg_price, min_price, max_price, vwap, open_price, close_price,
+            total_volume, trade_count, price_volatility, price_range, timestamp
+        )
+        SELECT
+            symbol,
+            bucket,
+            bucket + INTERVAL '1 minute',
+            AVG(price),
+            MIN(price),
+            MAX(price),
+            SUM(price * volume_24h) / NULLIF(SUM(volume_24h), 0),
+            (ARRAY_AGG(price ORDER BY timestamp, id))[1],
+            (ARRAY_AGG(price ORDER BY timestamp DESC, id DESC))[1],
+            SUM(volume_24h),
+            COUNT(*),
+            STDDEV(price),
+            MAX(price) - MIN(price),
+            NOW()
+        FROM (
+            SELECT *, date_trunc('minute', timestamp) AS bucket
+            FROM crypto_prices
+            WHERE timestamp >= minute_from AND timestamp < minute_to
+        ) ticks
+        GROUP BY symbol, bucket
+        ON CONFLICT (symbol, window_start, window_end) DO UPDATE SET
+            avg_price = EXCLUDED.avg_price,
+            min_price = EXCLUDED.min_price,
+            max_price = EXCLUDED.max_price,
+            vwap = EXCLUDED.vwap,
+            open_price = EXCLUDED.open_price,
+            close_price = EXCLUDED.close_price,
+            total_volume = EXCLUDED.total_volume,
+            trade_count = EXCLUDED.trade_count,
+            price_volatility = EXCLUDED.price_volatility,
+            price_range = EXCLUDED.price_range,
+            timestamp = EXCLUDED.timestamp;
+        GET DIAGNOSTICS written = ROW_COUNT;
+
+        INSERT INTO rollup_watermarks (rollup, watermark) VALUES ('1m', minute_to)
+        ON CONFLICT ON CONSTRAINT rollup_watermarks_pkey DO UPDATE SET watermark = EXCLUDED.watermark;
+        rollup := '1m';
+        windows := written;
+        RETURN NEXT;
+    END IF;
+
+    -- 1h candles from the 1m candles of every hour the 1m rollup completed.
+    -- Volatility is the pooled standard deviation of the minutes.
+    SELECT watermark INTO hour_from FROM rollup_watermarks WHERE rollup_watermarks.rollup = '1h';
+    SELECT date_trunc('hour', watermark) INTO hour_to FROM rollup_watermarks WHERE rollup_watermarks.rollup = '1m';
+    IF hour_from IS NULL THEN
+        SELECT date_trunc('hour', MIN(window_start)) INTO hour_from
+        FROM aggregated_metrics
+        WHERE window_end - window_start = INTERVAL '1 minute';
+    END IF;
+
+    IF hour_from IS NOT NULL AND hour_from < hour_to THEN
+        INSERT INTO aggregated_metrics (
+            symbol, window_start, window_end,
+            avg_price, min_price, max_price, vwap, open_price, close_price,
+            total_volume, trade_count, price_volatility, price_range, timestamp
+        )
+        SELECT
+            symbol,
+            bucket,
+            bucket + INTERVAL '1 hour',
+            SUM(avg_price * trade_count) / SUM(trade_count),
+            MIN(min_price),
+            MAX(max_price),
+            SUM(vwap * total_volume) / NULLIF(SUM(total_volume), 0),
+            (ARRAY_AGG(open_price ORDER BY window_start))[1],
+            (ARRAY_AGG(close_price ORDER BY window_start DESC))[1],
+            SUM(total_volume),
+            SUM(trade_count),
+            SQRT(GREATEST(
+                SUM((trade_count - 1) * COALESCE(price_volatility, 0) ^ 2)
+                + SUM(trade_count * avg_price ^ 2)
+                - SUM(trade_count * avg_price) ^ 2 / SUM(trade_count),
+                0
+            ) / NULLIF(SUM(trade_count) - 1, 0)),
+            MAX(max_price) - MIN(min_price),
+            NOW()
+        FROM (
+            SELECT *, date_trunc('hour', window_start) AS bucket
+            FROM aggregated_metrics
+            WHERE window_end - window_start = INTERVAL '1 minute'
+              AND window_start >= hour_from AND window_start < hour_to
+        ) minutes
+        GROUP BY symbol, bucket
+        ON CONFLICT (symbol, window_start, window_end) DO UPDATE SET
+            avg_price = EXCLUDED.avg_price,
+            min_price = EXCLUDED.min_price,
+            max_price = EXCLUDED.max_price,
+            vwap = EXCLUDED.vwap,
+            open_price = EXCLUDED.open_price,
+            close_price = EXCLUDED.close_price,
+            total_volume = EXCLUDED.total_volume,
+            trade_count = EXCLUDED.trade_count,
+            price_volatility = EXCLUDED.price_volatility,
+            price_range = EXCLUDED.price_range,
+            timestamp = EXCLUDED.timestamp;
+        GET DIAGNOSTICS written = ROW_COUNT;
+
+        INSERT INTO rollup_watermarks (rollup, watermark) VALUES ('1h', hour_to)
+        ON CONFLICT ON CONSTRAINT rollup_watermarks_pkey DO UPDATE SET watermark = EXCLUDED.watermark;
+        rollup := '1h';
+        windows := written;
+        RETURN NEXT;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 24h statistics from the 1m rollups (at most 1440 rows per symbol);
+-- replaces the mv_24h_stats materialized view that rescanned raw ticks
+DROP MATERIALIZED VIEW IF EXISTS mv_24h_stats;
+
+CREATE OR REPLACE VIEW price_stats_24h AS
+SELECT
+    symbol,
+    SUM(trade_count) AS data_points,
+    SUM(avg_price * trade_count) / SUM(trade_count) AS avg_price_24h,
+    MIN(min_price) AS min_price_24h,
+    MAX(max_price) AS max_price_24h,
+    SQRT(GREATEST(
+        SUM((trade_count - 1) * COALESCE(price_volatility, 0) ^ 2)
+        + SUM(trade_count * avg_price ^ 2)
+        - SUM(trade_count * avg_price) ^ 2 / SUM(trade_count),
+        0
+    ) / NULLIF(SUM(trade_count) - 1, 0)) AS price_volatility_24h,
+    SUM(total_volume) AS total_volume_24h
+FROM aggregated_metrics
+WHERE window_end - window_start = INTERVAL '1 minute'
+  AND window_start >= NOW() - INTERVAL '24 hours'
+GROUP BY symbol;
+
+-- Dashboard refresh now advances the rollups instead of recomputing 24h stats
+CREATE OR REPLACE FUNCTION refresh_dashboard_views()
+RETURNS void AS $$
+BEGIN
+    PERFORM refresh_price_rollups();
+    IF to_regclass('mv_latest_prices') IS NOT NULL THEN
+        REFRESH MATERIALIZED VIEW CONCURRENTLY mv_latest_prices;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention for raw ticks drops whole partitions instead of DELETE
+CREATE OR REPLACE FUNCTION cleanup_old_data()
+RETURNS void AS $$
+BEGIN
+    -- Keep only 30 days of raw price data
+    PERFORM drop_crypto_prices_partitions(INTERVAL '30 days');
+
+    -- Keep only 90 days of aggregated metrics
+    DELETE FROM aggregated_metrics
+    WHERE timestamp < NOW() - INTERVAL '90 days';
+
+    -- Keep only 7 days of sentiment scores
+    DELETE FROM sentiment_scores
+    WHERE timestamp < NOW() - INTERVAL '7 days';
+
+    -- Archive resolved alerts older than 30 days
+    DELETE FROM market_alerts
+    WHERE is_active = FALSE
+    AND resolved_at < NOW() - INTERVAL '30 days';
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_crypto_prices_partitions(3, 1);
+
+-- Success message
+SELECT 'Partitioning setup completed successfully!' AS status;
@@ -1,9 +1,10 @@
 -- Crypto Analytics Database Schema
 
 -- Table: crypto_prices
--- Stores real-time and historical cryptocurrency price data
+-- Stores real-time and historical cryptocurrency price data, partitioned by
+-- day on timestamp (see partitioning.sql for partition management)
 CREATE TABLE IF NOT EXISTS crypto_prices (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     symbol VARCHAR(20) NOT NULL,
     name VARCHAR(100) NOT NULL,
     price DOUBLE PRECISION NOT NULL,
@@ -12,8 +13,12 @@ CREATE TABLE IF NOT EXISTS crypto_prices (
     price_change_1h DOUBLE PRECISION,
     price_change_24h DOUBLE PRECISION,
     price_change_7d DOUBLE PRECISION,
-    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
-);
+    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside the daily partitions created so far
+CREATE TABLE IF NOT EXISTS crypto_prices_default PARTITION OF crypto_prices DEFAULT;
 
 -- Table: sentiment_scores
 -- Stores sentiment analysis scores from various sources
@@ -39,6 +44,8 @@ CREATE TABLE IF NOT EXISTS aggregated_metrics (
     min_price DOUBLE PRECISION,
     max_price DOUBLE PRECISION,
     vwap DOUBLE PRECISION,
+    open_price DOUBLE PRECISION,
+    close_price DOUBLE PRECISION,
     
     -- Volume metrics
     total_volume DOUBLE PRECISION,
@@ -71,6 +78,17 @@ CREATE TABLE IF NOT EXISTS market_alerts (
     resolved_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Table: stream_sink_batches
+-- Spark micro-batches committed per sink, written in the same transaction as
+-- the batch's rows so a replayed batch is skipped (exactly-once sinks)
+CREATE TABLE IF NOT EXISTS stream_sink_batches (
+    sink VARCHAR(50) NOT NULL,
+    query_id VARCHAR(64) NOT NULL,
+    batch_id BIGINT NOT NULL,
+    committed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    PRIMARY KEY (sink, query_id, batch_id)
+);
+
 -- Table: user_watchlist (optional - for user preferences)
 CREATE TABLE IF NOT EXISTS user_watchlist (
     id SERIAL PRIMARY KEY,
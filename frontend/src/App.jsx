@@ -21,18 +21,14 @@ function App() {
         const cryptos = await cryptoAPI.getTrackedCryptos();
         setTrackedSymbols(cryptos.symbols || []);
 
-        // Fetch initial data for each symbol
-        for (const symbol of cryptos.symbols || []) {
-          try {
-            const [priceData, historical] = await Promise.all([
-              cryptoAPI.getCurrentPrice(symbol),
-              cryptoAPI.getHistoricalData(symbol, 24)
-            ]);
+        // All current prices in one request
+        const prices = await cryptoAPI.getAllPrices();
+        setCryptoData(prev => ({ ...prev, ...prices }));
 
-            setCryptoData(prev => ({
-              ...prev,
-              [symbol]: priceData
-            }));
+        // Fetch history for each symbol in parallel
+        await Promise.all((cryptos.symbols || []).map(async (symbol) => {
+          try {
+            const historical = await cryptoAPI.getHistoricalData(symbol, 24);
 
             setHistoricalData(prev => ({
               ...prev,
@@ -41,7 +37,7 @@ function App() {
           } catch (err) {
             console.error(`Error fetching data for ${symbol}:`, err);
           }
-        }
+        }));
 
         setLoading(false);
       } catch (err) {
@@ -13,16 +13,22 @@ export const cryptoAPI = {
     return response.data;
   },
 
+  // Get current prices for all symbols in one request
+  getAllPrices: async () => {
+    const response = await api.get('/prices');
+    return response.data.prices;
+  },
+
   // Get current price for a symbol
   getCurrentPrice: async (symbol) => {
     const response = await api.get(`/prices/${symbol}`);
     return response.data;
   },
 
-  // Get historical data
-  getHistoricalData: async (symbol, hours = 24) => {
+  // Get historical data, downsampled server-side to at most maxPoints
+  getHistoricalData: async (symbol, hours = 24, maxPoints = 100) => {
     const response = await api.get(`/historical/${symbol}`, {
-      params: { hours }
+      params: { hours, max_points: maxPoints }
     });
     return response.data;
   },
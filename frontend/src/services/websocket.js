@@ -1,6 +1,18 @@
 import API_CONFIG from '../config';
 
-const WS_URL = API_CONFIG.wsURL + '/ws';
+// Protocol 2: snapshot on subscribe, then compact deltas with short keys,
+// batched into one frame per server tick cycle
+const WS_URL = API_CONFIG.wsURL + '/ws?protocol=2&batch=1';
+
+const LONG_KEYS = {
+  s: 'symbol',
+  n: 'name',
+  p: 'price',
+  v: 'volume_24h',
+  c: 'price_change_24h',
+  h: 'high_24h',
+  l: 'low_24h',
+};
 
 class WebSocketService {
   constructor() {
@@ -8,6 +20,19 @@ class WebSocketService {
     this.reconnectInterval = 3000;
     this.listeners = new Map();
     this.isConnected = false;
+    this.prices = new Map();
+  }
+
+  // Expand a snapshot/delta into a full price_update record
+  applyUpdate(message) {
+    const previous = message.e === 'snap' ? {} : (this.prices.get(message.s) || {});
+    const record = { ...previous, type: 'price_update' };
+    Object.entries(message).forEach(([key, value]) => {
+      if (LONG_KEYS[key]) record[LONG_KEYS[key]] = value;
+    });
+    record.timestamp = new Date(message.t).toISOString();
+    this.prices.set(message.s, record);
+    return record;
   }
 
   connect(onConnectionChange) {
@@ -23,7 +48,13 @@ class WebSocketService {
       this.ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
-          this.notifyListeners(data);
+          if (data.e === 'b') {
+            data.u.forEach(delta => this.notifyListeners(this.applyUpdate(delta)));
+          } else if (data.e === 'snap' || data.e === 'd') {
+            this.notifyListeners(this.applyUpdate(data));
+          } else {
+            this.notifyListeners(data);
+          }
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -0,0 +1,78 @@
+"""
+Fear & Greed index: scalar loop vs array-native computation.
+
+Generates ``--rows`` aggregated_metrics-like rows (``--symbols`` symbols,
+one window each per step) and computes the index for every row:
+- loop: per-symbol Python loop deriving the rolling inputs row by row, then
+  calculate_fear_greed_index on each row
+- numpy: fear_greed_inputs plus fear_greed_index_array in one call
+
+Also checks that both produce the same indices.
+
+Usage (from spark/):
+    python -m benchmarks.fear_greed --rows 200000 --symbols 1000
+"""
+import argparse
+import statistics
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+from sentiment_analyzer import (
+    FEAR_GREED_LOOKBACK,
+    calculate_fear_greed_index,
+    fear_greed_index_array,
+    fear_greed_inputs,
+)
+
+
+def loop_indices(symbols, prices, volumes, lookback):
+    history = defaultdict(lambda: (deque(maxlen=lookback), deque(maxlen=lookback), deque(maxlen=lookback)))
+    indices = []
+    for symbol, price, volume in zip(symbols, prices, volumes):
+        window_prices, window_volumes, window_returns = history[symbol]
+        if window_prices:
+            window_returns.append(price / window_prices[-1] - 1)
+        window_prices.append(price)
+        window_volumes.append(volume)
+
+        # The return of the window's first row is against the row before it
+        returns = list(window_returns)[-len(window_prices):]
+        mean_volume = sum(window_volumes) / len(window_volumes)
+        price_change = (price / window_prices[0] - 1) * 100
+        volume_ratio = volume / mean_volume if mean_volume > 0 else 1.0
+        volatility = statistics.stdev(returns) * 100 if len(returns) > 1 else 0.0
+        indices.append(calculate_fear_greed_index(price_change, volume_ratio, volatility))
+    return np.array(indices)
+
+
+def timed(label, rows, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<6} {elapsed:7.2f} s  {rows / elapsed:>12,.0f} rows/s")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--lookback", type=int, default=FEAR_GREED_LOOKBACK)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    symbols = np.tile(np.arange(args.symbols), args.rows // args.symbols + 1)[:args.rows]
+    prices = 100 * np.exp(rng.normal(0, 0.01, args.rows).cumsum())
+    volumes = rng.uniform(0, 1000, args.rows)
+
+    loop_s, expected = timed("loop", args.rows, lambda: loop_indices(
+        symbols.tolist(), prices.tolist(), volumes.tolist(), args.lookback))
+    numpy_s, indices = timed("numpy", args.rows, lambda: fear_greed_index_array(
+        *fear_greed_inputs(symbols, prices, volumes, args.lookback)))
+    print(f"speedup: {loop_s / numpy_s:.1f}x, mismatched rows: {int((expected != indices).sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-batch Redis time of the Spark batch path as tracked symbols grow.
+
+Loads ``price:<symbol>`` keys and the ``price:updated`` index for N
+symbols, updates ``--changed`` of them per batch, then times one batch read
+with each strategy:
+- keys_get: KEYS price:* then one GET per key (the old batch path)
+- scan_mget: SCAN cursor plus chunked MGET (full snapshot)
+- incremental: RedisPriceReader.read_changed (changed symbols only)
+
+Needs a Redis server it may write to; the benchmark keys are deleted after.
+
+Usage (from spark/):
+    python -m benchmarks.redis_reads --url redis://localhost:6379 --symbols 1000 10000 50000
+"""
+import argparse
+import json
+import time
+
+import redis
+
+from redis_reader import RedisPriceReader
+
+
+def load(client, symbols, now_us):
+    pipe = client.pipeline(transaction=False)
+    for i in range(symbols):
+        symbol = f"SIM{i:05d}USDT"
+        pipe.set(f"price:{symbol}", json.dumps({"symbol": symbol, "price": 100.0, "timestamp": now_us}))
+        if i % 1000 == 999:
+            pipe.execute()
+    pipe.execute()
+    client.zadd("price:updated", {f"SIM{i:05d}USDT": now_us for i in range(symbols)})
+
+
+def update(client, symbols, changed, now_us):
+    step = max(1, symbols // changed)
+    values = {f"price:SIM{i:05d}USDT": json.dumps({"price": 101.0}) for i in range(0, symbols, step)}
+    pipe = client.pipeline()
+    pipe.mset(values)
+    pipe.zadd("price:updated", {key[len("price:"):]: now_us for key in values})
+    pipe.execute()
+
+
+def keys_get(client):
+    return [json.loads(client.get(key)) for key in client.keys("price:*") if key != "price:updated"]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="redis://localhost:6379")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--changed", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = redis.Redis.from_url(args.url, decode_responses=True)
+    reader = RedisPriceReader(client, chunk_size=args.chunk_size)
+    print(f"{'symbols':>8} {'keys_get ms':>12} {'scan_mget ms':>13} {'incremental ms':>15} {'changed':>8}")
+    for symbols in args.symbols:
+        client.delete("price:updated", *[key for key in client.scan_iter("price:*", count=1000)])
+        now_us = int(time.time() * 1e6)
+        load(client, symbols, now_us)
+        update(client, symbols, args.changed, now_us + 1)
+
+        keys_ms, _ = timed(lambda: keys_get(client))
+        scan_ms, _ = timed(reader.read_all)
+        incremental_ms, (records, _) = timed(lambda: reader.read_changed(now_us))
+        print(f"{symbols:>8} {keys_ms:>12.1f} {scan_ms:>13.1f} {incremental_ms:>15.2f} {len(records):>8}")
+
+    client.delete("price:updated", *[key for key in client.scan_iter("price:*", count=1000)])
+
+
+if __name__ == "__main__":
+    main()
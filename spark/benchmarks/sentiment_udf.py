@@ -0,0 +1,87 @@
+"""
+Python UDF vs native column expressions for price-action sentiment.
+
+Scores ``--rows`` random 24h price changes three ways and times a full
+aggregation over the result:
+- udf: the previous row-at-a-time ``@udf`` around analyze_price_action
+  plus get_sentiment_label (every row is pickled to a Python worker)
+- native: price_sentiment_column / sentiment_label_column (when/otherwise
+  evaluated in the JVM)
+
+Also checks that both produce the same scores and labels.
+
+Usage (from spark/):
+    python -m benchmarks.sentiment_udf --rows 3000000
+"""
+import argparse
+import time
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, rand, sum as spark_sum, udf
+from pyspark.sql.types import DoubleType, StringType
+
+from sentiment_analyzer import (
+    SentimentAnalyzer,
+    get_sentiment_label,
+    price_sentiment_column,
+    sentiment_label_column,
+)
+
+
+def udf_columns(analyzer):
+    @udf(returnType=DoubleType())
+    def price_sentiment(price_change):
+        if price_change is None:
+            return 0.0
+        return analyzer.analyze_price_action(price_change)['sentiment']
+
+    label = udf(get_sentiment_label, StringType())
+    return price_sentiment, label
+
+
+def timed(df):
+    start = time.perf_counter()
+    row = df.agg(
+        spark_sum("score").alias("score"),
+        spark_sum((col("label") == "Bullish").cast("int")).alias("bullish"),
+    ).collect()[0]
+    return time.perf_counter() - start, row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--partitions", type=int, default=8)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.appName("SentimentUdfBenchmark") \
+        .config("spark.ui.showConsoleProgress", "false") \
+        .getOrCreate()
+    spark.sparkContext.setLogLevel("WARN")
+    prices = spark.range(args.rows, numPartitions=args.partitions) \
+        .withColumn("price_change_24h", (rand(seed=1) - 0.5) * 40) \
+        .cache()
+    prices.count()
+
+    price_sentiment, label = udf_columns(SentimentAnalyzer())
+    scored_udf = prices.withColumn("score", price_sentiment(col("price_change_24h"))) \
+        .withColumn("label", label(col("score")))
+    scored_native = prices.withColumn("score", price_sentiment_column(col("price_change_24h"))) \
+        .withColumn("label", sentiment_label_column(col("score")))
+
+    udf_s, udf_row = timed(scored_udf)
+    native_s, native_row = timed(scored_native)
+    mismatches = scored_udf.alias("u").join(scored_native.alias("n"), "id") \
+        .filter((col("u.score") != col("n.score")) | (col("u.label") != col("n.label"))) \
+        .count()
+
+    print(f"rows: {args.rows:,}")
+    print(f"udf:    {udf_s:7.2f} s  ({args.rows / udf_s:>12,.0f} rows/s)")
+    print(f"native: {native_s:7.2f} s  ({args.rows / native_s:>12,.0f} rows/s)")
+    print(f"speedup: {udf_s / native_s:.1f}x, mismatched rows: {mismatches}")
+    assert udf_row == native_row
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Text sentiment throughput: per-text tokenizing vs the batch engine.
+
+Generates ``--texts`` synthetic posts (10-40 words, a few lexicon terms
+each) and scores them with:
+- tokenize: the previous analyze_text (lowercase, regex tokenize, two
+  generator passes per text)
+- regex: TextSentimentEngine.score_batch with the trie regex scan
+- batch: TextSentimentEngine.score_batch (Aho-Corasick when pyahocorasick
+  is installed)
+- parallel: TextSentimentEngine.score_parallel across a process pool
+
+Usage (from spark/):
+    python -m benchmarks.text_sentiment --texts 1000000 --processes 4
+"""
+import argparse
+import random
+import re
+import time
+
+from text_sentiment import DEFAULT_LEXICON, TextSentimentEngine
+
+FILLER = (
+    "the market is looking at btc eth today after news from the exchange and "
+    "traders on twitter say this week could be big for crypto prices overall"
+).split()
+
+
+def make_texts(count, seed=1):
+    rng = random.Random(seed)
+    terms = list(DEFAULT_LEXICON) + ["not", "never"]
+    texts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(10, 40))
+        for _ in range(rng.randint(0, 4)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+        texts.append(" ".join(words))
+    return texts
+
+
+def tokenize_scores(texts):
+    positive = {word for word, weight in DEFAULT_LEXICON.items() if weight > 0}
+    negative = {word for word, weight in DEFAULT_LEXICON.items() if weight < 0}
+    scores = []
+    for text in texts:
+        words = re.findall(r'\w+', text.lower())
+        positive_count = sum(1 for word in words if word in positive)
+        negative_count = sum(1 for word in words if word in negative)
+        total = positive_count + negative_count
+        scores.append((positive_count - negative_count) / total if total else 0.0)
+    return scores
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed:7.2f} s  {count / elapsed:>12,.0f} texts/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=1_000_000)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    engine = TextSentimentEngine()
+    regex_engine = TextSentimentEngine()
+    regex_engine._automaton = None  # force the stdlib fallback
+    base = timed("tokenize", len(texts), lambda: tokenize_scores(texts))
+    regex = timed("regex", len(texts), lambda: regex_engine.score_batch(texts))
+    batch = timed("batch", len(texts), lambda: engine.score_batch(texts))
+    parallel = timed("parallel", len(texts), lambda: engine.score_parallel(texts, args.processes))
+    print(f"speedup: regex {base / regex:.1f}x, batch {base / batch:.1f}x, parallel {base / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Redis access layer for the batch path of the Spark job.
+
+Latest prices live under ``price:<symbol>`` as JSON, and the sorted set
+``price:updated`` maps each symbol to the time of its last update
+(epoch microseconds). ``RedisPriceReader`` reads them without ``KEYS`` or
+per-key round trips:
+- ``scan_keys`` walks the keyspace with a ``SCAN`` cursor
+- ``mget`` fetches values in chunks, one round trip per chunk
+- ``read_changed`` reads only the symbols updated since the last offset,
+  so a batch costs O(changed symbols), not O(tracked symbols); each page
+  of the index and its values is read atomically by a Lua script
+
+The backend writes each tick batch's values and index scores in one
+MULTI/EXEC (``app.tick_stream``), so the index never points ahead of the
+values.
+"""
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import redis
+
+# One page of read_changed: up to ARGV[2] symbols scored after ARGV[1] and
+# their values. A tick batch gives many symbols the same score and a full
+# page may end inside that group, so the last score's whole group is read.
+# Returns {last score, values, page was full}.
+READ_PAGE_LUA = """
+local limit = tonumber(ARGV[2])
+local page = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[1], '+inf', 'WITHSCORES', 'LIMIT', 0, limit)
+if #page == 0 then
+    return {}
+end
+local last = page[#page]
+local full = #page == 2 * limit
+local keys = {}
+for i = 1, #page, 2 do
+    if not full or page[i + 1] ~= last then
+        table.insert(keys, ARGV[3] .. page[i])
+    end
+end
+if full then
+    for _, symbol in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], last, last)) do
+        table.insert(keys, ARGV[3] .. symbol)
+    end
+end
+local values = {}
+for i = 1, #keys, limit do
+    for _, value in ipairs(redis.call('MGET', unpack(keys, i, math.min(i + limit - 1, #keys)))) do
+        table.insert(values, value)
+    end
+end
+return {last, values, full and 1 or 0}
+"""
+
+
+class RedisPriceReader:
+    """Chunked, incremental reads of ``price:*`` keys"""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        prefix: str = "price:",
+        index: str = "price:updated",
+        chunk_size: int = 1000,
+    ):
+        self.redis = client
+        self.prefix = prefix
+        self.index = index
+        self.chunk_size = chunk_size
+        self._read_page = client.register_script(READ_PAGE_LUA)
+
+    def scan_keys(self, match: Optional[str] = None) -> Iterator[str]:
+        """Yield keys matching ``match`` (default ``<prefix>*``) with a SCAN cursor"""
+        match = match or f"{self.prefix}*"
+        cursor = 0
+        while True:
+            cursor, keys = self.redis.scan(cursor, match=match, count=self.chunk_size)
+            for key in keys:
+                # The update index shares the prefix
+                if key != self.index:
+                    yield key
+            if cursor == 0:
+                return
+
+    def mget(self, keys: Iterable[str]) -> Iterator[Dict]:
+        """Decoded JSON values for ``keys``, one MGET per chunk; missing keys are skipped"""
+        chunk: List[str] = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) == self.chunk_size:
+                yield from self._decode(self.redis.mget(chunk))
+                chunk = []
+        if chunk:
+            yield from self._decode(self.redis.mget(chunk))
+
+    @staticmethod
+    def _decode(values: List[Optional[str]]) -> Iterator[Dict]:
+        for value in values:
+            if value:
+                yield json.loads(value)
+
+    def read_all(self) -> List[Dict]:
+        """Every latest price (full snapshot)"""
+        return list(self.mget(self.scan_keys()))
+
+    def read_changed(self, since: float = 0) -> Tuple[List[Dict], float]:
+        """
+        Latest prices of the symbols updated after ``since``
+
+        Each page's index scores and values are read in one script, so a
+        value is never newer than the offset returned with it; otherwise a
+        symbol updated between the two reads would be read again, with the
+        same value, by the next call.
+
+        Args:
+            since: Offset returned by the previous call (0 reads everything)
+
+        Returns:
+            (records, offset) to pass as ``since`` next time
+        """
+        records: List[Dict] = []
+        offset = since
+        while True:
+            page = self._read_page(keys=[self.index], args=[f"({offset}", self.chunk_size, self.prefix])
+            if not page:
+                return records, offset
+
+            last, values, full = page
+            records.extend(self._decode(values))
+            offset = float(last)
+            if not full:
+                return records, offset
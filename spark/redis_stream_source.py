@@ -0,0 +1,158 @@
+"""
+Redis Streams to Spark Structured Streaming bridge.
+
+Spark has no Redis source, so ``RedisStreamSpool`` reads the backend's tick
+stream with XREADGROUP on a driver thread and writes each batch of entries
+as one NDJSON file into a spool directory, which ``readStream.json`` then
+picks up on every trigger.
+
+Delivery is exactly-once into Spark:
+- a file is written under a temporary dot-name (ignored by Spark) and
+  renamed into place before its entries are acknowledged
+- after a crash, the unacknowledged batch is re-read from the pending list
+  with the same boundaries, so it is rewritten under the same file name,
+  which the file source's checkpoint has already recorded if it was read
+
+Several queries read the same spool, so files are pruned by age
+(``retention`` seconds) rather than by a query's ``cleanSource``.
+"""
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import redis
+
+Entry = Tuple[str, dict]
+
+
+class RedisStreamSpool:
+    """Consumer-group reader spooling stream entries to NDJSON files"""
+
+    def __init__(
+        self,
+        redis_url: str,
+        spool_dir: str,
+        stream: str = "ticks:stream",
+        group: str = "spark",
+        consumer: str = "spark-driver",
+        batch_size: int = 5000,
+        block_ms: int = 1000,
+        linger_ms: int = 500,
+        retention: float = 3600,
+        client: Optional[redis.Redis] = None,
+    ):
+        self.redis = client or redis.Redis.from_url(redis_url, decode_responses=True)
+        self.spool_dir = spool_dir
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.linger_ms = linger_ms
+        self.retention = retention
+        self.spooled = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_group(self):
+        """Create the consumer group (reading from the start) if it does not exist"""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _read(self, start: str, block: Optional[int]) -> List[Entry]:
+        response = self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: start}, count=self.batch_size, block=block
+        )
+        return response[0][1] if response else []
+
+    def _spool(self, entries: List[Entry]) -> str:
+        """Write entries to a file named after their id range; returns its path"""
+        name = f"{entries[0][0]}_{entries[-1][0]}.json"
+        path = os.path.join(self.spool_dir, name)
+        temp = os.path.join(self.spool_dir, f".{name}.tmp")
+        with open(temp, "w") as f:
+            for _, fields in entries:
+                # Pending entries already trimmed by MAXLEN come back empty
+                if fields:
+                    f.write(fields["data"])
+                    f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+        return path
+
+    def _collect(self, block: Optional[int]) -> List[Entry]:
+        """New entries, read for up to ``linger_ms`` to fill ``batch_size``"""
+        entries = self._read(">", block)
+        deadline = time.monotonic() + self.linger_ms / 1000
+        while entries and len(entries) < self.batch_size:
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if remaining <= 0:
+                break
+            more = self.redis.xreadgroup(
+                self.group, self.consumer, {self.stream: ">"},
+                count=self.batch_size - len(entries), block=remaining,
+            )
+            if more:
+                entries.extend(more[0][1])
+        return entries
+
+    def prune(self) -> int:
+        """Delete spooled files older than ``retention`` seconds"""
+        cutoff = time.time() - self.retention
+        removed = 0
+        for entry in os.scandir(self.spool_dir):
+            if not entry.name.startswith(".") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+    def drain_once(self, block: Optional[int] = None) -> int:
+        """
+        Spool one batch: pending entries first, then new ones
+
+        Only one batch is ever unacknowledged, so the pending list read
+        after a restart holds exactly that batch.
+
+        Returns:
+            Number of entries spooled
+        """
+        entries = self._read("0", None) or self._collect(block)
+        if not entries:
+            return 0
+        self._spool(entries)
+        self.redis.xack(self.stream, self.group, *[entry_id for entry_id, _ in entries])
+        self.spooled += len(entries)
+        return len(entries)
+
+    def run(self):
+        """Spool until ``stop`` is called; errors are logged and retried"""
+        self.ensure_group()
+        last_prune = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.drain_once(self.block_ms)
+                if self.retention and time.monotonic() - last_prune > 60:
+                    last_prune = time.monotonic()
+                    self.prune()
+            except redis.RedisError as e:
+                print(f"Redis stream error: {e}")
+                self._stop.wait(1.0)
+
+    def start(self) -> threading.Thread:
+        """Run the spooler on a daemon thread"""
+        self.ensure_group()
+        self._thread = threading.Thread(target=self.run, name="redis-stream-spool", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
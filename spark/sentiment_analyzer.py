@@ -1,48 +1,111 @@
-import re
-from typing import Dict, Any
-from pyspark.sql import DataFrame
-from pyspark.sql.functions import udf, col
-from pyspark.sql.types import DoubleType
+import os
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+from pyspark.sql import Column, DataFrame, Window
+from pyspark.sql.functions import (
+    udf, avg, coalesce, col, first, greatest, isnan, lag, least, lit, stddev, struct, when
+)
+from pyspark.sql.types import DoubleType, StringType, StructField, StructType
+
+from text_sentiment import DEFAULT_LEXICON, TextSentimentEngine, load_lexicon
+
+# Price action levels: (price change above, sentiment, confidence, label).
+# The first level whose bound the 24h change exceeds applies; the last has
+# no bound. Shared by the Python and the Spark column versions.
+PRICE_ACTION_LEVELS = (
+    (10, 1.0, 0.9, 'very_bullish'),
+    (5, 0.7, 0.8, 'bullish'),
+    (2, 0.4, 0.6, 'slightly_bullish'),
+    (-2, 0.0, 0.5, 'neutral'),
+    (-5, -0.4, 0.6, 'slightly_bearish'),
+    (-10, -0.7, 0.8, 'bearish'),
+    (None, -1.0, 0.9, 'very_bearish'),
+)
+
+# Sentiment labels: (score at least, label); the last has no bound
+SENTIMENT_LABELS = (
+    (0.7, "Very Bullish"),
+    (0.3, "Bullish"),
+    (-0.3, "Neutral"),
+    (-0.7, "Bearish"),
+    (None, "Very Bearish"),
+)
+
+# Rows (aggregation windows) a Fear & Greed input looks back over,
+# including the current one: 24h of 5-minute windows
+FEAR_GREED_LOOKBACK = 288
+
+# Return type of analyze_price_action as a Spark type
+PRICE_ACTION_TYPE = StructType([
+    StructField("sentiment", DoubleType()),
+    StructField("confidence", DoubleType()),
+    StructField("label", StringType()),
+])
+
+
+def _levels_column(value: Column, levels, field: int, strict: bool = True) -> Column:
+    """when() chain over a level table, evaluated in the JVM"""
+    expression = None
+    for level in levels:
+        if level[0] is None:
+            return expression.otherwise(lit(level[field]))
+        condition = value > level[0] if strict else value >= level[0]
+        if expression is None:
+            expression = when(condition, lit(level[field]))
+        else:
+            expression = expression.when(condition, lit(level[field]))
+    return expression
+
+
+def price_sentiment_column(price_change: Column) -> Column:
+    """Price action sentiment as a native column; missing or NaN changes score 0.0"""
+    return when(price_change.isNull() | isnan(price_change), lit(0.0)) \
+        .otherwise(_levels_column(price_change, PRICE_ACTION_LEVELS, 1))
+
+
+def price_action_column(price_change: Column) -> Column:
+    """analyze_price_action as a native struct<sentiment, confidence, label> column; null for missing or NaN changes"""
+    return when(price_change.isNotNull() & ~isnan(price_change), struct(
+        _levels_column(price_change, PRICE_ACTION_LEVELS, 1).alias("sentiment"),
+        _levels_column(price_change, PRICE_ACTION_LEVELS, 2).alias("confidence"),
+        _levels_column(price_change, PRICE_ACTION_LEVELS, 3).alias("label"),
+    ))
+
+
+def sentiment_label_column(score: Column) -> Column:
+    """get_sentiment_label as a native column"""
+    return _levels_column(score, SENTIMENT_LABELS, 1, strict=False)
+
+
+def fear_greed_column(price_change: Column, volume_ratio: Column, volatility: Column) -> Column:
+    """calculate_fear_greed_index as a native integer column"""
+    price_score = least(lit(100.0), greatest(lit(0.0), 50 + price_change * 2))
+    volume_score = least(lit(100.0), volume_ratio * 30)
+    volatility_score = least(lit(100.0), greatest(lit(0.0), 100 - volatility * 10))
+    return (price_score * 0.5 + volume_score * 0.3 + volatility_score * 0.2).cast("int")
 
 
 class SentimentAnalyzer:
     """Simple sentiment analysis for crypto market data"""
     
-    def __init__(self):
-        # Simple sentiment keywords
-        self.positive_keywords = {
-            'bullish', 'moon', 'pump', 'rally', 'surge', 'profit', 
-            'gain', 'buy', 'long', 'hodl', 'breakout', 'support'
-        }
-        
-        self.negative_keywords = {
-            'bearish', 'dump', 'crash', 'sell', 'short', 'loss',
-            'drop', 'fall', 'resistance', 'fear', 'panic'
-        }
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None):
+        # Weighted keywords (SENTIMENT_LEXICON may point to a JSON file)
+        if lexicon is None and os.getenv("SENTIMENT_LEXICON"):
+            lexicon = load_lexicon(os.environ["SENTIMENT_LEXICON"])
+        self.text_engine = TextSentimentEngine(lexicon or DEFAULT_LEXICON)
+        
+        self.positive_keywords = {word for word, weight in self.text_engine.lexicon.items() if weight > 0}
+        self.negative_keywords = {word for word, weight in self.text_engine.lexicon.items() if weight < 0}
         
     def analyze_text(self, text: str) -> float:
         """
         Analyze sentiment of text
         Returns: sentiment score between -1 (very negative) and 1 (very positive)
-        """
-        if not text:
-            return 0.0
-            
-        text = text.lower()
-        words = re.findall(r'\w+', text)
-        
-        positive_count = sum(1 for word in words if word in self.positive_keywords)
-        negative_count = sum(1 for word in words if word in self.negative_keywords)
-        
-        total_sentiment_words = positive_count + negative_count
-        
-        if total_sentiment_words == 0:
-            return 0.0
-            
-        # Calculate sentiment score
-        sentiment = (positive_count - negative_count) / total_sentiment_words
         
-        return sentiment
+        Negated keywords ("not bullish") count against their sign. Use
+        self.text_engine.score_batch / score_parallel for many texts.
+        """
+        return self.text_engine.score(text)
         
     def analyze_price_action(self, price_change: float) -> Dict[str, Any]:
         """
@@ -57,21 +120,9 @@ class SentimentAnalyzer:
         # Convert price change to sentiment
         # Large positive change = positive sentiment
         # Large negative change = negative sentiment
-        
-        if price_change > 10:
-            return {'sentiment': 1.0, 'confidence': 0.9, 'label': 'very_bullish'}
-        elif price_change > 5:
-            return {'sentiment': 0.7, 'confidence': 0.8, 'label': 'bullish'}
-        elif price_change > 2:
-            return {'sentiment': 0.4, 'confidence': 0.6, 'label': 'slightly_bullish'}
-        elif price_change > -2:
-            return {'sentiment': 0.0, 'confidence': 0.5, 'label': 'neutral'}
-        elif price_change > -5:
-            return {'sentiment': -0.4, 'confidence': 0.6, 'label': 'slightly_bearish'}
-        elif price_change > -10:
-            return {'sentiment': -0.7, 'confidence': 0.8, 'label': 'bearish'}
-        else:
-            return {'sentiment': -1.0, 'confidence': 0.9, 'label': 'very_bearish'}
+        for bound, sentiment, confidence, label in PRICE_ACTION_LEVELS:
+            if bound is None or price_change > bound:
+                return {'sentiment': sentiment, 'confidence': confidence, 'label': label}
             
     def analyze_volume(self, volume: float, avg_volume: float) -> float:
         """
@@ -92,8 +143,12 @@ class SentimentAnalyzer:
             return 0.3  # Low conviction
             
     def create_sentiment_udf(self):
-        """Create UDF for sentiment analysis"""
-        return udf(self.analyze_price_action, DoubleType())
+        """Create UDF for sentiment analysis
+        
+        Row-at-a-time Python UDF returning a struct; prefer the native
+        price_action_column, which runs in the JVM.
+        """
+        return udf(self.analyze_price_action, PRICE_ACTION_TYPE)
         
     def add_sentiment_features(self, df: DataFrame) -> DataFrame:
         """
@@ -106,36 +161,79 @@ class SentimentAnalyzer:
             DataFrame with additional sentiment columns
         """
         
-        # Create UDF for price-based sentiment
-        @udf(returnType=DoubleType())
-        def price_sentiment(price_change):
-            if price_change is None:
-                return 0.0
-            return self.analyze_price_action(price_change)['sentiment']
-            
-        # Add sentiment score based on price change
-        df = df.withColumn("price_sentiment", price_sentiment(col("price_change_24h")))
+        # Add sentiment score based on price change (native expression,
+        # no Python worker round trip)
+        df = df.withColumn("price_sentiment", price_sentiment_column(col("price_change_24h")))
         
         return df
         
+    def add_text_sentiment(self, df: DataFrame, text_col: str = "text") -> DataFrame:
+        """Add a text_sentiment column scored by the vectorized pandas UDF"""
+        return df.withColumn("text_sentiment", self.text_engine.spark_udf()(col(text_col)))
+        
+    def add_sentiment_label(self, df: DataFrame, score_col: str = "price_sentiment") -> DataFrame:
+        """Add a sentiment_label column computed from ``score_col``"""
+        return df.withColumn("sentiment_label", sentiment_label_column(col(score_col)))
+        
+    def add_fear_greed_index(self, df: DataFrame, lookback: int = FEAR_GREED_LOOKBACK) -> DataFrame:
+        """
+        Add the Fear & Greed index to every (symbol, window) row
+        
+        Works on aggregated_metrics rows. The inputs are derived per symbol
+        over the last ``lookback`` windows (ordered by window_start) with
+        window functions, so the whole table is scored in one job:
+        - fg_price_change: % change of the window price (close_price,
+          else avg_price) since the oldest window in the lookback
+        - fg_volume_ratio: total_volume / its rolling mean (1.0 when the
+          mean is 0)
+        - fg_volatility: rolling sample stddev of window-to-window returns,
+          in percent (0.0 with fewer than two returns)
+        
+        Args:
+            df: DataFrame with symbol, window_start, avg_price and total_volume
+            lookback: Windows per rolling input, including the current one
+            
+        Returns:
+            DataFrame with the fg_* inputs and a fear_greed_index column
+        """
+        price = col("avg_price")
+        if "close_price" in df.columns:
+            price = coalesce(col("close_price"), price)
+        ordered = Window.partitionBy("symbol").orderBy("window_start")
+        frame = ordered.rowsBetween(1 - lookback, Window.currentRow)
+        mean_volume = avg("total_volume").over(frame)
+        
+        return df.withColumn("_fg_price", price) \
+            .withColumn("_fg_return", col("_fg_price") / lag("_fg_price").over(ordered) - 1) \
+            .withColumn("fg_price_change", (col("_fg_price") / first("_fg_price").over(frame) - 1) * 100) \
+            .withColumn("fg_volume_ratio", when(mean_volume > 0, col("total_volume") / mean_volume).otherwise(lit(1.0))) \
+            .withColumn("fg_volatility", coalesce(stddev("_fg_return").over(frame) * 100, lit(0.0))) \
+            .withColumn("fear_greed_index", fear_greed_column(
+                col("fg_price_change"), col("fg_volume_ratio"), col("fg_volatility"))) \
+            .drop("_fg_price", "_fg_return")
+        
     def aggregate_sentiment(self, df: DataFrame, window_col: str = "window") -> DataFrame:
         """
         Aggregate sentiment scores over time windows
         
         Args:
-            df: DataFrame with sentiment scores
+            df: DataFrame with price_sentiment scores (and optionally
+                price_confidence, averaged into avg_confidence)
             window_col: Name of the window column
             
         Returns:
             DataFrame with aggregated sentiment metrics
         """
-        from pyspark.sql.functions import avg, count, stddev
+        from pyspark.sql.functions import count
         
-        sentiment_agg = df.groupBy("symbol", window_col).agg(
+        aggregates = [
             avg("price_sentiment").alias("avg_sentiment"),
             count("*").alias("sentiment_count"),
             stddev("price_sentiment").alias("sentiment_volatility")
-        )
+        ]
+        if "price_confidence" in df.columns:
+            aggregates.append(avg("price_confidence").alias("avg_confidence"))
+        sentiment_agg = df.groupBy("symbol", window_col).agg(*aggregates)
         
         return sentiment_agg
 
@@ -167,6 +265,95 @@ def calculate_fear_greed_index(
     return int(index)
 
 
+def fear_greed_index_array(price_change, volume_ratio, volatility) -> np.ndarray:
+    """
+    calculate_fear_greed_index over arrays (or scalars), element-wise
+    
+    Returns:
+        int64 array of indices in [0, 100]
+    """
+    price_score = np.clip(50 + np.asarray(price_change, dtype=np.float64) * 2, 0, 100)
+    volume_score = np.minimum(100, np.asarray(volume_ratio, dtype=np.float64) * 30)
+    volatility_score = np.clip(100 - np.asarray(volatility, dtype=np.float64) * 10, 0, 100)
+    index = price_score * 0.5 + volume_score * 0.3 + volatility_score * 0.2
+    return np.trunc(index).astype(np.int64)
+
+
+def fear_greed_inputs(
+    symbols,
+    prices,
+    volumes,
+    lookback: int = FEAR_GREED_LOOKBACK,
+    order=None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rolling Fear & Greed inputs for many symbols at once
+    
+    NumPy counterpart of SentimentAnalyzer.add_fear_greed_index: rows are
+    grouped by symbol and each input covers the last ``lookback`` rows of
+    its symbol. Rolling sums come from per-symbol cumulative sums, so the
+    cost is O(n log n) for the sort and O(n) after it, whatever the
+    lookback.
+    
+    Args:
+        symbols: Symbol of each row
+        prices: Window price of each row
+        volumes: Window volume of each row
+        lookback: Rows per rolling input, including the current one
+        order: Sort key within a symbol (e.g. window_start); rows are
+            taken in input order when omitted
+            
+    Returns:
+        (price_change, volume_ratio, volatility) arrays in input order
+    """
+    symbols = np.asarray(symbols)
+    if order is None:
+        rows = np.argsort(symbols, kind="stable")
+    else:
+        rows = np.lexsort((np.asarray(order), symbols))
+    symbol = symbols[rows]
+    price = np.asarray(prices, dtype=np.float64)[rows]
+    volume = np.asarray(volumes, dtype=np.float64)[rows]
+    
+    n = len(rows)
+    index = np.arange(n)
+    first_row = np.ones(n, dtype=bool)
+    first_row[1:] = symbol[1:] != symbol[:-1]
+    group_start = np.maximum.accumulate(np.where(first_row, index, 0))
+    start = np.maximum(group_start, index - lookback + 1)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Return of each row against the previous row of its symbol
+        has_return = ~first_row
+        returns = np.zeros(n)
+        returns[1:] = np.where(has_return[1:], price[1:] / price[:-1] - 1, 0.0)
+        
+        # Rolling sums as differences of cumulative sums, restarted per
+        # symbol so rounding stays relative to that symbol's own totals
+        columns = np.column_stack((volume, has_return, returns, returns * returns))
+        sums = np.empty_like(columns)
+        bounds = np.append(np.flatnonzero(first_row), n)
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            np.cumsum(columns[lo:hi], axis=0, out=sums[lo:hi])
+        sums -= np.where((start > group_start)[:, None], sums[start - 1], 0.0)
+        volume_sum, count, total, squares = sums.T
+        
+        price_change = (price / price[start] - 1) * 100
+        
+        mean_volume = volume_sum / (index - start + 1)
+        volume_ratio = np.divide(volume, mean_volume, out=np.ones(n), where=mean_volume > 0)
+        
+        variance = (squares - total * total / np.maximum(count, 1)) / (count - 1)
+        volatility = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)) * 100, 0.0)
+    
+    inputs = []
+    for values in (price_change, volume_ratio, volatility):
+        unsorted = np.empty(n)
+        unsorted[rows] = values
+        inputs.append(unsorted)
+    return tuple(inputs)
+
+
 def get_sentiment_label(sentiment_score: float) -> str:
     """
     Convert sentiment score to label
@@ -177,13 +364,6 @@ def get_sentiment_label(sentiment_score: float) -> str:
     Returns:
         Sentiment label
     """
-    if sentiment_score >= 0.7:
-        return "Very Bullish"
-    elif sentiment_score >= 0.3:
-        return "Bullish"
-    elif sentiment_score >= -0.3:
-        return "Neutral"
-    elif sentiment_score >= -0.7:
-        return "Bearish"
-    else:
-        return "Very Bearish"
+    for bound, label in SENTIMENT_LABELS:
+        if bound is None or sentiment_score >= bound:
+            return label
@@ -0,0 +1,84 @@
+"""
+Incremental reads of the price:updated index
+
+Needs a Redis server the test may write keys to:
+    TEST_REDIS_URL=redis://localhost:6379/15 python -m pytest tests
+"""
+import json
+import os
+import uuid
+
+import pytest
+
+redis = pytest.importorskip("redis")
+
+REDIS_URL = os.getenv("TEST_REDIS_URL")
+pytestmark = pytest.mark.skipif(not REDIS_URL, reason="TEST_REDIS_URL is not set")
+
+
+@pytest.fixture
+def client():
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def reader(client):
+    from redis_reader import RedisPriceReader
+
+    prefix = f"test_{uuid.uuid4().hex[:8]}:price:"
+    reader = RedisPriceReader(client, prefix=prefix, index=f"{prefix}updated", chunk_size=3)
+    yield reader
+    keys = list(client.scan_iter(match=f"{prefix}*"))
+    if keys:
+        client.delete(*keys)
+
+
+def update(reader, score, symbols, price=1.0):
+    """One tick batch: values and index scores together, like app.tick_stream"""
+    pipe = reader.redis.pipeline(transaction=True)
+    for symbol in symbols:
+        pipe.set(f"{reader.prefix}{symbol}", json.dumps({"symbol": symbol, "price": price}))
+    pipe.zadd(reader.index, {symbol: score for symbol in symbols})
+    pipe.execute()
+
+
+def symbols(records):
+    return sorted(record["symbol"] for record in records)
+
+
+def test_tied_scores_across_a_page_boundary_are_read_once(reader):
+    update(reader, 1, ["A", "B"])
+    # The first page (3 entries) ends inside this group
+    update(reader, 2, ["C", "D", "E", "F", "G"])
+    update(reader, 3, ["H", "I"])
+
+    records, offset = reader.read_changed()
+    assert symbols(records) == list("ABCDEFGHI")
+    assert offset == 3.0
+
+
+def test_group_larger_than_a_page(reader):
+    update(reader, 5, list("ABCDEFGH"))
+    records, offset = reader.read_changed()
+    assert symbols(records) == list("ABCDEFGH")
+    assert offset == 5.0
+
+
+def test_offset_advances_to_later_updates_only(reader):
+    update(reader, 1, ["A", "B", "C"])
+    update(reader, 2, ["D", "E", "F"])
+    records, offset = reader.read_changed()
+    assert len(records) == 6
+
+    assert reader.read_changed(offset) == ([], offset)
+
+    update(reader, 4, ["B", "E"], price=2.0)
+    records, offset = reader.read_changed(offset)
+    assert records == [{"symbol": "B", "price": 2.0}, {"symbol": "E", "price": 2.0}]
+    assert offset == 4.0
+
+    # Scores are exclusive: a read from an older offset still starts after it
+    records, _ = reader.read_changed(2)
+    assert symbols(records) == ["B", "E"]
@@ -0,0 +1,75 @@
+import random
+import re
+
+import numpy as np
+import pytest
+
+from text_sentiment import DEFAULT_LEXICON, DEFAULT_NEGATIONS, TextSentimentEngine
+
+
+def keyword_ratio(text):
+    """SentimentAnalyzer.analyze_text before the lexicon engine"""
+    words = re.findall(r'\w+', (text or '').lower())
+    positive = sum(1 for word in words if DEFAULT_LEXICON.get(word, 0) > 0)
+    negative = sum(1 for word in words if DEFAULT_LEXICON.get(word, 0) < 0)
+    return (positive - negative) / (positive + negative) if positive + negative else 0.0
+
+
+def regex_engine(**kwargs):
+    engine = TextSentimentEngine(**kwargs)
+    engine._automaton = None
+    return engine
+
+
+def random_texts(count, seed=11, negations=False):
+    filler = ['btc', 'eth', 'the', 'market', 'is', 'very', 'today', 'and', 'to', 'bullishness', 'longer']
+    vocabulary = filler + list(DEFAULT_LEXICON) + (list(DEFAULT_NEGATIONS) if negations else [])
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 25))]
+        words = [word.upper() if rng.random() < 0.1 else word for word in words]
+        texts.append(' '.join(words) + rng.choice(['', '!', '.', ' #crypto']))
+    return texts
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('not bullish', -1.0),
+    ('not a big bullish', -1.0),             # two words in between
+    ('not one two three bullish', -1.0),     # three words in between
+    ('not one two three four bullish', 1.0), # past the three-word window
+    ("isn't bullish or moon", -1.0),         # every term within the window
+    ('not now. bullish', 1.0),               # the clause ended
+    ('never; moon', 1.0),
+    ('no crash, rally', 0.0),                # commas do not end a clause
+    ('bullish not', 1.0),                    # negations only look ahead
+])
+def test_negation_window_and_clause_ends(text, expected):
+    assert TextSentimentEngine().score(text) == expected
+
+
+def test_phrase_wins_over_its_words():
+    engine = TextSentimentEngine({'short squeeze': 1.0, 'short': -1.0, 'squeeze': -0.5})
+    assert engine.score('massive SHORT   squeeze incoming') == 1.0
+    assert engine.score('short the squeeze') == -1.0
+    assert engine.score('going short') == -1.0
+
+
+def test_missing_and_empty_texts_score_zero():
+    scores = TextSentimentEngine().score_batch(['moon', None, '', 'dump', float('nan')])
+    assert scores.tolist() == [1.0, 0.0, 0.0, -1.0, 0.0]
+
+
+def test_automaton_and_regex_agree():
+    pytest.importorskip('ahocorasick')
+    automaton = TextSentimentEngine()
+    assert automaton._automaton is not None
+    texts = random_texts(2000, negations=True)
+    assert np.array_equal(automaton.score_batch(texts), regex_engine().score_batch(texts))
+
+
+@pytest.mark.parametrize('make_engine', [TextSentimentEngine, regex_engine])
+def test_score_batch_matches_keyword_ratio_without_negations(make_engine):
+    texts = random_texts(2000)
+    expected = [keyword_ratio(text) for text in texts]
+    assert np.allclose(make_engine().score_batch(texts), expected, rtol=0, atol=1e-12)
@@ -0,0 +1,242 @@
+"""
+Batch text sentiment scoring for social feeds.
+
+``TextSentimentEngine`` scores a whole batch of texts in one scan. The
+batch is joined and lowercased once, then matched against every lexicon
+term (word or phrase) and negation word at the same time: with an
+Aho-Corasick automaton when pyahocorasick is installed and the lexicon has
+no phrases, otherwise with a single regex factored into a character trie
+(``s(?:hort|u(?:pport|rge))``), so no IGNORECASE and no re-tried prefixes.
+Only matches reach Python; they are mapped back to their text with
+``np.searchsorted``. A negation flips the terms that follow it within
+``negation_window`` words, up to the end of the clause.
+
+The score is ``sum(weight) / sum(|weight|)`` over matched terms, in
+[-1, 1]; with unit weights and no negations this equals the keyword ratio
+``SentimentAnalyzer.analyze_text`` always returned. Batches can be scored
+in-process (``score_batch``), across a process pool (``score_parallel``)
+or inside Spark with a pandas UDF (``spark_udf``).
+"""
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
+
+DEFAULT_LEXICON: Dict[str, float] = {
+    # Positive
+    'bullish': 1.0, 'moon': 1.0, 'pump': 1.0, 'rally': 1.0, 'surge': 1.0, 'profit': 1.0,
+    'gain': 1.0, 'buy': 1.0, 'long': 1.0, 'hodl': 1.0, 'breakout': 1.0, 'support': 1.0,
+    # Negative
+    'bearish': -1.0, 'dump': -1.0, 'crash': -1.0, 'sell': -1.0, 'short': -1.0, 'loss': -1.0,
+    'drop': -1.0, 'fall': -1.0, 'resistance': -1.0, 'fear': -1.0, 'panic': -1.0,
+}
+
+DEFAULT_NEGATIONS = (
+    'not', 'no', 'never', 'nor', 'without', 'hardly', 'barely',
+    "don't", 'dont', "doesn't", 'doesnt', "isn't", 'isnt', "aren't", 'arent',
+    "wasn't", 'wasnt', "won't", 'wont', "can't", 'cant',
+)
+
+_CLAUSE_END = re.compile(r'[.!?;:]')
+
+
+def load_lexicon(path: str) -> Dict[str, float]:
+    """Read a ``{"term": weight}`` JSON file; terms may be phrases"""
+    with open(path) as f:
+        return {term.lower(): float(weight) for term, weight in json.load(f).items()}
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex matching any of ``terms``, factored on shared prefixes
+
+    Optional suffixes are greedy, so a phrase wins over its first word.
+    Spaces inside a term match any run of whitespace.
+    """
+    root: Dict = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' not in node:
+            return body
+        return (body if len(branches) > 1 else '(?:' + body + ')') + '?'
+
+    return build(root)
+
+
+class TextSentimentEngine:
+    """
+    Weighted-lexicon sentiment with negation, compiled once
+
+    Args:
+        lexicon: Term (word or phrase) to weight; negative weights are bearish
+        negations: Words that flip the terms after them
+        negation_window: Most words that may separate a negation from a term it flips
+        negation_factor: Multiplier for a negated term's weight
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, float]] = None,
+        negations: Iterable[str] = DEFAULT_NEGATIONS,
+        negation_window: int = 3,
+        negation_factor: float = -1.0,
+    ):
+        self.lexicon = {' '.join(term.lower().split()): weight for term, weight in (lexicon or DEFAULT_LEXICON).items()}
+        self.negations = tuple(negations)
+        self.negation_window = negation_window
+        self.negation_factor = negation_factor
+
+        # Matched term -> weight, None for a negation; the lexicon wins ties
+        self._weights: Dict[str, Optional[float]] = dict.fromkeys(n.lower() for n in self.negations)
+        self._weights.update(self.lexicon)
+        self._finditer = re.compile(rf'\b{_trie_pattern(self._weights)}\b').finditer
+        self._automaton = None
+        if ahocorasick is not None and not any(' ' in term for term in self._weights):
+            # Phrases need the regex's whitespace runs; single words can use the automaton
+            self._automaton = ahocorasick.Automaton()
+            for term, weight in self._weights.items():
+                self._automaton.add_word(term, (len(term), weight))
+            self._automaton.make_automaton()
+
+    def __reduce__(self):
+        # Compiled methods do not pickle; rebuild in the worker process
+        return (TextSentimentEngine, (self.lexicon, self.negations, self.negation_window, self.negation_factor))
+
+    def _negated(self, text: str, start: int, end: int) -> bool:
+        gap = text[start:end]
+        return len(gap.split()) <= self.negation_window and not _CLAUSE_END.search(gap)
+
+    def score(self, text: Optional[str]) -> float:
+        """Sentiment of one text in [-1, 1]; non-strings score 0.0"""
+        if not isinstance(text, str) or not text:
+            return 0.0
+        return float(self.score_batch([text])[0])
+
+    def score_batch(self, texts) -> np.ndarray:
+        """
+        Score every text in one call
+
+        Args:
+            texts: Iterable of strings, pandas Series or Arrow array; missing
+                values score 0.0
+
+        Returns:
+            float64 array of scores in input order
+        """
+        if hasattr(texts, 'to_pylist'):
+            texts = texts.to_pylist()
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        if not texts:
+            return np.zeros(0)
+
+        # NUL never matches \b-bounded terms or \s, so no match spans two texts
+        joined = '\0'.join(texts)
+        lowered = joined.lower()
+        if len(lowered) != len(joined):
+            # A few characters change length when lowercased; keep offsets exact
+            texts = [text.lower() for text in texts]
+            lowered = '\0'.join(texts)
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        offsets = np.cumsum(lengths + 1) - lengths - 1
+
+        starts, ends, values = self._scan(lowered)
+        if not starts:
+            return np.zeros(len(texts))
+        owners = np.searchsorted(offsets, starts, side='right') - 1
+
+        # Negations carry NaN; each one flips the terms after it in its text
+        signed = np.array(values, dtype=np.float64)
+        negations = np.isnan(signed)
+        magnitude = np.where(negations, 0.0, np.abs(signed))
+        for i in np.flatnonzero(negations).tolist():
+            for j in range(i + 1, len(starts)):
+                if owners[j] != owners[i] or negations[j] or not self._negated(lowered, ends[i], starts[j]):
+                    break
+                signed[j] *= self.negation_factor
+        signed[negations] = 0.0
+
+        weighted = np.bincount(owners, weights=signed, minlength=len(texts))
+        total = np.bincount(owners, weights=magnitude, minlength=len(texts))
+        return np.divide(weighted, total, out=np.zeros(len(texts)), where=total > 0)
+
+    def _scan(self, lowered: str):
+        """Start, end and weight (None for negations) of every match"""
+        starts: List[int] = []
+        ends: List[int] = []
+        values: List[Optional[float]] = []
+        if self._automaton is None:
+            weights = self._weights
+            for match in self._finditer(lowered):
+                term = match.group()
+                starts.append(match.start())
+                ends.append(match.end())
+                values.append(weights[term] if term in weights else weights[' '.join(term.split())])
+            return starts, ends, values
+
+        # The automaton reports substrings too; keep only whole words, as \b would
+        size = len(lowered)
+        for last, (length, weight) in self._automaton.iter(lowered):
+            start, end = last - length + 1, last + 1
+            if start and (lowered[start - 1].isalnum() or lowered[start - 1] == '_'):
+                continue
+            if end < size and (lowered[end].isalnum() or lowered[end] == '_'):
+                continue
+            starts.append(start)
+            ends.append(end)
+            values.append(weight)
+        return starts, ends, values
+
+    def score_parallel(self, texts, processes: Optional[int] = None, chunk_size: int = 20_000) -> np.ndarray:
+        """
+        ``score_batch`` split into chunks across a process pool
+
+        Inputs smaller than one chunk are scored in-process, where the pool
+        start-up would cost more than it saves.
+        """
+        if hasattr(texts, 'to_pylist'):
+            texts = texts.to_pylist()
+        elif not isinstance(texts, list):
+            texts = list(texts)
+        if len(texts) <= chunk_size:
+            return self.score_batch(texts)
+
+        with ProcessPoolExecutor(processes) as pool:
+            parts = pool.map(self.score_batch, _chunks(texts, chunk_size))
+            return np.concatenate(list(parts))
+
+    def spark_udf(self):
+        """Arrow-backed pandas UDF (Series[str] -> Series[double]) using this engine"""
+        import pandas as pd
+        from pyspark.sql.functions import pandas_udf
+        from pyspark.sql.types import DoubleType
+
+        engine = self
+
+        @pandas_udf(DoubleType())
+        def text_sentiment(texts: pd.Series) -> pd.Series:
+            return pd.Series(engine.score_batch(texts), index=texts.index)
+
+        return text_sentiment
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]